@@ -0,0 +1,78 @@
+"""
+Mede o custo de importação na partida do sistema com python -X importtime
+
+Etapa 1: import src.main (o que roda antes da janela aparecer)
+Etapa 2: módulos importados em segundo plano com a janela já na tela (banco, pandas, PIL)
+
+Uso: python benchmarks/benchmark_inicializacao.py [repeticoes]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ANTES_DA_JANELA = "import src.main"
+DEPOIS_DA_JANELA = (
+    "import src.main, src.database, src.veiculos, src.destinos, PIL.ImageTk"
+)
+
+# Módulos pesados que não devem aparecer antes da janela
+PESADOS = ['pandas', 'numpy', 'PIL', 'reportlab', 'docx', 'openpyxl', 'sqlite3']
+
+
+def importtime(codigo):
+    """
+    Roda o código num interpretador novo com -X importtime
+    Retorna {módulo: tempo acumulado em ms}
+    """
+    resultado = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', codigo],
+        cwd=RAIZ, capture_output=True, text=True, check=True
+    )
+    tempos = {}
+    for linha in resultado.stderr.splitlines():
+        if not linha.startswith('import time:') or 'cumulative' in linha:
+            continue
+        _, acumulado, modulo = linha.split('|')
+        tempos[modulo[1:].rstrip()] = int(acumulado) / 1000  # mantém a indentação (nível)
+    return tempos
+
+
+def total(tempos):
+    """Soma dos módulos de primeiro nível (sem indentação no relatório)"""
+    return sum(ms for modulo, ms in tempos.items() if modulo == modulo.lstrip())
+
+
+def medir(codigo, repeticoes):
+    """Mediana do tempo total de importação (ms) e a última medição completa"""
+    amostras = []
+    for _ in range(repeticoes):
+        tempos = importtime(codigo)
+        amostras.append(total(tempos))
+    return statistics.median(amostras), tempos
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    
+    antes, tempos_antes = medir(ANTES_DA_JANELA, repeticoes)
+    depois, tempos_depois = medir(DEPOIS_DA_JANELA, repeticoes)
+    
+    print(f"Repetições: {repeticoes} (mediana)")
+    print(f"Até a janela aparecer:       {antes:8.1f} ms")
+    print(f"Com banco/pandas/PIL:        {depois:8.1f} ms  (em segundo plano, janela respondendo)")
+    
+    carregados = [m for m in tempos_antes if m.strip().split('.')[0] in PESADOS]
+    if carregados:
+        print(f"⚠️  Pesados importados antes da janela: {sorted({m.strip().split('.')[0] for m in carregados})}")
+    
+    print("\nMais lentos antes da janela:")
+    for modulo, ms in sorted(tempos_antes.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {ms:8.1f} ms  {modulo.strip()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Compara a exportação para Word: add_row() célula a célula x XML gerado em blocos
+
+Uso: python benchmarks/benchmark_word.py [linhas]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.exportadores import exportar_word
+
+
+COLUNAS = [
+    'DATA', 'PLACA', 'KM', 'VEÍCULO', 'DESTINO PROGRAMADO',
+    'SERVIÇO A EXECUTAR', 'STATUS', 'DATA ENTRADA', 'DATA SAÍDA',
+    'TOTAL DE DIAS EM MANUTENÇÃO', 'NR° OF', 'OBS'
+]
+
+
+def gerar_dados(linhas):
+    """DataFrame de exibição sintético (textos no formato da grade)"""
+    return pd.DataFrame({
+        'DATA': [f"{1 + i % 28:02d}/{1 + i % 12:02d}/2024" for i in range(linhas)],
+        'PLACA': [f"ABC{i % 10000:04d}" for i in range(linhas)],
+        'KM': [str(100000 + i) for i in range(linhas)],
+        'VEÍCULO': ['CAVALO', 'CARRETA 1', 'CARRETA 2', 'BUG 1'] * (linhas // 4) + ['LS'] * (linhas % 4),
+        'DESTINO PROGRAMADO': 'OFICINA CENTRAL',
+        'SERVIÇO A EXECUTAR': 'Troca de embreagem & revisão <freios>',
+        'STATUS': 'FINALIZADO',
+        'DATA ENTRADA': '01/02/2024',
+        'DATA SAÍDA': '05/02/2024',
+        'TOTAL DE DIAS EM MANUTENÇÃO': '5',
+        'NR° OF': [f"OF-{i}" for i in range(linhas)],
+        'OBS': 'Sem observações'
+    })[COLUNAS]
+
+
+def exportar_word_por_celula(df, arquivo):
+    """Implementação anterior: add_row() e formatação célula a célula"""
+    from docx import Document
+    from docx.shared import Pt
+    
+    doc = Document()
+    colunas = list(df.columns)
+    tabela = doc.add_table(rows=1, cols=len(colunas))
+    tabela.style = 'Table Grid'
+    
+    for i, col in enumerate(colunas):
+        tabela.rows[0].cells[i].text = col
+    
+    for _, row in df.iterrows():
+        linha_tabela = tabela.add_row().cells
+        for i, col in enumerate(colunas):
+            linha_tabela[i].text = str(row.get(col, ''))[:50]
+            linha_tabela[i].paragraphs[0].runs[0].font.size = Pt(8)
+    
+    doc.save(arquivo)
+
+
+def medir(funcao, *args):
+    """Tempo (s) de uma chamada"""
+    inicio = time.perf_counter()
+    funcao(*args)
+    return time.perf_counter() - inicio
+
+
+def contar_linhas(arquivo):
+    """Linhas da primeira tabela do documento (confere o arquivo gerado)"""
+    from docx import Document
+    return len(Document(arquivo).tables[0].rows)
+
+
+def main():
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    df = gerar_dados(linhas)
+    
+    with tempfile.TemporaryDirectory() as pasta:
+        antigo = os.path.join(pasta, 'por_celula.docx')
+        novo = os.path.join(pasta, 'xml_em_blocos.docx')
+        
+        tempo_antigo = medir(exportar_word_por_celula, df, antigo)
+        tempo_novo = medir(exportar_word, df, novo)
+        
+        print(f"Linhas: {linhas} x {len(COLUNAS)} colunas")
+        print(f"add_row() por célula: {tempo_antigo:8.2f} s  ({contar_linhas(antigo) - 1} linhas no arquivo)")
+        print(f"XML em blocos:        {tempo_novo:8.2f} s  ({contar_linhas(novo) - 1} linhas no arquivo)")
+        print(f"Ganho: {tempo_antigo / tempo_novo:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
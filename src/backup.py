@@ -0,0 +1,201 @@
+"""
+Backup do banco SQLite - cópia online pela API de backup do SQLite
+Cópia em passos (não trava quem está gravando), verificada com quick_check
+e com retenção horária / diária / semanal
+"""
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from .conexao import abrir_conexao
+
+
+PREFIXO_BACKUP = 'database_backup_'
+FORMATO_DATA = '%Y%m%d_%H%M%S'
+
+# Páginas copiadas por passo (entre passos outras conexões podem gravar)
+PAGINAS_POR_PASSO = 256
+
+# Quantos backups manter em cada faixa (o mais recente de cada hora/dia/semana)
+RETENCAO_PADRAO = {'horario': 24, 'diario': 7, 'semanal': 4}
+
+
+def copiar_banco(origem, destino, paginas=PAGINAS_POR_PASSO, progresso=None):
+    """
+    Copia o banco aberto em `origem` (conexão) para o arquivo `destino`
+    
+    A cópia vai para um arquivo temporário, é verificada com PRAGMA quick_check
+    e só então renomeada - um backup com falha nunca fica com o nome final.
+    Retorna (True, destino) ou (False, mensagem)
+    """
+    temporario = destino + '.tmp'
+    conn_destino = None
+    
+    try:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        
+        conn_destino = sqlite3.connect(temporario)
+        origem.backup(conn_destino, pages=paginas, progress=progresso, sleep=0.005)
+        
+        # Arquivo autocontido (sem -wal ao lado)
+        conn_destino.execute("PRAGMA journal_mode = DELETE")
+        
+        resultado = conn_destino.execute("PRAGMA quick_check").fetchone()[0]
+        conn_destino.close()
+        conn_destino = None
+        
+        if resultado != 'ok':
+            os.remove(temporario)
+            return False, f"Backup corrompido (quick_check: {resultado})"
+        
+        os.replace(temporario, destino)
+        return True, destino
+    
+    except Exception as e:
+        print(f"❌ Erro ao criar backup: {e}")
+        if conn_destino is not None:
+            conn_destino.close()
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        return False, f"Erro ao criar backup: {e}"
+
+
+class GerenciadorBackup:
+    """
+    Gerencia os backups do banco na pasta de backup
+    
+    - backup_agora(): cópia síncrona (use dentro de threads de trabalho)
+    - backup_em_segundo_plano(): mesma cópia em thread própria (não trava a interface)
+    - podar(): aplica a retenção horária/diária/semanal
+    """
+    
+    def __init__(self, db_path, pasta='backup', retencao=None):
+        self.db_path = db_path
+        self.pasta = pasta
+        self.retencao = retencao or dict(RETENCAO_PADRAO)
+        
+        self._trava = threading.Lock()
+        self.thread = None
+        
+        os.makedirs(self.pasta, exist_ok=True)
+    
+    
+    def novo_caminho(self):
+        """Caminho para um backup com a data/hora atual"""
+        nome = f"{PREFIXO_BACKUP}{datetime.now().strftime(FORMATO_DATA)}.db"
+        return os.path.join(self.pasta, nome)
+    
+    
+    def listar_backups(self):
+        """Lista [(data_hora, caminho)] do mais recente para o mais antigo"""
+        backups = []
+        
+        for nome in os.listdir(self.pasta):
+            if not (nome.startswith(PREFIXO_BACKUP) and nome.endswith('.db')):
+                continue
+            try:
+                data_hora = datetime.strptime(nome[len(PREFIXO_BACKUP):-3], FORMATO_DATA)
+            except ValueError:
+                continue
+            backups.append((data_hora, os.path.join(self.pasta, nome)))
+        
+        backups.sort(reverse=True)
+        return backups
+    
+    
+    def backup_necessario(self, intervalo=3600):
+        """Indica se o último backup tem mais de `intervalo` segundos"""
+        backups = self.listar_backups()
+        if not backups:
+            return True
+        
+        return (datetime.now() - backups[0][0]).total_seconds() >= intervalo
+    
+    
+    def backup_agora(self, destino=None, progresso=None):
+        """
+        Faz o backup imediatamente (bloqueia até terminar)
+        Usa conexão própria - pode ser chamado de qualquer thread
+        progresso(status, restantes, total) é o callback da API de backup (páginas)
+        """
+        destino = destino or self.novo_caminho()
+        pasta_destino = os.path.dirname(destino)
+        if pasta_destino:
+            os.makedirs(pasta_destino, exist_ok=True)
+        
+        with self._trava:
+            origem = abrir_conexao(self.db_path)
+            try:
+                sucesso, resultado = copiar_banco(origem, destino, progresso=progresso)
+            finally:
+                origem.close()
+            
+            if sucesso:
+                self.podar(manter=destino)
+        
+        return sucesso, resultado
+    
+    
+    def backup_em_segundo_plano(self, ao_terminar=None):
+        """
+        Inicia o backup em uma thread (retorna imediatamente)
+        ao_terminar(sucesso, resultado) é chamado NA THREAD - não tocar na interface
+        """
+        if self.thread is not None and self.thread.is_alive():
+            return False
+        
+        def executar():
+            sucesso, resultado = self.backup_agora()
+            if not sucesso:
+                print(f"❌ {resultado}")
+            if ao_terminar:
+                ao_terminar(sucesso, resultado)
+        
+        # Não-daemon: fechar o sistema espera a cópia terminar
+        self.thread = threading.Thread(target=executar, daemon=False)
+        self.thread.start()
+        return True
+    
+    
+    def podar(self, manter=None):
+        """
+        Remove backups fora da retenção
+        Mantém o mais recente de cada uma das últimas N horas, N dias e N semanas
+        """
+        faixas = {
+            'horario': lambda d: (d.year, d.month, d.day, d.hour),
+            'diario': lambda d: (d.year, d.month, d.day),
+            'semanal': lambda d: tuple(d.isocalendar()[:2])
+        }
+        
+        backups = self.listar_backups()
+        manter_caminhos = {os.path.abspath(manter)} if manter else set()
+        
+        # Mais recente sempre fica
+        if backups:
+            manter_caminhos.add(os.path.abspath(backups[0][1]))
+        
+        for faixa, chave in faixas.items():
+            limite = self.retencao.get(faixa, 0)
+            vistos = set()
+            for data_hora, caminho in backups:
+                if len(vistos) >= limite:
+                    break
+                k = chave(data_hora)
+                if k not in vistos:
+                    vistos.add(k)
+                    manter_caminhos.add(os.path.abspath(caminho))
+        
+        removidos = 0
+        for _, caminho in backups:
+            if os.path.abspath(caminho) in manter_caminhos:
+                continue
+            try:
+                os.remove(caminho)
+                removidos += 1
+            except OSError as e:
+                print(f"❌ Erro ao remover backup antigo {caminho}: {e}")
+        
+        return removidos
@@ -0,0 +1,126 @@
+"""
+Conexão SQLite compartilhada - DatabaseManager, GerenciadorVeiculos e
+GerenciadorDestinos usam a mesma conexão (mesma visão transacional do banco)
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+# Espera por locks de outra conexão (ex: importação em segundo plano) antes de falhar
+TIMEOUT_OCUPADO_MS = 10000
+
+# Comandos preparados mantidos em cache por conexão (reaproveitados pelo texto do SQL)
+CACHE_COMANDOS = 256
+
+_conexoes = {}
+_trava = threading.Lock()
+
+
+def abrir_conexao(db_path):
+    """
+    Abre uma conexão configurada (WAL, busy timeout, cache de comandos)
+    Use diretamente apenas em threads de trabalho - na interface use obter_conexao
+    """
+    conn = sqlite3.connect(
+        db_path,
+        timeout=TIMEOUT_OCUPADO_MS / 1000,
+        cached_statements=CACHE_COMANDOS
+    )
+    conn.execute("PRAGMA journal_mode = WAL")  # Leitores não bloqueiam o escritor
+    conn.execute("PRAGMA synchronous = NORMAL")  # Seguro com WAL e bem mais rápido
+    conn.execute(f"PRAGMA busy_timeout = {TIMEOUT_OCUPADO_MS}")
+    conn.execute("PRAGMA foreign_keys = ON")
+    # INSERT OR REPLACE só dispara os triggers de DELETE (resumos) com esta opção
+    conn.execute("PRAGMA recursive_triggers = ON")
+    return conn
+
+
+def obter_conexao(db_path):
+    """Retorna a ConexaoCompartilhada do arquivo (criada no primeiro uso)"""
+    chave = os.path.abspath(db_path)
+    with _trava:
+        if chave not in _conexoes:
+            _conexoes[chave] = ConexaoCompartilhada(db_path)
+        return _conexoes[chave]
+
+
+class ConexaoCompartilhada:
+    """
+    Conexão única por arquivo de banco + unidade de trabalho com notificações
+    
+    - transacao(*tabelas): commit no final (rollback em erro) e avisa quem
+      observa as tabelas alteradas
+    - observar(tabela, callback): callback chamado após mudanças confirmadas
+      naquela tabela (ex: recarregar o cache do gerenciador)
+    """
+    
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = abrir_conexao(db_path)
+        
+        self.observadores = {}  # tabela -> [(callback, dono)]
+        self._alteradas = {}  # tabela -> origem (transação em andamento)
+        self._profundidade = 0
+    
+    
+    def observar(self, tabela, callback, dono=None):
+        """Registra callback para mudanças na tabela (dono = quem não precisa ser avisado das próprias)"""
+        self.observadores.setdefault(tabela, []).append((callback, dono))
+    
+    
+    def notificar(self, *tabelas, origem=None):
+        """Avisa os observadores das tabelas (exceto a própria origem da mudança)"""
+        for tabela in tabelas:
+            for callback, dono in list(self.observadores.get(tabela, [])):
+                if origem is not None and dono is origem:
+                    continue
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"❌ Erro ao notificar mudança em {tabela}: {e}")
+    
+    
+    @contextmanager
+    def transacao(self, *tabelas, origem=None):
+        """
+        Unidade de trabalho: with conexao.transacao('veiculos') as cursor: ...
+        Transações aninhadas fazem parte da externa (um único commit no final)
+        """
+        externa = self._profundidade == 0
+        self._profundidade += 1
+        
+        try:
+            yield self.conn.cursor()
+        except Exception:
+            self._profundidade -= 1
+            if externa:
+                self.conn.rollback()
+                self._alteradas = {}
+            raise
+        
+        self._profundidade -= 1
+        for tabela in tabelas:
+            self._alteradas.setdefault(tabela, origem)
+        
+        if externa:
+            try:
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                self._alteradas = {}
+                raise
+            alteradas, self._alteradas = self._alteradas, {}
+            for tabela, origem_tabela in alteradas.items():
+                self.notificar(tabela, origem=origem_tabela)
+    
+    
+    def checkpoint(self):
+        """Leva o conteúdo do WAL para o arquivo principal (antes de copiar o .db)"""
+        try:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            return True
+        except Exception as e:
+            print(f"❌ Erro no checkpoint: {e}")
+            return False
@@ -1,19 +1,232 @@
 """
 Gerenciamento de dados e persistência - SQLite Integrado
 """
-import sqlite3
 import pandas as pd
 import os
-import shutil
-from datetime import datetime
+import re
+import sqlite3
+from .conexao import obter_conexao
+from .backup import GerenciadorBackup
+from .estatisticas import ServicoEstatisticas
 from .utils import (
-    calcular_dias_manutencao, 
-    calcular_status, 
-    formatar_data_br,
-    limpar_texto
+    calcular_dias_vetorizado,
+    calcular_status_vetorizado,
+    interpretar_periodo,
+    normalizar_data
 )
 
 
+# Mapeia colunas do SQLite para o formato Excel usado no sistema
+MAPA_COLUNAS_SQL = {
+    'data': 'DATA',
+    'placa': 'PLACA',
+    'km': 'KM',
+    'veiculo': 'VEÍCULO',
+    'destino_programado': 'DESTINO PROGRAMADO',
+    'servico_executar': 'SERVIÇO A EXECUTAR',
+    'status': 'STATUS',
+    'data_entrada': 'DATA ENTRADA',
+    'data_saida': 'DATA SAÍDA',
+    'total_dias_manutencao': 'TOTAL DE DIAS EM MANUTENÇÃO',
+    'nr_of': 'NR° OF',
+    'obs': 'OBS'
+}
+
+# Inverso: coluna do formato Excel -> coluna do SQLite (UPDATE a partir do formulário)
+MAPA_COLUNAS_EXCEL = {excel: sql for sql, excel in MAPA_COLUNAS_SQL.items()}
+
+# Colunas de data (texto DD/MM/AAAA) que ganham uma cópia ISO (AAAA-MM-DD) indexável
+COLUNAS_DATA_ISO = {
+    'manutencoes': ['data', 'data_entrada', 'data_saida'],
+    'notas': ['data_programada']
+}
+
+# Colunas lidas para o DataFrame - datas vêm das cópias ISO (formato fixo, conversão rápida);
+# o texto original ({coluna}_texto) só é usado quando a cópia ISO está vazia
+COLUNAS_SELECT = ', '.join(['id'] + [
+    f"{coluna}_iso AS {coluna}" if coluna in COLUNAS_DATA_ISO['manutencoes'] else coluna
+    for coluna in MAPA_COLUNAS_SQL
+] + [f"{coluna} AS {coluna}_texto" for coluna in COLUNAS_DATA_ISO['manutencoes']])
+
+# Máximo de parâmetros por comando em operações em lote (limite antigo do SQLite = 999)
+LOTE_PARAMETROS = 500
+
+# Tipos do DataFrame em memória (texto formatado só na exibição/exportação)
+COLUNAS_DATA = ['DATA', 'DATA ENTRADA', 'DATA SAÍDA']  # datetime64 (NaT = vazia)
+COLUNAS_INTEIRAS = ['KM', 'TOTAL DE DIAS EM MANUTENÇÃO']  # Int64 (aceita vazio)
+COLUNAS_CATEGORIA = ['STATUS', 'VEÍCULO', 'DESTINO PROGRAMADO']  # poucos valores repetidos
+
+# Versão atual do esquema (PRAGMA user_version)
+VERSAO_ESQUEMA = 5
+
+# Colunas que alteram os resumos (triggers de UPDATE só disparam para elas)
+COLUNAS_RESUMO = ['placa', 'veiculo', 'destino_programado', 'data_entrada', 'data_saida', 'total_dias_manutencao']
+
+# Colunas de texto livre da busca (FTS5) e peso de cada uma no ranking (bm25)
+COLUNAS_TEXTO = ['servico_executar', 'obs', 'veiculo', 'destino_programado']
+PESOS_TEXTO = [4.0, 2.0, 1.0, 1.0]
+
+
+def sql_data_iso(coluna):
+    """
+    Expressão SQL que converte DD/MM/AAAA (ou AAAA-MM-DD...) para AAAA-MM-DD
+    Valores vazios ou fora do padrão viram NULL
+    """
+    return f"""CASE
+        WHEN {coluna} GLOB '[0-9][0-9]/[0-9][0-9]/[0-9][0-9][0-9][0-9]*'
+            THEN substr({coluna}, 7, 4) || '-' || substr({coluna}, 4, 2) || '-' || substr({coluna}, 1, 2)
+        WHEN {coluna} GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'
+            THEN substr({coluna}, 1, 10)
+        ELSE NULL
+    END"""
+
+
+def _sql_resumo_linha(linha):
+    """
+    Chaves e valores de uma linha (NEW, OLD ou alias da tabela) para a tabela resumos
+    Retorna ({dimensao: expressão da chave}, expressão de dias, expressão de aberto)
+    """
+    entrada = sql_data_iso(f"{linha}.data_entrada")
+    saida = sql_data_iso(f"{linha}.data_saida")
+    
+    chaves = {
+        'tipo': f"COALESCE(NULLIF(TRIM({linha}.veiculo), ''), '(sem tipo)')",
+        'destino': f"COALESCE(NULLIF(TRIM({linha}.destino_programado), ''), '(sem destino)')",
+        'mes': f"COALESCE(substr({entrada}, 1, 7), '(sem data)')"
+    }
+    dias = f"""CASE WHEN typeof({linha}.total_dias_manutencao) IN ('integer', 'real')
+        THEN {linha}.total_dias_manutencao ELSE 0 END"""
+    aberto = f"(({entrada}) IS NOT NULL AND ({saida}) IS NULL)"
+    
+    return chaves, dias, aberto
+
+
+def sql_somar_resumos(linha, sinal):
+    """
+    Comandos (corpo de trigger) que somam (sinal '+') ou subtraem ('-')
+    a linha NEW/OLD nos contadores da tabela resumos
+    """
+    chaves, dias, aberto = _sql_resumo_linha(linha)
+    comandos = []
+    
+    for dimensao, chave in chaves.items():
+        comandos.append(f"""
+            INSERT INTO resumos (dimensao, chave, registros, dias_total, abertos)
+            VALUES ('{dimensao}', {chave}, {sinal}1, {sinal}({dias}), {sinal}({aberto}))
+            ON CONFLICT (dimensao, chave) DO UPDATE SET
+                registros = registros + excluded.registros,
+                dias_total = dias_total + excluded.dias_total,
+                abertos = abertos + excluded.abertos;""")
+    
+    if sinal == '-':
+        comandos.append("DELETE FROM resumos WHERE registros <= 0;")
+    
+    return '\n'.join(comandos)
+
+
+def sql_recalcular_placa(placa):
+    """
+    Comandos (corpo de trigger) que recalculam as visitas de uma placa
+    Poucas linhas por placa (idx_placa): recalcular é mais simples que manter MIN/MAX
+    """
+    entrada = sql_data_iso('data_entrada')
+    return f"""
+        DELETE FROM resumo_placas WHERE placa = {placa};
+        INSERT INTO resumo_placas (placa, visitas, primeira_entrada, ultima_entrada)
+            SELECT placa, COUNT(*), MIN(entrada), MAX(entrada)
+            FROM (SELECT placa, {entrada} AS entrada FROM manutencoes WHERE placa = {placa})
+            WHERE entrada IS NOT NULL
+            GROUP BY placa;"""
+
+
+def reconstruir_resumos(cursor):
+    """Refaz resumos e resumo_placas a partir de manutencoes (uma passada por dimensão)"""
+    chaves, dias, aberto = _sql_resumo_linha('m')
+    
+    cursor.execute("DELETE FROM resumos")
+    for dimensao, chave in chaves.items():
+        cursor.execute(f"""
+            INSERT INTO resumos (dimensao, chave, registros, dias_total, abertos)
+            SELECT '{dimensao}', {chave}, COUNT(*), SUM({dias}), SUM({aberto})
+            FROM manutencoes m
+            GROUP BY 2
+        """)
+    
+    entrada = sql_data_iso('data_entrada')
+    cursor.execute("DELETE FROM resumo_placas")
+    cursor.execute(f"""
+        INSERT INTO resumo_placas (placa, visitas, primeira_entrada, ultima_entrada)
+        SELECT placa, COUNT(*), MIN(entrada), MAX(entrada)
+        FROM (SELECT placa, {entrada} AS entrada FROM manutencoes)
+        WHERE entrada IS NOT NULL
+        GROUP BY placa
+    """)
+
+
+def montar_consulta_fts(texto):
+    """
+    Converte o texto digitado em consulta FTS5: todas as palavras, cada uma como prefixo
+    ("troca embreag" -> "troca"* "embreag"*). Aspas e operadores digitados são ignorados
+    Retorna None se não houver palavras
+    """
+    palavras = re.findall(r'\w+', texto)
+    if not palavras:
+        return None
+    return ' '.join(f'"{palavra}"*' for palavra in palavras)
+
+
+def _intervalo_prefixo(prefixo):
+    """
+    Intervalo [prefixo, limite) que cobre todos os textos iniciados pelo prefixo
+    Comparação simples no índice (evita LIKE, que não usa idx_placa/idx_status)
+    """
+    limite = prefixo[:-1] + chr(ord(prefixo[-1]) + 1)
+    return prefixo, limite
+
+
+def montar_filtro_sql(filtros):
+    """
+    Traduz os filtros da tela principal para SQL parametrizado
+    
+    - PLACA / STATUS: prefixo (intervalo no idx_placa / idx_status)
+    - VEÍCULO: contém (LIKE)
+    - DATA ENTRADA / DATA SAÍDA: intervalo nas colunas ISO indexadas
+      (DD/MM/AAAA, MM/AAAA, AAAA ou "DD/MM/AAAA a DD/MM/AAAA")
+    
+    Retorna (where, parametros) ou None se algum filtro não puder ser traduzido
+    """
+    condicoes = []
+    parametros = []
+    
+    for campo, valor in filtros.items():
+        valor = str(valor).strip() if valor is not None else ''
+        if not valor:
+            continue
+        
+        if campo in ('PLACA', 'STATUS'):
+            coluna = 'placa' if campo == 'PLACA' else 'status'
+            condicoes.append(f"{coluna} >= ? AND {coluna} < ?")
+            parametros.extend(_intervalo_prefixo(valor.upper()))
+        
+        elif campo == 'VEÍCULO':
+            termo = valor.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            condicoes.append("veiculo LIKE ? ESCAPE '\\'")
+            parametros.append(f"%{termo}%")
+        
+        elif campo in ('DATA ENTRADA', 'DATA SAÍDA'):
+            periodo = interpretar_periodo(valor)
+            if periodo is None:
+                return None
+            coluna = 'data_entrada_iso' if campo == 'DATA ENTRADA' else 'data_saida_iso'
+            condicoes.append(f"{coluna} >= ? AND {coluna} < ?")
+            parametros.extend(periodo)
+        
+        else:
+            return None
+    
+    return ' AND '.join(condicoes), parametros
+
+
 class DatabaseManager:
     """
     Gerencia operações de banco de dados com SQLite
@@ -22,8 +235,10 @@ class DatabaseManager:
     
     def __init__(self, db_path='data/sistema_als.db'):
         self.db_path = db_path
+        self.conexao = None  # ConexaoCompartilhada (mesma dos gerenciadores)
         self.conn = None
         self.df = None  # Mantém compatibilidade com código existente
+        self._ordens = {}  # (coluna, crescente) -> posições ordenadas (limpo a cada escrita)
         
         self.colunas_obrigatorias = [
             'DATA', 'PLACA', 'KM', 'VEÍCULO', 'DESTINO PROGRAMADO',
@@ -36,16 +251,27 @@ class DatabaseManager:
         os.makedirs('output', exist_ok=True)
         os.makedirs('backup', exist_ok=True)
         
+        # Backups com retenção horária/diária/semanal (cópia online, verificada)
+        self.backup = GerenciadorBackup(self.db_path, 'backup')
+        
         self.conectar()
         self.criar_tabelas()
+        self.aplicar_migracoes()
+        self.busca_fts = self._tem_busca_fts()
         self.carregar_dados()
     
     
     def conectar(self):
-        """Conecta ao banco SQLite"""
+        """Conecta ao banco SQLite (conexão compartilhada)"""
         try:
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.execute("PRAGMA foreign_keys = ON")
+            self.conexao = obter_conexao(self.db_path)
+            self.conn = self.conexao.conn
+            
+            # Mudanças feitas por outros (ex: importação) recarregam o cache
+            self.conexao.observar('manutencoes', self.carregar_dados, dono=self)
+            
+            # Estatísticas via SQL, em cache até a próxima escrita
+            self.estatisticas = ServicoEstatisticas(self.conexao)
             return True
         except Exception as e:
             print(f"❌ Erro ao conectar: {e}")
@@ -105,44 +331,414 @@ class DatabaseManager:
             return False
     
     
+    def aplicar_migracoes(self):
+        """
+        Atualiza o esquema do banco conforme PRAGMA user_version
+        Cada migração roda uma única vez por arquivo de banco
+        """
+        migracoes = {
+            1: self._migracao_datas_iso,
+            2: self._migracao_resumos,
+            3: self._migracao_busca_texto,
+            4: self._migracao_normalizar_datas,
+            5: self._migracao_maiusculas,
+        }
+        
+        try:
+            versao = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            
+            # Da versão do arquivo até VERSAO_ESQUEMA, uma transação por migração
+            for numero in range(versao + 1, VERSAO_ESQUEMA + 1):
+                cursor = self.conn.cursor()
+                migracoes[numero](cursor)
+                cursor.execute(f"PRAGMA user_version = {numero}")
+                self.conn.commit()
+            
+            return True
+        except Exception as e:
+            self.conn.rollback()
+            print(f"❌ Erro ao migrar banco: {e}")
+            return False
+    
+    
+    def _migracao_datas_iso(self, cursor):
+        """
+        MIGRAÇÃO 1: colunas de data em ISO (AAAA-MM-DD)
+        As colunas originais continuam em DD/MM/AAAA (exibição/compatibilidade);
+        as cópias *_iso ordenam corretamente e permitem busca por intervalo no índice
+        """
+        for tabela, colunas in COLUNAS_DATA_ISO.items():
+            existentes = {linha[1] for linha in cursor.execute(f"PRAGMA table_info({tabela})")}
+            
+            for coluna in colunas:
+                if f"{coluna}_iso" not in existentes:
+                    cursor.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna}_iso TEXT")
+            
+            # Preenche todas as colunas ISO em uma única passada
+            atribuicoes = ', '.join(f"{coluna}_iso = {sql_data_iso(coluna)}" for coluna in colunas)
+            cursor.execute(f"UPDATE {tabela} SET {atribuicoes}")
+            
+            # Triggers mantêm as colunas ISO sincronizadas em QUALQUER escrita
+            # (formulários, importação, SQL direto)
+            novos = ', '.join(f"{coluna}_iso = {sql_data_iso('NEW.' + coluna)}" for coluna in colunas)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{tabela}_iso_insert
+                AFTER INSERT ON {tabela}
+                BEGIN
+                    UPDATE {tabela} SET {novos} WHERE id = NEW.id;
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{tabela}_iso_update
+                AFTER UPDATE OF {', '.join(colunas)} ON {tabela}
+                BEGIN
+                    UPDATE {tabela} SET {novos} WHERE id = NEW.id;
+                END
+            """)
+        
+        # Índices para ordenação e intervalos de datas
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_data_iso ON manutencoes(data_iso)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_data_entrada_iso ON manutencoes(data_entrada_iso)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_data_saida_iso ON manutencoes(data_saida_iso)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_notas_data_iso ON notas(data_programada_iso)")
+    
+    
+    def _migracao_resumos(self, cursor):
+        """
+        MIGRAÇÃO 2: tabelas de resumo para o painel de indicadores
+        resumos: registros / dias / abertos por tipo, destino e mês de entrada
+        resumo_placas: visitas, primeira e última entrada por placa (intervalo entre visitas)
+        Triggers aplicam só a diferença de cada escrita - o painel não varre manutencoes
+        """
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS resumos (
+                dimensao TEXT NOT NULL,
+                chave TEXT NOT NULL,
+                registros INTEGER NOT NULL DEFAULT 0,
+                dias_total INTEGER NOT NULL DEFAULT 0,
+                abertos INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (dimensao, chave)
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS resumo_placas (
+                placa TEXT PRIMARY KEY,
+                visitas INTEGER NOT NULL,
+                primeira_entrada TEXT,
+                ultima_entrada TEXT
+            ) WITHOUT ROWID
+        """)
+        
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_manutencoes_resumo_insert
+            AFTER INSERT ON manutencoes
+            BEGIN
+                {sql_somar_resumos('NEW', '+')}
+                {sql_recalcular_placa('NEW.placa')}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_manutencoes_resumo_delete
+            AFTER DELETE ON manutencoes
+            BEGIN
+                {sql_somar_resumos('OLD', '-')}
+                {sql_recalcular_placa('OLD.placa')}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_manutencoes_resumo_update
+            AFTER UPDATE OF {', '.join(COLUNAS_RESUMO)} ON manutencoes
+            BEGIN
+                {sql_somar_resumos('OLD', '-')}
+                {sql_somar_resumos('NEW', '+')}
+                {sql_recalcular_placa('OLD.placa')}
+                {sql_recalcular_placa('NEW.placa')}
+            END
+        """)
+        
+        reconstruir_resumos(cursor)
+    
+    
+    def _migracao_busca_texto(self, cursor):
+        """
+        MIGRAÇÃO 3: índice de texto completo (FTS5) de serviço, observação, veículo e destino
+        Tabela de conteúdo externo (o texto fica só em manutencoes) mantida por triggers
+        Sem FTS5 no SQLite a busca por texto usa LIKE (ver buscar_texto)
+        """
+        colunas = ', '.join(COLUNAS_TEXTO)
+        
+        try:
+            cursor.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS manutencoes_fts USING fts5(
+                    {colunas},
+                    content='manutencoes',
+                    content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            print(f"Aviso: SQLite sem FTS5, busca por texto usará LIKE: {e}")
+            return
+        
+        novos = ', '.join(f"NEW.{coluna}" for coluna in COLUNAS_TEXTO)
+        antigos = ', '.join(f"OLD.{coluna}" for coluna in COLUNAS_TEXTO)
+        
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_manutencoes_fts_insert
+            AFTER INSERT ON manutencoes
+            BEGIN
+                INSERT INTO manutencoes_fts (rowid, {colunas}) VALUES (NEW.id, {novos});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_manutencoes_fts_delete
+            AFTER DELETE ON manutencoes
+            BEGIN
+                INSERT INTO manutencoes_fts (manutencoes_fts, rowid, {colunas})
+                VALUES ('delete', OLD.id, {antigos});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_manutencoes_fts_update
+            AFTER UPDATE OF {colunas} ON manutencoes
+            BEGIN
+                INSERT INTO manutencoes_fts (manutencoes_fts, rowid, {colunas})
+                VALUES ('delete', OLD.id, {antigos});
+                INSERT INTO manutencoes_fts (rowid, {colunas}) VALUES (NEW.id, {novos});
+            END
+        """)
+        
+        # Indexa o histórico existente
+        cursor.execute("INSERT INTO manutencoes_fts (manutencoes_fts) VALUES ('rebuild')")
+    
+    
+    def _migracao_normalizar_datas(self, cursor):
+        """
+        MIGRAÇÃO 4: grava como DD/MM/AAAA as datas salvas em outros formatos
+        (1/4/2024, 01-04-2024, 2024-04-01...), que ficavam com a cópia ISO vazia.
+        O UPDATE dispara os triggers: *_iso e resumos são recalculados
+        """
+        for tabela, colunas in COLUNAS_DATA_ISO.items():
+            for coluna in colunas:
+                cursor.execute(f"""
+                    SELECT id, {coluna} FROM {tabela}
+                    WHERE TRIM({coluna}) <> ''
+                      AND {coluna} NOT GLOB '[0-9][0-9]/[0-9][0-9]/[0-9][0-9][0-9][0-9]'
+                """)
+                alterados = []
+                for id_registro, valor in cursor.fetchall():
+                    normalizada = normalizar_data(valor)
+                    if normalizada != valor:
+                        alterados.append((normalizada, id_registro))
+                
+                # OR IGNORE: se já existe a mesma data no padrão (UNIQUE), a linha antiga fica como está
+                cursor.executemany(f"UPDATE OR IGNORE {tabela} SET {coluna} = ? WHERE id = ?", alterados)
+    
+    
+    def _migracao_maiusculas(self, cursor):
+        """
+        MIGRAÇÃO 5: PLACA e STATUS em maiúsculas (o filtro por prefixo compara exato)
+        Feito em Python: o UPPER() do SQLite não converte acentos ('Em serviço')
+        """
+        for coluna in ('status', 'placa'):
+            cursor.execute(f"SELECT DISTINCT {coluna} FROM manutencoes WHERE {coluna} IS NOT NULL")
+            alterados = []
+            for (valor,) in cursor.fetchall():
+                maiusculo = str(valor).strip().upper()
+                if maiusculo != valor:
+                    alterados.append((maiusculo, valor))
+            
+            # OR IGNORE: placa já existente em maiúsculas na mesma data (UNIQUE) fica como está
+            cursor.executemany(f"UPDATE OR IGNORE manutencoes SET {coluna} = ? WHERE {coluna} = ?", alterados)
+    
+    
+    def _tem_busca_fts(self):
+        """Indica se o banco tem o índice manutencoes_fts (SQLite com FTS5)"""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'manutencoes_fts'")
+            return cursor.fetchone() is not None
+        except Exception:
+            return False
+    
+    
     def carregar_dados(self):
         """
         Carrega dados do SQLite para DataFrame (compatibilidade)
         """
         try:
             # Lê do SQLite
-            query = "SELECT * FROM manutencoes ORDER BY data DESC"
-            self.df = pd.read_sql_query(query, self.conn)
-            
-            # Renomeia colunas para formato Excel (maiúsculas com acentos)
-            if not self.df.empty:
-                self.df = self.df.rename(columns={
-                    'data': 'DATA',
-                    'placa': 'PLACA',
-                    'km': 'KM',
-                    'veiculo': 'VEÍCULO',
-                    'destino_programado': 'DESTINO PROGRAMADO',
-                    'servico_executar': 'SERVIÇO A EXECUTAR',
-                    'status': 'STATUS',
-                    'data_entrada': 'DATA ENTRADA',
-                    'data_saida': 'DATA SAÍDA',
-                    'total_dias_manutencao': 'TOTAL DE DIAS EM MANUTENÇÃO',
-                    'nr_of': 'NR° OF',
-                    'obs': 'OBS'
-                })
-                
-                # Remove coluna ID (compatibilidade)
-                if 'id' in self.df.columns:
-                    self.df = self.df.drop(columns=['id'])
-                
-                self.df = self.df.fillna('')
-            else:
-                # Cria DataFrame vazio
-                self.df = pd.DataFrame(columns=self.colunas_obrigatorias)
-                
+            query = f"SELECT {COLUNAS_SELECT} FROM manutencoes ORDER BY data_iso DESC, id DESC"
+            df = pd.read_sql_query(query, self.conn)
+            self.df = self._preparar_dataframe(df)
+            
         except Exception as e:
             print(f"Aviso: {e}")
-            self.df = pd.DataFrame(columns=self.colunas_obrigatorias)
+            self.df = self._dataframe_vazio()
+        
+        self._invalidar_ordenacao()
+    
+    
+    def _invalidar_ordenacao(self):
+        """Descarta as ordenações cacheadas (chamado a cada mudança no DataFrame)"""
+        self._ordens = {}
+    
+    
+    def ordem_por_coluna(self, coluna, crescente=True, indices=None):
+        """
+        Ids de self.df ordenados pela coluna (vazios sempre no fim, ordenação estável)
+        A permutação fica em cache até a próxima escrita - alternar asc/desc não reordena.
+        Se `indices` (ids) for informado, devolve só esses ids (ex: visão filtrada)
+        """
+        chave = (coluna, crescente)
+        if chave not in self._ordens:
+            serie = self.df[coluna]
+            
+            # Categorias acrescentadas depois ficam fora de ordem: compara os rótulos
+            if isinstance(serie.dtype, pd.CategoricalDtype):
+                serie = serie.astype(str)
+            
+            self._ordens[chave] = serie.sort_values(
+                ascending=crescente, na_position='last', kind='stable'
+            ).index.to_numpy()
+        
+        ordem = self._ordens[chave]
+        if indices is not None:
+            ordem = ordem[pd.Index(ordem).isin(indices)]
+        return ordem
+    
+    
+    def _dataframe_vazio(self):
+        """Cria DataFrame vazio com estrutura correta (id + colunas do Excel)"""
+        return self._aplicar_tipos(pd.DataFrame(columns=['id'] + self.colunas_obrigatorias))
+    
+    
+    def _preparar_dataframe(self, df):
+        """
+        Converte linhas lidas do SQLite para o formato Excel usado no sistema
+        """
+        if df.empty:
+            # Cria DataFrame vazio
+            return self._dataframe_vazio()
+        
+        # Renomeia colunas para formato Excel (maiúsculas com acentos)
+        # Mantém o 'id' do SQLite para ligar resultados de consultas às linhas
+        df = df.rename(columns=MAPA_COLUNAS_SQL)
+        
+        return self._aplicar_tipos(df)
+    
+    
+    def _aplicar_tipos(self, df):
+        """
+        Tipos nativos por coluna: datas em datetime64, KM/dias em Int64,
+        STATUS/VEÍCULO/DESTINO em category e o restante texto ('' = vazio)
+        """
+        df['id'] = df['id'].astype('int64')
+        
+        for coluna in COLUNAS_DATA:
+            datas = pd.to_datetime(df[coluna], format='%Y-%m-%d', errors='coerce')
+            
+            # Sem cópia ISO (data gravada fora do padrão): interpreta o texto original
+            texto = f"{MAPA_COLUNAS_EXCEL[coluna]}_texto"
+            if texto in df.columns:
+                originais = df[texto].fillna('').astype(str)
+                faltando = datas.isna() & (originais.str.strip() != '')
+                if faltando.any():
+                    datas[faltando] = pd.to_datetime(
+                        originais[faltando].map(normalizar_data), format='%d/%m/%Y', errors='coerce'
+                    )
+                df = df.drop(columns=texto)
+            
+            df[coluna] = datas
+        
+        for coluna in COLUNAS_INTEIRAS:
+            df[coluna] = pd.to_numeric(df[coluna], errors='coerce').round().astype('Int64')
+        
+        texto = [c for c in df.columns if c not in ['id'] + COLUNAS_DATA + COLUNAS_INTEIRAS]
+        df[texto] = df[texto].fillna('')
+        
+        for coluna in COLUNAS_CATEGORIA:
+            df[coluna] = df[coluna].astype('category')
+        
+        # Índice = id do SQLite: busca por hash (df.loc[id]) que não depende de ordenação/filtro
+        df.index = pd.Index(df['id'].to_numpy())
+        
+        return df
+    
+    
+    def _alinhar_categorias(self, linhas):
+        """
+        Acrescenta às categorias do cache os valores novos de `linhas` e
+        converte `linhas` para as mesmas categorias (concat/atribuição mantêm o tipo)
+        """
+        for coluna in COLUNAS_CATEGORIA:
+            if coluna not in linhas.columns:
+                continue
+            
+            atuais = self.df[coluna].cat.categories
+            valores = pd.Index(linhas[coluna].dropna().unique())
+            novas = valores.difference(atuais)
+            if len(novas):
+                self.df[coluna] = self.df[coluna].cat.add_categories(novas)
+            
+            linhas[coluna] = pd.Categorical(
+                linhas[coluna].astype(object), categories=self.df[coluna].cat.categories
+            )
+        
+        return linhas
+    
+    
+    def _inserir_no_cache(self, id_registro):
+        """
+        Busca APENAS o registro recém-inserido e encaixa no DataFrame
+        na mesma posição que teria após carregar_dados (data_iso DESC, id DESC)
+        """
+        df_novo = pd.read_sql_query(
+            f"SELECT {COLUNAS_SELECT} FROM manutencoes WHERE id = ?", self.conn, params=(id_registro,)
+        )
+        if df_novo.empty:
+            return
+        
+        self._invalidar_ordenacao()
+        linha = self._preparar_dataframe(df_novo)
+        placa = linha.iloc[0]['PLACA']
+        data = linha.iloc[0]['DATA']
+        
+        df = self.df
+        if df is None or df.empty:
+            self.df = linha
+            return
+        
+        # INSERT OR REPLACE apaga o registro antigo com mesma PLACA + DATA
+        mesma_data = df['DATA'].isna() if pd.isna(data) else (df['DATA'] == data)
+        substituido = (df['PLACA'] == placa) & mesma_data
+        if substituido.any():
+            df = df[~substituido]
+        
+        # Posição ordenada: conta no índice quantos registros vêm antes do novo
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT data_iso FROM manutencoes WHERE id = ?", (id_registro,))
+        data_iso = cursor.fetchone()[0]
+        
+        if data_iso is not None:
+            cursor.execute("""
+                SELECT COUNT(*) FROM manutencoes
+                WHERE data_iso > ? OR (data_iso = ? AND id > ?)
+            """, (data_iso, data_iso, id_registro))
+        else:
+            # Datas inválidas (NULL) ficam no fim da ordenação
+            cursor.execute("""
+                SELECT COUNT(*) FROM manutencoes
+                WHERE data_iso IS NOT NULL OR id > ?
+            """, (id_registro,))
+        posicao = min(cursor.fetchone()[0], len(df))
+        
+        # Mesmas categorias nos dois lados: o concat mantém as colunas category
+        self.df = df
+        linha = self._alinhar_categorias(linha)
+        df = self.df
+        
+        self.df = pd.concat([df.iloc[:posicao], linha, df.iloc[posicao:]])
     
     
     def salvar_dados(self):
@@ -154,29 +750,9 @@ class DatabaseManager:
             # Commit final (garantia)
             self.conn.commit()
             
-            # Faz backup do banco (apenas a cada hora para não lotar)
-            if os.path.exists(self.db_path):
-                backup_dir = 'backup'
-                # Verifica último backup
-                backups = [f for f in os.listdir(backup_dir) if f.startswith('database_backup_')]
-                fazer_backup = True
-                
-                if backups:
-                    ultimo_backup = max(backups)
-                    # Extrai timestamp do nome
-                    try:
-                        timestamp_str = ultimo_backup.replace('database_backup_', '').replace('.db', '')
-                        ultimo_timestamp = datetime.strptime(timestamp_str, '%Y%m%d_%H%M%S')
-                        # Só faz backup se passou mais de 1 hora
-                        if (datetime.now() - ultimo_timestamp).seconds < 3600:
-                            fazer_backup = False
-                    except:
-                        pass
-                
-                if fazer_backup:
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    backup_file = f'{backup_dir}/database_backup_{timestamp}.db'
-                    shutil.copy2(self.db_path, backup_file)
+            # Backup online (API de backup do SQLite) em segundo plano, no máximo 1 por hora
+            if os.path.exists(self.db_path) and self.backup.backup_necessario(3600):
+                self.backup.backup_em_segundo_plano()
             
             return True
             
@@ -189,52 +765,64 @@ class DatabaseManager:
         """
         Recalcula APENAS campos automáticos (dias em manutenção)
         NÃO sobrescreve status escolhido pelo usuário
-        ATUALIZA NO SQLITE TAMBÉM
+        ATUALIZA NO SQLITE TAMBÉM (apenas linhas que mudaram, em uma transação)
+        
+        Retorna relatório: {'total', 'dias_alterados', 'status_alterados', 'alterados'}
         """
+        relatorio = {'total': 0, 'dias_alterados': 0, 'status_alterados': 0, 'alterados': 0}
+        
+        if self.df is None or self.df.empty:
+            return relatorio
+        
         try:
-            cursor = self.conn.cursor()
+            relatorio['total'] = len(self.df)
             
-            for idx, row in self.df.iterrows():
-                placa = row['PLACA']
-                data = row['DATA']
-                
-                # Calcula dias em manutenção
-                dias = calcular_dias_manutencao(
-                    row.get('DATA ENTRADA'), 
-                    row.get('DATA SAÍDA')
-                )
-                self.df.at[idx, 'TOTAL DE DIAS EM MANUTENÇÃO'] = dias
-                
-                # Atualiza dias no SQLite
-                cursor.execute("""
-                    UPDATE manutencoes 
-                    SET total_dias_manutencao = ? 
-                    WHERE placa = ? AND data = ?
-                """, (dias, placa, data))
-                
-                # NÃO recalcula status - mantém o que o usuário escolheu
-                # Se o status estiver vazio, aí sim calcula
-                if not row.get('STATUS') or pd.isna(row.get('STATUS')) or row.get('STATUS') == '':
-                    status = calcular_status(
-                        row.get('DATA ENTRADA'),
-                        row.get('DATA SAÍDA'),
-                        ''
-                    )
-                    self.df.at[idx, 'STATUS'] = status
-                    
-                    # Atualiza status no SQLite
-                    cursor.execute("""
-                        UPDATE manutencoes 
-                        SET status = ? 
-                        WHERE placa = ? AND data = ?
-                    """, (status, placa, data))
-            
-            # Commit todas as atualizações
-            self.conn.commit()
+            # 1. CALCULA DIAS PARA A COLUNA INTEIRA (datas convertidas uma única vez)
+            dias_novos = calcular_dias_vetorizado(self.df['DATA ENTRADA'], self.df['DATA SAÍDA'])
+            dias_atuais = self.df['TOTAL DE DIAS EM MANUTENÇÃO']
+            mudou_dias = dias_atuais.ne(dias_novos).fillna(True).astype(bool)
+            
+            # 2. STATUS: só calcula onde está vazio - mantém o que o usuário escolheu
+            status_atual = self.df['STATUS'].astype(object)
+            sem_status = status_atual.isna() | (status_atual.astype(str) == '')
+            status_calculado = calcular_status_vetorizado(self.df['DATA ENTRADA'], self.df['DATA SAÍDA'])
+            mudou_status = sem_status & (status_calculado != '')
+            status_novo = status_atual.where(~mudou_status, status_calculado)
+            
+            alterados = mudou_dias | mudou_status
+            relatorio['dias_alterados'] = int(mudou_dias.sum())
+            relatorio['status_alterados'] = int(mudou_status.sum())
+            relatorio['alterados'] = int(alterados.sum())
+            
+            if not relatorio['alterados']:
+                return relatorio
+            
+            # 3. GRAVA SOMENTE AS LINHAS ALTERADAS (executemany + um commit)
+            linhas = self.df.loc[alterados]
+            parametros = list(zip(
+                dias_novos[alterados].tolist(),
+                status_novo[alterados].tolist(),
+                linhas['id'].tolist()
+            ))
+            
+            with self.conexao.transacao('manutencoes', origem=self) as cursor:
+                cursor.executemany("""
+                    UPDATE manutencoes
+                    SET total_dias_manutencao = ?, status = ?
+                    WHERE id = ?
+                """, parametros)
             
+            # 4. ATUALIZA DATAFRAME
+            self.df.loc[alterados, 'TOTAL DE DIAS EM MANUTENÇÃO'] = dias_novos[alterados]
+            status_novo = self._alinhar_categorias(status_novo.to_frame('STATUS'))['STATUS']
+            self.df.loc[alterados, 'STATUS'] = status_novo[alterados]
+            self._invalidar_ordenacao()
+            
+            return relatorio
+        
         except Exception as e:
-            self.conn.rollback()
             print(f"❌ Erro ao recalcular campos: {e}")
+            return relatorio
     
     
     def adicionar_registro(self, dados):
@@ -242,179 +830,293 @@ class DatabaseManager:
         Adiciona novo registro - SALVA NO BANCO PRIMEIRO
         """
         try:
-            # 1. SALVA NO SQLITE PRIMEIRO
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO manutencoes (
-                    data, placa, km, veiculo, destino_programado,
-                    servico_executar, status, data_entrada, data_saida,
-                    total_dias_manutencao, nr_of, obs
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                dados.get('DATA', ''),
-                dados.get('PLACA', '').upper(),
-                dados.get('KM', 0),
-                dados.get('VEÍCULO', ''),
-                dados.get('DESTINO PROGRAMADO', ''),
-                dados.get('SERVIÇO A EXECUTAR', ''),
-                dados.get('STATUS', ''),
-                dados.get('DATA ENTRADA', ''),
-                dados.get('DATA SAÍDA', ''),
-                dados.get('TOTAL DE DIAS EM MANUTENÇÃO', 0),
-                dados.get('NR° OF', ''),
-                dados.get('OBS', '')
-            ))
-            
-            # 2. COMMIT IMEDIATAMENTE
-            self.conn.commit()
+            # 1. SALVA NO SQLITE PRIMEIRO (commit ao sair do bloco)
+            with self.conexao.transacao('manutencoes', origem=self) as cursor:
+                cursor.execute("""
+                    INSERT OR REPLACE INTO manutencoes (
+                        data, placa, km, veiculo, destino_programado,
+                        servico_executar, status, data_entrada, data_saida,
+                        total_dias_manutencao, nr_of, obs
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    normalizar_data(dados.get('DATA', '')),
+                    dados.get('PLACA', '').upper(),
+                    dados.get('KM', 0),
+                    dados.get('VEÍCULO', ''),
+                    dados.get('DESTINO PROGRAMADO', ''),
+                    dados.get('SERVIÇO A EXECUTAR', ''),
+                    str(dados.get('STATUS', '')).strip().upper(),
+                    normalizar_data(dados.get('DATA ENTRADA', '')),
+                    normalizar_data(dados.get('DATA SAÍDA', '')),
+                    dados.get('TOTAL DE DIAS EM MANUTENÇÃO', 0),
+                    dados.get('NR° OF', ''),
+                    dados.get('OBS', '')
+                ))
+                
+                novo_id = cursor.lastrowid
             
-            # 3. ATUALIZA DATAFRAME
-            self.carregar_dados()
+            # 2. ATUALIZA DATAFRAME (só a linha nova, sem recarregar a tabela)
+            try:
+                self._inserir_no_cache(novo_id)
+            except Exception as e:
+                print(f"Aviso: cache incremental falhou, recarregando: {e}")
+                self.carregar_dados()
             
             return True
             
         except Exception as e:
-            self.conn.rollback()
             print(f"❌ Erro ao adicionar: {e}")
             return False
     
     
-    def atualizar_registro(self, indice, dados):
+    def atualizar_registro(self, id_registro, dados):
         """
-        Atualiza registro existente - SALVA NO BANCO PRIMEIRO
+        Atualiza registro existente (pelo id do SQLite) - SALVA NO BANCO PRIMEIRO
         PRIORIZA STATUS ESCOLHIDO PELO USUÁRIO
         """
         try:
-            # Pega placa e data para identificar o registro
-            placa = self.df.iloc[indice]['PLACA']
-            data = self.df.iloc[indice]['DATA']
+            id_registro = int(id_registro)
             
             # IMPORTANTE: Se o usuário alterou o STATUS, essa mudança TEM PRIORIDADE
             # Não recalcula status automaticamente durante uma edição
             status_usuario = dados.get('STATUS', '').strip().upper()
             
-            # 1. ATUALIZA NO SQLITE PRIMEIRO
-            cursor = self.conn.cursor()
-            
             # Monta UPDATE dinâmico
             campos_update = []
             valores = []
             
             for chave, valor in dados.items():
-                # Mapeia nome da coluna
-                nome_coluna = chave.lower().replace(' ', '_').replace('°', '').replace('ç', 'c')
-                nome_coluna = nome_coluna.replace('destinoprogramado', 'destino_programado')
-                nome_coluna = nome_coluna.replace('servicoaexecutar', 'servico_executar')
-                nome_coluna = nome_coluna.replace('dataentrada', 'data_entrada')
-                nome_coluna = nome_coluna.replace('datasaida', 'data_saida')
-                nome_coluna = nome_coluna.replace('totaldedasemmanutencao', 'total_dias_manutencao')
-                nome_coluna = nome_coluna.replace('nr_of', 'nr_of')
+                # Mapeia nome da coluna (campos desconhecidos são ignorados)
+                nome_coluna = MAPA_COLUNAS_EXCEL.get(chave)
+                if nome_coluna is None:
+                    continue
                 
                 # GARANTIA: Se o usuário escolheu um STATUS, usa ele (não recalcula)
                 if chave == 'STATUS' and status_usuario:
                     campos_update.append(f"{nome_coluna} = ?")
                     valores.append(status_usuario)
+                elif chave == 'PLACA':
+                    campos_update.append(f"{nome_coluna} = ?")
+                    valores.append(str(valor).strip().upper())
+                elif chave in COLUNAS_DATA:
+                    campos_update.append(f"{nome_coluna} = ?")
+                    valores.append(normalizar_data(valor))
                 else:
                     campos_update.append(f"{nome_coluna} = ?")
                     valores.append(valor)
             
             # Adiciona WHERE
-            valores.extend([placa, data])
+            valores.append(id_registro)
             
-            sql = f"UPDATE manutencoes SET {', '.join(campos_update)} WHERE placa = ? AND data = ?"
-            cursor.execute(sql, valores)
+            sql = f"UPDATE manutencoes SET {', '.join(campos_update)} WHERE id = ?"
             
-            # 2. COMMIT IMEDIATAMENTE
-            self.conn.commit()
+            # 1. ATUALIZA NO SQLITE PRIMEIRO (commit ao sair do bloco)
+            with self.conexao.transacao('manutencoes', origem=self) as cursor:
+                cursor.execute(sql, valores)
             
-            # 3. ATUALIZA DATAFRAME (mantém status do usuário)
-            for chave, valor in dados.items():
-                if chave in self.df.columns:
-                    # Garante que status do usuário é preservado
-                    if chave == 'STATUS' and status_usuario:
-                        self.df.at[indice, chave] = status_usuario
-                    else:
-                        self.df.at[indice, chave] = valor
+            # 2. ATUALIZA DATAFRAME (linha relida do banco, já com os tipos do cache)
+            self._recarregar_linha(id_registro)
             
             return True
             
         except Exception as e:
-            self.conn.rollback()
             print(f"❌ Erro ao atualizar: {e}")
             return False
     
     
-    def excluir_registro(self, indice):
+    def _recarregar_linha(self, id_registro):
+        """Relê um registro do SQLite e substitui a linha do mesmo id no cache"""
+        self._invalidar_ordenacao()
+        df_linha = pd.read_sql_query(
+            f"SELECT {COLUNAS_SELECT} FROM manutencoes WHERE id = ?", self.conn, params=(id_registro,)
+        )
+        if df_linha.empty:
+            self.df = self.df.drop(id_registro, errors='ignore')
+            return
+        
+        linha = self._alinhar_categorias(self._preparar_dataframe(df_linha))
+        for coluna in linha.columns:
+            self.df.at[id_registro, coluna] = linha[coluna].iloc[0]
+    
+    
+    def excluir_registro(self, id_registro):
         """
-        Exclui registro - DELETA DO SQLITE PRIMEIRO
+        Exclui registro (pelo id do SQLite) - DELETA DO SQLITE PRIMEIRO
         """
         try:
-            # Pega placa e data para identificar o registro
-            placa = self.df.iloc[indice]['PLACA']
-            data = self.df.iloc[indice]['DATA']
-            
-            # 1. DELETA DO SQLITE PRIMEIRO
-            cursor = self.conn.cursor()
-            cursor.execute("DELETE FROM manutencoes WHERE placa = ? AND data = ?", (placa, data))
+            id_registro = int(id_registro)
             
-            # 2. COMMIT IMEDIATAMENTE
-            self.conn.commit()
+            # 1. DELETA DO SQLITE PRIMEIRO (commit ao sair do bloco)
+            with self.conexao.transacao('manutencoes', origem=self) as cursor:
+                cursor.execute("DELETE FROM manutencoes WHERE id = ?", (id_registro,))
             
-            # 3. ATUALIZA DATAFRAME
-            self.df = self.df.drop(indice).reset_index(drop=True)
+            # 2. ATUALIZA DATAFRAME (as demais linhas mantêm seus ids)
+            self.df = self.df.drop(id_registro, errors='ignore')
+            self._invalidar_ordenacao()
             
             return True
             
         except Exception as e:
-            self.conn.rollback()
             print(f"❌ Erro ao excluir: {e}")
             return False
     
     
+    def excluir_registros(self, ids):
+        """
+        Exclui vários registros (ids do SQLite) em uma única transação
+        DELETE em lotes de IN (...) + um commit; o cache perde as linhas em um único drop
+        Retorna (True, quantidade excluída) ou (False, mensagem)
+        """
+        ids = list(dict.fromkeys(int(i) for i in ids))
+        if not ids:
+            return True, 0
+        
+        try:
+            excluidos = 0
+            
+            # 1. DELETA DO SQLITE (lotes abaixo do limite de parâmetros, um commit no final)
+            with self.conexao.transacao('manutencoes', origem=self) as cursor:
+                for inicio in range(0, len(ids), LOTE_PARAMETROS):
+                    lote = ids[inicio:inicio + LOTE_PARAMETROS]
+                    marcadores = ', '.join('?' * len(lote))
+                    cursor.execute(f"DELETE FROM manutencoes WHERE id IN ({marcadores})", lote)
+                    excluidos += cursor.rowcount
+            
+            # 2. ATUALIZA DATAFRAME (uma operação para todas as linhas)
+            self.df = self.df.drop(ids, errors='ignore')
+            self._invalidar_ordenacao()
+            
+            return True, excluidos
+        
+        except Exception as e:
+            print(f"❌ Erro ao excluir registros: {e}")
+            return False, f"Erro ao excluir registros: {e}"
+    
+    
     def buscar_registros(self, filtros):
         """
         Busca registros com filtros
+        Os filtros viram SQL parametrizado (usa índices); se algum filtro
+        não puder ser traduzido, usa a busca no DataFrame
+        TEXTO (serviço/obs/veículo/destino) usa o índice FTS5 e ordena por relevância
+        """
+        filtros = dict(filtros)
+        texto = str(filtros.pop('TEXTO', '') or '').strip()
+        
+        df_filtrado = self._buscar_registros_campos(filtros)
+        if not texto:
+            return df_filtrado
+        
+        # Mais relevantes primeiro, só entre os que passaram nos demais filtros
+        ids = pd.Index(self.buscar_texto(texto))
+        return df_filtrado.loc[ids.intersection(df_filtrado.index, sort=False)]
+    
+    
+    def _buscar_registros_campos(self, filtros):
+        """Filtros por campo (SQL indexado, ou DataFrame se não traduzir)"""
+        consulta = montar_filtro_sql(filtros)
+        
+        if consulta is not None:
+            try:
+                where, parametros = consulta
+                if not where:
+                    return self.df.copy()
+                
+                cursor = self.conn.cursor()
+                cursor.execute(f"SELECT id FROM manutencoes WHERE {where}", parametros)
+                ids = [linha[0] for linha in cursor.fetchall()]
+                
+                # Mantém a ordem atual do DataFrame; o índice (id) é a chave do grid
+                return self.df[self.df['id'].isin(ids)]
+            except Exception as e:
+                print(f"Aviso: filtro SQL falhou, usando DataFrame: {e}")
+        
+        return self._buscar_registros_dataframe(filtros)
+    
+    
+    def buscar_texto(self, texto, limite=None):
+        """
+        Busca palavras em serviço, obs, veículo e destino em todo o histórico
+        Retorna ids de manutencoes do mais relevante para o menos relevante
+        (FTS5 + bm25; sem FTS5, LIKE com os mais recentes primeiro)
+        """
+        consulta = montar_consulta_fts(texto)
+        if consulta is None:
+            return []
+        
+        limite_sql = " LIMIT ?" if limite else ""
+        extra = [limite] if limite else []
+        cursor = self.conn.cursor()
+        
+        if self.busca_fts:
+            try:
+                pesos = ', '.join(str(peso) for peso in PESOS_TEXTO)
+                cursor.execute(f"""
+                    SELECT rowid FROM manutencoes_fts
+                    WHERE manutencoes_fts MATCH ?
+                    ORDER BY bm25(manutencoes_fts, {pesos})
+                    {limite_sql}
+                """, [consulta] + extra)
+                return [linha[0] for linha in cursor.fetchall()]
+            except Exception as e:
+                print(f"Aviso: busca FTS5 falhou, usando LIKE: {e}")
+        
+        # Alternativa: cada palavra precisa aparecer em alguma das colunas
+        condicoes = []
+        parametros = []
+        for palavra in re.findall(r'\w+', texto):
+            termo = f"%{palavra}%"
+            condicoes.append('(' + ' OR '.join(f"{coluna} LIKE ?" for coluna in COLUNAS_TEXTO) + ')')
+            parametros.extend([termo] * len(COLUNAS_TEXTO))
+        
+        try:
+            cursor.execute(f"""
+                SELECT id FROM manutencoes
+                WHERE {' AND '.join(condicoes)}
+                ORDER BY data_iso DESC, id DESC
+                {limite_sql}
+            """, parametros + extra)
+            return [linha[0] for linha in cursor.fetchall()]
+        except Exception as e:
+            print(f"❌ Erro na busca por texto: {e}")
+            return []
+    
+    
+    def _buscar_registros_dataframe(self, filtros):
+        """
+        Busca registros com filtros direto no DataFrame (alternativa ao SQL)
         """
         df_filtrado = self.df.copy()
         
         for campo, valor in filtros.items():
             if valor and campo in df_filtrado.columns:
+                coluna = df_filtrado[campo]
+                if campo in COLUNAS_DATA:
+                    coluna = coluna.dt.strftime('%d/%m/%Y')  # busca no formato digitado
                 df_filtrado = df_filtrado[
-                    df_filtrado[campo].astype(str).str.contains(str(valor), case=False, na=False)
+                    coluna.astype(str).str.contains(str(valor), case=False, na=False, regex=False)
                 ]
         
         return df_filtrado
     
     
+    def reconstruir_resumos(self):
+        """Refaz as tabelas de resumo do zero (ex: após alterações feitas por fora do sistema)"""
+        try:
+            with self.conexao.transacao('manutencoes', origem=self) as cursor:
+                reconstruir_resumos(cursor)
+            return True
+        except Exception as e:
+            print(f"❌ Erro ao reconstruir resumos: {e}")
+            return False
+    
+    
     def obter_estatisticas(self):
         """
-        Retorna estatísticas gerais
+        Retorna estatísticas gerais (+ por_destino e por_tipo)
+        Calculadas no SQLite e guardadas em cache até a próxima escrita
         """
-        stats = {}
-        
-        # Total de registros
-        stats['total_registros'] = len(self.df)
-        
-        # Veículos em serviço
-        em_servico = len(self.df[self.df['STATUS'].str.upper() == 'EM SERVIÇO'])
-        stats['em_servico'] = em_servico
-        
-        # Finalizados
-        finalizados = len(self.df[self.df['STATUS'].str.upper() == 'FINALIZADO'])
-        stats['finalizados'] = finalizados
-        
-        # Tempo médio de manutenção
-        self.df['TOTAL DE DIAS EM MANUTENÇÃO'] = pd.to_numeric(
-            self.df['TOTAL DE DIAS EM MANUTENÇÃO'], errors='coerce'
-        )
-        tempo_medio = self.df['TOTAL DE DIAS EM MANUTENÇÃO'].mean()
-        stats['tempo_medio'] = tempo_medio if not pd.isna(tempo_medio) else 0
-        
-        # Placas únicas
-        placas_unicas = self.df[self.df['PLACA'] != '']['PLACA'].nunique()
-        stats['placas_unicas'] = placas_unicas
-        
-        return stats
+        return self.estatisticas.obter()
     
     
     def obter_dataframe_exibicao(self):
@@ -424,14 +1126,14 @@ class DatabaseManager:
         df_display = self.df.copy()
         
         # Formata datas
-        for col in ['DATA', 'DATA ENTRADA', 'DATA SAÍDA']:
+        for col in COLUNAS_DATA:
             if col in df_display.columns:
-                df_display[col] = df_display[col].apply(formatar_data_br)
+                df_display[col] = df_display[col].dt.strftime('%d/%m/%Y').fillna('')
         
         # Formata números
+        if 'KM' in df_display.columns:
+            df_display['KM'] = df_display['KM'].astype(object).where(df_display['KM'].notna(), '')
         if 'TOTAL DE DIAS EM MANUTENÇÃO' in df_display.columns:
-            df_display['DIAS'] = df_display['TOTAL DE DIAS EM MANUTENÇÃO'].apply(
-                lambda x: str(int(x)) if pd.notna(x) and x != '' else '0'
-            )
+            df_display['DIAS'] = df_display['TOTAL DE DIAS EM MANUTENÇÃO'].fillna(0).astype(str)
         
         return df_display
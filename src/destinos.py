@@ -1,10 +1,10 @@
 """
 Gestão de Cadastro de Destinos - SQLite Integrado
 """
-import sqlite3
 import pandas as pd
 import os
 from datetime import datetime
+from .conexao import obter_conexao
 
 
 class GerenciadorDestinos:
@@ -15,6 +15,7 @@ class GerenciadorDestinos:
     
     def __init__(self, db_path='data/sistema_als.db'):
         self.db_path = db_path
+        self.conexao = None  # ConexaoCompartilhada (mesma do DatabaseManager)
         self.conn = None
         self.df = None
         
@@ -25,9 +26,13 @@ class GerenciadorDestinos:
     
     
     def conectar(self):
-        """Conecta ao banco SQLite"""
+        """Conecta ao banco SQLite (conexão compartilhada)"""
         try:
-            self.conn = sqlite3.connect(self.db_path)
+            self.conexao = obter_conexao(self.db_path)
+            self.conn = self.conexao.conn
+            
+            # Qualquer mudança confirmada em destinos (inclusive importação) recarrega o cache
+            self.conexao.observar('destinos', self.carregar_destinos, dono=self)
             return True
         except Exception as e:
             print(f"❌ Erro ao conectar: {e}")
@@ -102,20 +107,18 @@ class GerenciadorDestinos:
                     return False, "Destino já cadastrado!"
                 return True, "Destino já existe"
             
-            cursor.execute("""
-                INSERT INTO destinos (nome_destino, data_cadastro, ativo)
-                VALUES (?, ?, 1)
-            """, (nome, datetime.now().strftime('%d/%m/%Y')))
-            
-            self.conn.commit()
-            self.carregar_destinos()
+            # DataFrame recarregado pela notificação
+            with self.conexao.transacao('destinos') as cursor:
+                cursor.execute("""
+                    INSERT INTO destinos (nome_destino, data_cadastro, ativo)
+                    VALUES (?, ?, 1)
+                """, (nome, datetime.now().strftime('%d/%m/%Y')))
             
             if not silencioso:
                 return True, "Destino cadastrado com sucesso!"
             return True, "OK"
             
         except Exception as e:
-            self.conn.rollback()
             if not silencioso:
                 return False, f"Erro: {e}"
             return False, str(e)
@@ -135,18 +138,15 @@ class GerenciadorDestinos:
         try:
             id_destino = self.df.iloc[indice]['id']
             
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                UPDATE destinos 
-                SET nome_destino = ?, ativo = ?
-                WHERE id = ?
-            """, (nome.upper(), 1 if ativo else 0, id_destino))
+            with self.conexao.transacao('destinos') as cursor:
+                cursor.execute("""
+                    UPDATE destinos 
+                    SET nome_destino = ?, ativo = ?
+                    WHERE id = ?
+                """, (nome.upper(), 1 if ativo else 0, id_destino))
             
-            self.conn.commit()
-            self.carregar_destinos()
             return True, "Destino atualizado com sucesso!"
         except Exception as e:
-            self.conn.rollback()
             return False, f"Erro: {e}"
     
     
@@ -154,11 +154,8 @@ class GerenciadorDestinos:
         """Desativa um destino (não exclui, apenas marca como inativo)"""
         try:
             id_destino = self.df.iloc[indice]['id']
-            cursor = self.conn.cursor()
-            cursor.execute("UPDATE destinos SET ativo = 0 WHERE id = ?", (id_destino,))
-            self.conn.commit()
-            self.carregar_destinos()
+            with self.conexao.transacao('destinos') as cursor:
+                cursor.execute("UPDATE destinos SET ativo = 0 WHERE id = ?", (id_destino,))
             return True, "Destino desativado com sucesso!"
         except Exception as e:
-            self.conn.rollback()
             return False, f"Erro: {e}"
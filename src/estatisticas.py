@@ -0,0 +1,179 @@
+"""
+Estatísticas da frota calculadas no SQLite (consulta agrupada + cache)
+"""
+
+
+# UPPER() do SQLite só converte ASCII: 'em serviço' vira 'EM SERVIçO'
+STATUS_EM_SERVICO = ('EM SERVIÇO', 'EM SERVIçO')
+STATUS_FINALIZADO = ('FINALIZADO',)
+
+SEM_DESTINO = '(sem destino)'
+SEM_TIPO = '(sem tipo)'
+
+
+def _lista_sql(valores):
+    """Literal SQL para IN (...) com constantes do módulo"""
+    return ', '.join(f"'{valor}'" for valor in valores)
+
+
+class ServicoEstatisticas:
+    """
+    Estatísticas gerais + quebra por destino e por tipo de veículo
+    
+    Uma única passada agrupada pela tabela (destino x tipo) gera todos os números;
+    totais e quebras são somados em Python sobre os grupos (poucas linhas).
+    O resultado fica em cache até a próxima mudança confirmada em manutencoes/veiculos
+    """
+    
+    def __init__(self, conexao):
+        self.conexao = conexao
+        self.conn = conexao.conn
+        self._cache = None
+        
+        # Qualquer escrita confirmada (formulário, exclusão, importação) invalida o cache
+        self.conexao.observar('manutencoes', self.invalidar, dono=self)
+        self.conexao.observar('veiculos', self.invalidar, dono=self)
+    
+    
+    def invalidar(self):
+        """Descarta o resultado em cache"""
+        self._cache = None
+    
+    
+    def obter(self):
+        """Retorna as estatísticas (do cache quando não houve escrita desde o último cálculo)"""
+        if self._cache is None:
+            try:
+                self._cache = self._calcular()
+            except Exception as e:
+                print(f"Erro ao obter estatísticas: {e}")
+                return self._vazio()
+        return self._cache
+    
+    
+    def _vazio(self):
+        """Estatísticas zeradas (mesmas chaves de obter)"""
+        return {
+            'total_registros': 0,
+            'em_servico': 0,
+            'finalizados': 0,
+            'tempo_medio': 0,
+            'placas_unicas': 0,
+            'por_destino': {},
+            'por_tipo': {}
+        }
+    
+    
+    def _calcular(self):
+        """Consulta agrupada por destino x tipo e soma os grupos"""
+        cursor = self.conn.cursor()
+        
+        # Tipo vem do cadastro de veículos quando existir; senão da coluna VEÍCULO
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'veiculos'")
+        if cursor.fetchone():
+            tipo = "COALESCE(NULLIF(v.tipo_veiculo, ''), NULLIF(m.veiculo, ''), ?)"
+            juncao = "LEFT JOIN veiculos v ON v.placa = m.placa"
+        else:
+            tipo = "COALESCE(NULLIF(m.veiculo, ''), ?)"
+            juncao = ""
+        
+        # Dias só contam quando numéricos (texto vazio não entra na média)
+        dias = "CASE WHEN typeof(m.total_dias_manutencao) IN ('integer', 'real') THEN m.total_dias_manutencao END"
+        
+        cursor.execute(f"""
+            SELECT
+                COALESCE(NULLIF(m.destino_programado, ''), ?) AS destino,
+                {tipo} AS tipo,
+                COUNT(*),
+                SUM(UPPER(m.status) IN ({_lista_sql(STATUS_EM_SERVICO)})),
+                SUM(UPPER(m.status) IN ({_lista_sql(STATUS_FINALIZADO)})),
+                SUM({dias}),
+                COUNT({dias})
+            FROM manutencoes m {juncao}
+            GROUP BY destino, tipo
+        """, (SEM_DESTINO, SEM_TIPO))
+        grupos = cursor.fetchall()
+        
+        # Placas distintas: percorre só o índice idx_placa
+        cursor.execute("SELECT COUNT(DISTINCT placa) FROM manutencoes WHERE placa <> ''")
+        placas_unicas = cursor.fetchone()[0]
+        
+        stats = self._vazio()
+        stats['placas_unicas'] = placas_unicas
+        soma_dias = 0
+        qtd_dias = 0
+        
+        for destino, tipo, total, em_servico, finalizados, dias_soma, dias_qtd in grupos:
+            stats['total_registros'] += total
+            stats['em_servico'] += em_servico or 0
+            stats['finalizados'] += finalizados or 0
+            soma_dias += dias_soma or 0
+            qtd_dias += dias_qtd
+            
+            for quebra, chave in (('por_destino', destino), ('por_tipo', tipo)):
+                item = stats[quebra].setdefault(chave, {
+                    'total': 0, 'em_servico': 0, 'finalizados': 0, '_soma_dias': 0, '_qtd_dias': 0
+                })
+                item['total'] += total
+                item['em_servico'] += em_servico or 0
+                item['finalizados'] += finalizados or 0
+                item['_soma_dias'] += dias_soma or 0
+                item['_qtd_dias'] += dias_qtd
+        
+        stats['tempo_medio'] = soma_dias / qtd_dias if qtd_dias else 0
+        
+        # Média por grupo e ordenação por quantidade de registros
+        for quebra in ('por_destino', 'por_tipo'):
+            for item in stats[quebra].values():
+                soma = item.pop('_soma_dias')
+                qtd = item.pop('_qtd_dias')
+                item['tempo_medio'] = soma / qtd if qtd else 0
+            stats[quebra] = dict(sorted(stats[quebra].items(), key=lambda par: -par[1]['total']))
+        
+        return stats
+    
+    
+    def obter_indicadores(self, limite=20):
+        """
+        Indicadores do painel lidos das tabelas de resumo (mantidas por triggers)
+        + consultas indexadas para os abertos há mais tempo
+        Retorna dict com listas de tuplas prontas para exibir
+        """
+        cursor = self.conn.cursor()
+        indicadores = {}
+        
+        # Tempo parado por tipo / destino (maior primeiro) e por mês (mais recente primeiro)
+        ordens = {'tipo': 'dias_total DESC', 'destino': 'dias_total DESC', 'mes': 'chave DESC'}
+        for dimensao, ordem in ordens.items():
+            cursor.execute(f"""
+                SELECT chave, registros, dias_total, abertos,
+                       ROUND(CAST(dias_total AS REAL) / registros, 1)
+                FROM resumos
+                WHERE dimensao = ? AND registros > 0
+                ORDER BY {ordem}
+            """, (dimensao,))
+            indicadores[f'por_{dimensao}'] = cursor.fetchall()
+        
+        # Intervalo médio entre visitas (estilo MTBF): menor intervalo = volta mais à oficina
+        cursor.execute("""
+            SELECT placa, visitas, primeira_entrada, ultima_entrada,
+                   ROUND((julianday(ultima_entrada) - julianday(primeira_entrada)) / (visitas - 1), 1) AS intervalo
+            FROM resumo_placas
+            WHERE visitas > 1
+            ORDER BY intervalo ASC, visitas DESC
+            LIMIT ?
+        """, (limite,))
+        indicadores['intervalo_visitas'] = cursor.fetchall()
+        
+        # Serviços abertos há mais tempo (idx_data_saida_iso / idx_data_entrada_iso)
+        cursor.execute("""
+            SELECT placa, veiculo, destino_programado, data_entrada,
+                   CAST(julianday('now', 'localtime') - julianday(data_entrada_iso) AS INTEGER) + 1 AS dias
+            FROM manutencoes
+            WHERE data_saida_iso IS NULL AND data_entrada_iso IS NOT NULL
+            ORDER BY data_entrada_iso ASC
+            LIMIT ?
+        """, (limite,))
+        indicadores['abertos'] = cursor.fetchall()
+        
+        return indicadores
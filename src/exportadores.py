@@ -0,0 +1,367 @@
+"""
+Exportação de dados para Excel, PDF e Word
+Funções sem interface (podem rodar em thread): recebem um DataFrame já formatado,
+retornam (True, arquivo) ou (False, mensagem) e reportam progresso à tarefa opcional
+"""
+import os
+import re
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from .tarefas import TarefaCancelada
+from .utils import valor_vazio
+
+
+# Máximo de caracteres por célula (texto maior é cortado)
+LIMITE_CELULA = 30
+
+# Linhas entre avisos de progresso / checagens de cancelamento (Excel e Word)
+LINHAS_POR_AVISO = 500
+
+# Cores do Excel: cabeçalho igual ao PDF/Word, STATUS igual à grade (demais = finalizado)
+COR_CABECALHO = '2C3E50'
+CORES_STATUS = {'EM TRÂNSITO': 'F0F0F0', 'EM SERVIÇO': 'FFF3CD'}
+COR_STATUS_PADRAO = 'D1E7DD'
+
+# Namespace principal do WordprocessingML (document.xml)
+NS_WORD = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+
+# Caracteres de controle não são aceitos em XML
+_CARACTERES_INVALIDOS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _texto_celula(valor, limite=LIMITE_CELULA):
+    """Texto da célula (vazio para None/NaN/NaT)"""
+    if valor_vazio(valor):
+        return ''
+    return str(valor)[:limite]
+
+
+def calcular_larguras(df, largura_total, limite=LIMITE_CELULA, minimo=4):
+    """
+    Larguras das colunas proporcionais ao maior texto de cada uma
+    Calculadas uma vez para o arquivo todo (todos os blocos ficam alinhados)
+    """
+    tamanhos = []
+    for coluna in df.columns:
+        maior = df[coluna].astype(str).str.len().max() if len(df) else 0
+        tamanhos.append(max(minimo, min(max(int(maior), len(str(coluna))), limite)))
+    
+    soma = sum(tamanhos)
+    return [largura_total * tamanho / soma for tamanho in tamanhos]
+
+
+def historia_com_tabela(doc, iniciais, df, finais=(), larguras=None, tarefa=None):
+    """
+    História do documento: flowables iniciais + tabela de df (uma Table por página) + finais
+    Sem larguras, as colunas são proporcionais ao conteúdo
+    """
+    from .tabela_pdf import TabelaEmBlocos
+    
+    larguras = larguras or calcular_larguras(df, doc.width)
+    return [*iniciais, TabelaEmBlocos(df, larguras, tarefa), *finais]
+
+
+def exportar_pdf(df, arquivo, titulo="Relatório de Manutenção - ALS", tarefa=None):
+    """
+    Exporta todas as linhas de df (já formatadas para exibição) para PDF em paisagem
+    Retorna (True, arquivo) ou (False, mensagem); tarefa (opcional) recebe o progresso
+    """
+    try:
+        from reportlab.lib.pagesizes import A4, landscape
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import mm
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    except ImportError:
+        return False, "Biblioteca reportlab não instalada.\nExecute: pip install reportlab"
+    
+    try:
+        doc = SimpleDocTemplate(
+            arquivo,
+            pagesize=landscape(A4),
+            rightMargin=10*mm,
+            leftMargin=10*mm,
+            topMargin=15*mm,
+            bottomMargin=15*mm
+        )
+        
+        styles = getSampleStyleSheet()
+        titulo_style = ParagraphStyle(
+            'Titulo',
+            parent=styles['Heading1'],
+            fontSize=16,
+            alignment=1,  # Centralizado
+            spaceAfter=20
+        )
+        
+        iniciais = [
+            Paragraph(titulo, titulo_style),
+            Paragraph(f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M')}", styles['Normal']),
+            Spacer(1, 10*mm)
+        ]
+        finais = [
+            Spacer(1, 10*mm),
+            Paragraph(f"Total de registros: {len(df)}", styles['Normal'])
+        ]
+        
+        doc.build(historia_com_tabela(doc, iniciais, df, finais, tarefa=tarefa))
+        return True, arquivo
+    
+    except TarefaCancelada:
+        raise
+    except Exception as e:
+        print(f"❌ Erro ao exportar PDF: {e}")
+        return False, f"Erro ao exportar PDF: {e}"
+
+
+def exportar_excel(df, arquivo, tarefa=None):
+    """
+    Exporta df para Excel (planilha 'Manutenção') com o workbook write-only do openpyxl
+    
+    As linhas vão direto para o arquivo (memória constante, qualquer tamanho);
+    larguras calculadas antes com str.len() vetorizado, cabeçalho escuro e
+    célula de STATUS com a mesma cor da grade
+    """
+    try:
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font, PatternFill
+        from openpyxl.utils import get_column_letter
+    except ImportError:
+        return False, "Biblioteca openpyxl não instalada.\nExecute: pip install openpyxl"
+    
+    try:
+        total = len(df)
+        colunas = list(df.columns)
+        
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet('Manutenção')
+        
+        # Larguras precisam ser definidas antes da primeira linha no modo write-only
+        for i, col in enumerate(colunas, start=1):
+            maior = df[col].astype('string').str.len().max() if total else 0
+            maior = 0 if valor_vazio(maior) else int(maior)
+            worksheet.column_dimensions[get_column_letter(i)].width = min(max(maior, len(str(col))) + 2, 50)
+        
+        # Cabeçalho
+        fonte_cabecalho = Font(bold=True, color='FFFFFF')
+        fundo_cabecalho = PatternFill('solid', fgColor=COR_CABECALHO)
+        cabecalho = []
+        for col in colunas:
+            celula = WriteOnlyCell(worksheet, value=str(col))
+            celula.font = fonte_cabecalho
+            celula.fill = fundo_cabecalho
+            cabecalho.append(celula)
+        worksheet.append(cabecalho)
+        
+        # Uma cor por status (objetos de estilo reaproveitados em todas as linhas)
+        fundos_status = {status: PatternFill('solid', fgColor=cor) for status, cor in CORES_STATUS.items()}
+        fundo_padrao = PatternFill('solid', fgColor=COR_STATUS_PADRAO)
+        posicao_status = colunas.index('STATUS') if 'STATUS' in colunas else None
+        
+        for inicio in range(0, total, LINHAS_POR_AVISO):
+            # Vazios (NaN/NA/NaT) viram célula vazia - convertido bloco a bloco
+            # (uma cópia object do df inteiro anularia a economia do write-only)
+            bloco = df.iloc[inicio:inicio + LINHAS_POR_AVISO]
+            bloco = bloco.astype(object).where(bloco.notna(), None)
+            
+            for linha in bloco.itertuples(index=False, name=None):
+                linha = list(linha)
+                
+                if posicao_status is not None:
+                    status = linha[posicao_status]
+                    celula = WriteOnlyCell(worksheet, value=status)
+                    celula.fill = fundos_status.get(str(status or '').upper(), fundo_padrao)
+                    linha[posicao_status] = celula
+                
+                worksheet.append(linha)
+            
+            if tarefa:
+                tarefa.verificar_cancelamento()
+                tarefa.progresso(min(inicio + LINHAS_POR_AVISO, total), total, "Gerando Excel...")
+        
+        workbook.save(arquivo)
+        return True, arquivo
+    
+    except TarefaCancelada:
+        raise
+    except Exception as e:
+        print(f"❌ Erro ao exportar Excel: {e}")
+        return False, f"Erro ao exportar Excel: {e}"
+
+
+def adicionar_linhas_word(tabela, linhas, tamanho_fonte=8, limite=50, tarefa=None, total=None):
+    """
+    Acrescenta linhas a uma tabela do python-docx gerando o XML do corpo direto
+    
+    table.add_row() + cell.text criam vários objetos por célula; aqui cada bloco de
+    LINHAS_POR_AVISO linhas vira um único texto XML (mesmo modelo de célula e de
+    formatação para todas) que é interpretado de uma vez e anexado à tabela
+    """
+    from docx.oxml import parse_xml
+    
+    # Larguras das colunas iguais às do cabeçalho (mesmo tcW que o add_row copiaria)
+    larguras = [
+        f'<w:tcPr><w:tcW w:w="{celula.width.twips}" w:type="dxa"/></w:tcPr>' if celula.width else ''
+        for celula in tabela.rows[0].cells
+    ]
+    formato = (
+        f'<w:rPr><w:sz w:val="{tamanho_fonte * 2}"/><w:szCs w:val="{tamanho_fonte * 2}"/></w:rPr>'
+        if tamanho_fonte else ''  # None = fonte do estilo da tabela
+    )
+    
+    def celula(propriedades, valor):
+        texto = escape(_CARACTERES_INVALIDOS.sub('', _texto_celula(valor, limite)))
+        return (f'<w:tc>{propriedades}<w:p><w:r>{formato}'
+                f'<w:t xml:space="preserve">{texto}</w:t></w:r></w:p></w:tc>')
+    
+    tbl = tabela._tbl
+    bloco = []
+    feitos = 0
+    
+    def anexar():
+        xml = f'<w:tbl xmlns:w="{NS_WORD}">{"".join(bloco)}</w:tbl>'
+        tbl.extend(list(parse_xml(xml)))
+        bloco.clear()
+    
+    for linha in linhas:
+        bloco.append('<w:tr>' + ''.join(map(celula, larguras, linha)) + '</w:tr>')
+        feitos += 1
+        
+        if len(bloco) == LINHAS_POR_AVISO:
+            anexar()
+            if tarefa:
+                tarefa.verificar_cancelamento()
+                tarefa.progresso(feitos, total, "Gerando Word...")
+    
+    if bloco:
+        anexar()
+    
+    return feitos
+
+
+def exportar_word(df, arquivo, tarefa=None):
+    """
+    Exporta df para Word (paisagem, tabela com cabeçalho escuro)
+    """
+    try:
+        from docx import Document
+        from docx.shared import Pt, Cm
+        from docx.enum.table import WD_TABLE_ALIGNMENT
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+        from docx.oxml.ns import nsdecls
+        from docx.oxml import parse_xml
+    except ImportError:
+        return False, "Biblioteca python-docx não instalada.\nExecute: pip install python-docx"
+    
+    try:
+        # Cria documento
+        doc = Document()
+        
+        # Configura página paisagem
+        section = doc.sections[0]
+        section.page_width, section.page_height = section.page_height, section.page_width
+        section.left_margin = Cm(1)
+        section.right_margin = Cm(1)
+        
+        # Título
+        titulo = doc.add_heading('Relatório de Manutenção - ALS', 0)
+        titulo.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        
+        # Data
+        data_para = doc.add_paragraph(f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+        data_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        
+        doc.add_paragraph()  # Espaço
+        
+        # Cria tabela
+        colunas = list(df.columns)
+        tabela = doc.add_table(rows=1, cols=len(colunas))
+        tabela.style = 'Table Grid'
+        tabela.alignment = WD_TABLE_ALIGNMENT.CENTER
+        
+        # Cabeçalho
+        cabecalho = tabela.rows[0].cells
+        for i, col in enumerate(colunas):
+            cabecalho[i].text = col
+            # Cor de fundo azul escuro
+            shading = parse_xml(f'<w:shd {nsdecls("w")} w:fill="2c3e50"/>')
+            cabecalho[i]._tc.get_or_add_tcPr().append(shading)
+            # Texto branco e negrito
+            run = cabecalho[i].paragraphs[0].runs[0]
+            run.bold = True
+            run.font.size = Pt(9)
+        
+        # Dados (XML gerado em blocos; texto limitado a 50 caracteres)
+        total = len(df)
+        adicionar_linhas_word(
+            tabela, df.itertuples(index=False, name=None),
+            tamanho_fonte=8, limite=50, tarefa=tarefa, total=total
+        )
+        
+        # Total
+        doc.add_paragraph()
+        doc.add_paragraph(f"Total de registros: {total}")
+        
+        # Salva documento
+        doc.save(arquivo)
+        return True, arquivo
+    
+    except TarefaCancelada:
+        raise
+    except Exception as e:
+        print(f"❌ Erro ao exportar Word: {e}")
+        return False, f"Erro ao exportar Word: {e}"
+
+
+EXPORTADORES = {
+    'excel': exportar_excel,
+    'pdf': exportar_pdf,
+    'word': exportar_word
+}
+
+
+def gerar_via_temporario(arquivo, gerar):
+    """
+    Chama gerar(temporario) e só renomeia para arquivo se der certo
+    Cancelar ou falhar não deixa arquivo pela metade (nem estraga um arquivo existente)
+    """
+    raiz, extensao = os.path.splitext(arquivo)
+    # Mantém a extensão: se sobrar (ex: queda do programa), o arquivo ainda abre
+    # no Excel/Word/leitor de PDF, que escolhem o formato pela extensão
+    temporario = f"{raiz}.tmp{extensao}"
+    
+    try:
+        sucesso, resultado = gerar(temporario)
+        if sucesso:
+            os.replace(temporario, arquivo)
+            resultado = arquivo
+        return sucesso, resultado
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+def exportar_arquivo(tarefa, formato, df, arquivo):
+    """
+    Corpo da TarefaSegundoPlano de exportação
+    df deve ser uma cópia (a thread não pode ver alterações feitas pela interface)
+    """
+    tarefa.progresso(0, len(df), "Preparando exportação...")
+    return gerar_via_temporario(
+        arquivo, lambda temporario: EXPORTADORES[formato](df, temporario, tarefa=tarefa)
+    )
+
+
+def gerar_relatorio(tarefa, formato, dados, estatisticas, arquivo):
+    """
+    Corpo da TarefaSegundoPlano do Relatório (formato 'pdf' ou 'word')
+    dados deve ser uma cópia, como em exportar_arquivo
+    """
+    from .utils import gerar_relatorio_pdf, gerar_relatorio_word
+    
+    gerar = gerar_relatorio_pdf if formato == 'pdf' else gerar_relatorio_word
+    tarefa.progresso(0, len(dados), "Preparando relatório...")
+    return gerar_via_temporario(
+        arquivo, lambda temporario: gerar(dados, estatisticas, temporario, tarefa=tarefa)
+    )
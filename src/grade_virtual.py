@@ -0,0 +1,318 @@
+"""
+Grade virtual para ttk.Treeview
+Só materializa as linhas visíveis na tela e reaproveita os itens ao rolar
+"""
+import tkinter as tk
+from tkinter import ttk
+
+
+# Bits de event.state
+SHIFT = 0x0001
+CONTROL = 0x0004
+
+
+class GradeVirtual:
+    """
+    Controla um Treeview em modo virtual
+    
+    - chaves: identificador de cada linha (vai na primeira tag do item, como no grid original)
+    - obter_bloco(inicio, fim): retorna [(valores, tag), ...] das linhas inicio..fim-1
+    
+    O Treeview tem sempre um item por linha visível; ao rolar, os mesmos
+    itens recebem novos valores. As linhas próximas da tela ficam formatadas
+    em cache (margem) e são buscadas de novo conforme a rolagem avança.
+    """
+    
+    def __init__(self, tree, scroll_y, margem=30):
+        self.tree = tree
+        self.scroll_y = scroll_y
+        self.margem = margem
+        
+        self.chaves = []
+        self.obter_bloco = None
+        self.inicio = 0
+        self.itens = []  # Itens reaproveitados (um por linha visível)
+        self.desanexados = set()  # Itens escondidos quando há menos linhas que a tela
+        self.cache = {}  # Posição -> (valores, tag) da janela atual + margem
+        
+        # Seleção guardada por chave (continua valendo fora da tela)
+        self.selecionadas = set()
+        self.ancora = None
+        self._posicao_clique = None
+        self._modificadores = 0
+        self._selecao_programada = None
+        
+        # Rolagem passa a ser controlada aqui (não pelo Treeview)
+        self.scroll_y.config(command=self.rolar)
+        self.tree.configure(yscrollcommand=lambda *args: None)
+        
+        self.tree.bind('<Configure>', lambda e: self.redimensionar(), add='+')
+        self.tree.bind('<MouseWheel>', self._roda_mouse, add='+')
+        self.tree.bind('<Button-4>', lambda e: self._rolar_e_parar(-3), add='+')
+        self.tree.bind('<Button-5>', lambda e: self._rolar_e_parar(3), add='+')
+        self.tree.bind('<ButtonPress-1>', self._registrar_clique, add='+')
+        self.tree.bind('<<TreeviewSelect>>', self._ao_selecionar, add='+')
+        
+        for tecla in ('<Up>', '<Down>', '<Prior>', '<Next>', '<Home>', '<End>'):
+            self.tree.bind(tecla, self._teclado)
+    
+    
+    @property
+    def total(self):
+        """Quantidade de linhas na visão atual"""
+        return len(self.chaves)
+    
+    
+    def definir_dados(self, chaves, obter_bloco):
+        """
+        Define as linhas exibidas (substitui a visão inteira)
+        Custo independe da quantidade de linhas: só a tela é formatada
+        """
+        self.chaves = list(chaves)
+        self.obter_bloco = obter_bloco
+        self.cache = {}
+        
+        # Seleção continua valendo apenas para linhas que ainda existem
+        if self.selecionadas:
+            self.selecionadas &= set(self.chaves)
+        
+        self.renderizar()
+    
+    
+    def remover(self, chaves):
+        """
+        Remove linhas pela chave mantendo rolagem, seleção restante e obter_bloco
+        (o chamador ajusta os dados de obter_bloco antes de chamar)
+        """
+        removidas = set(chaves)
+        self.chaves = [chave for chave in self.chaves if chave not in removidas]
+        self.selecionadas -= removidas
+        self.ancora = None  # âncora é posição: deixa de valer
+        
+        # Posições mudaram: só a janela visível é reformatada
+        self.cache = {}
+        self.renderizar()
+    
+    
+    def atualizar(self):
+        """Reformata as linhas visíveis (ex: após mudar a ordem das colunas)"""
+        self.cache = {}
+        self.renderizar()
+    
+    
+    def chaves_selecionadas(self):
+        """Chaves selecionadas na ordem de exibição (inclusive fora da tela)"""
+        if not self.selecionadas:
+            return []
+        return [chave for chave in self.chaves if chave in self.selecionadas]
+    
+    
+    def limpar_selecao(self):
+        """Remove toda a seleção"""
+        self.selecionadas = set()
+        self.ancora = None
+        self.renderizar()
+    
+    
+    def redimensionar(self):
+        """Ajusta a quantidade de itens reaproveitados ao tamanho da tela"""
+        necessarios = self._linhas_visiveis()
+        
+        while len(self.itens) < necessarios:
+            self.itens.append(self.tree.insert('', tk.END))
+        
+        while len(self.itens) > necessarios:
+            item = self.itens.pop()
+            self.desanexados.discard(item)
+            self.tree.delete(item)
+        
+        self.renderizar()
+    
+    
+    def _linhas_visiveis(self):
+        """Quantas linhas cabem na área do Treeview"""
+        try:
+            altura_linha = int(float(ttk.Style().lookup('Treeview', 'rowheight') or 20))
+        except (tk.TclError, ValueError):
+            altura_linha = 20
+        
+        # Altura do cabeçalho: posição do primeiro item visível
+        cabecalho = altura_linha
+        for item in self.itens:
+            if item not in self.desanexados:
+                caixa = self.tree.bbox(item)
+                if caixa:
+                    cabecalho = caixa[1]
+                break
+        
+        altura = self.tree.winfo_height()
+        return max(1, (altura - cabecalho) // altura_linha)
+    
+    
+    def _preparar_cache(self, inicio, fim):
+        """Garante as linhas inicio..fim-1 formatadas (busca a tela + margem)"""
+        if all(posicao in self.cache for posicao in range(inicio, fim)):
+            return
+        
+        janela_inicio = max(0, inicio - self.margem)
+        janela_fim = min(self.total, fim + self.margem)
+        
+        linhas = self.obter_bloco(janela_inicio, janela_fim) if self.obter_bloco else []
+        self.cache = {janela_inicio + i: linha for i, linha in enumerate(linhas)}
+    
+    
+    def renderizar(self):
+        """Preenche os itens reaproveitados com as linhas da posição atual"""
+        total = self.total
+        visiveis = len(self.itens)
+        self.inicio = max(0, min(self.inicio, total - visiveis))
+        fim = min(total, self.inicio + visiveis)
+        
+        self._preparar_cache(self.inicio, fim)
+        
+        itens_selecionados = []
+        chaves_selecionadas = set()
+        
+        for i, item in enumerate(self.itens):
+            posicao = self.inicio + i
+            
+            if posicao >= total:
+                if item not in self.desanexados:
+                    self.tree.detach(item)
+                    self.desanexados.add(item)
+                continue
+            
+            if item in self.desanexados:
+                self.tree.move(item, '', i)
+                self.desanexados.discard(item)
+            
+            valores, tag = self.cache[posicao]
+            chave = self.chaves[posicao]
+            self.tree.item(item, values=valores, tags=(chave, tag))
+            
+            if chave in self.selecionadas:
+                itens_selecionados.append(item)
+                chaves_selecionadas.add(chave)
+        
+        # Reaplica a seleção guardada por chave nos itens reaproveitados
+        atual = set(self.tree.selection())
+        if atual != set(itens_selecionados):
+            self._selecao_programada = chaves_selecionadas
+            self.tree.selection_set(itens_selecionados)
+        
+        self.tree.yview_moveto(0)
+        
+        if total:
+            self.scroll_y.set(self.inicio / total, fim / total)
+        else:
+            self.scroll_y.set(0, 1)
+    
+    
+    def rolar(self, acao, quantidade, unidade=None):
+        """Comando da barra de rolagem (moveto / scroll)"""
+        visiveis = max(1, len(self.itens))
+        
+        if acao == 'moveto':
+            self.inicio = int(float(quantidade) * self.total)
+        elif acao == 'scroll':
+            passo = int(quantidade)
+            self.inicio += passo * visiveis if unidade == 'pages' else passo
+        
+        self.renderizar()
+    
+    
+    def ver(self, posicao):
+        """Rola o mínimo necessário para a linha ficar visível"""
+        visiveis = max(1, len(self.itens))
+        
+        if posicao < self.inicio:
+            self.inicio = posicao
+        elif posicao >= self.inicio + visiveis:
+            self.inicio = posicao - visiveis + 1
+    
+    
+    def _rolar_e_parar(self, linhas):
+        self.rolar('scroll', linhas, 'units')
+        return 'break'
+    
+    
+    def _roda_mouse(self, event):
+        """Roda do mouse (Windows: múltiplos de 120 | macOS: valores pequenos)"""
+        if abs(event.delta) >= 120:
+            linhas = -int(event.delta / 120) * 3
+        else:
+            linhas = -event.delta
+        return self._rolar_e_parar(linhas)
+    
+    
+    def _posicao_item(self, item):
+        """Posição na visão da linha mostrada por um item (None se não for do grid)"""
+        if item in self.itens and item not in self.desanexados:
+            return self.inicio + self.itens.index(item)
+        return None
+    
+    
+    def _registrar_clique(self, event):
+        """Guarda teclas modificadoras e a linha clicada (para Ctrl/Shift)"""
+        self._modificadores = event.state
+        self._posicao_clique = self._posicao_item(self.tree.identify_row(event.y))
+        
+        if self._posicao_clique is not None and not event.state & SHIFT:
+            self.ancora = self._posicao_clique
+    
+    
+    def _ao_selecionar(self, event=None):
+        """Converte a seleção dos itens visíveis em seleção por chave"""
+        visiveis = set()
+        for item in self.tree.selection():
+            posicao = self._posicao_item(item)
+            if posicao is not None:
+                visiveis.add(self.chaves[posicao])
+        
+        # Evento gerado pela própria renderização
+        if self._selecao_programada is not None:
+            esperado = self._selecao_programada
+            self._selecao_programada = None
+            if visiveis == esperado:
+                return
+        
+        na_tela = set(self.chaves[self.inicio:self.inicio + len(self.itens)])
+        
+        if self._modificadores & SHIFT and self.ancora is not None and self._posicao_clique is not None:
+            # Intervalo lógico (pode começar fora da tela)
+            de, ate = sorted((self.ancora, self._posicao_clique))
+            self.selecionadas = set(self.chaves[de:ate + 1])
+            self._modificadores = 0
+            self.renderizar()
+        elif self._modificadores & CONTROL:
+            self.selecionadas = (self.selecionadas - na_tela) | visiveis
+        else:
+            self.selecionadas = visiveis
+    
+    
+    def _teclado(self, event):
+        """Navegação por teclado sobre a visão inteira"""
+        if not self.total:
+            return 'break'
+        
+        visiveis = max(1, len(self.itens))
+        atual = self.ancora if self.ancora is not None else self.inicio
+        
+        deslocamentos = {'Up': -1, 'Down': 1, 'Prior': -visiveis, 'Next': visiveis}
+        if event.keysym == 'Home':
+            nova = 0
+        elif event.keysym == 'End':
+            nova = self.total - 1
+        else:
+            nova = atual + deslocamentos.get(event.keysym, 0)
+        
+        nova = max(0, min(self.total - 1, nova))
+        
+        self.ancora = nova
+        self.selecionadas = {self.chaves[nova]}
+        self.ver(nova)
+        self.renderizar()
+        
+        item = self.itens[nova - self.inicio]
+        self.tree.focus(item)
+        return 'break'
@@ -2,473 +2,417 @@
 Sistema de Importação de Dados - VERSÃO SQLITE
 Importa APENAS registros com PLACA e DATA preenchidos
 AUTO-CADASTRA VEÍCULOS automaticamente durante importação
+pandas é importado dentro das funções que o usam
 """
-import pandas as pd
 import os
-from datetime import datetime
-from tkinter import messagebox
-from .utils import limpar_texto
+import shutil
+import tempfile
+from datetime import datetime, date
+from .utils import normalizar_data
+from .database import MAPA_COLUNAS_SQL
+from .conexao import abrir_conexao
+from .backup import GerenciadorBackup
+from .tarefas import TarefaCancelada
 
 
-class ImportadorDados:
+# Colunas da tabela temporária de importação (linha = número da linha no Excel)
+COLUNAS_LOTE = ['linha'] + list(MAPA_COLUNAS_SQL)
+
+# Linhas por executemany ao carregar a tabela temporária (progresso/cancelamento entre blocos)
+TAMANHO_BLOCO = 2000
+
+
+def _texto(serie):
+    """Coluna como texto sem espaços nas pontas (nulos viram vazio)"""
+    return serie.fillna('').astype(str).str.strip()
+
+
+def _datas_texto(serie):
     """
-    Gerencia importação de dados de planilhas externas
-    REGRA SIMPLES: Só importa se PLACA e DATA estiverem preenchidos
+    Converte coluna de datas do Excel para texto DD/MM/AAAA
+    Células de data e textos em outros formatos (5/6/2024, 05-06-2024) viram DD/MM/AAAA;
+    textos que não são data são mantidos como estão
     """
+    import pandas as pd
     
-    def __init__(self, database_manager, gerenciador_veiculos=None, gerenciador_destinos=None):
-        self.db = database_manager
-        self.gerenciador_veiculos = gerenciador_veiculos
-        self.gerenciador_destinos = gerenciador_destinos
-        self.relatorio_importacao = {
-            'total_linhas': 0,
-            'linhas_validas': 0,
-            'linhas_ignoradas': 0,
-            'importados': 0,
-            'duplicados': 0,
-            'veiculos_cadastrados': 0,  # AUTO-CADASTRO
-            'destinos_cadastrados': 0,  # AUTO-CADASTRO
-            'erros': 0,
-            'detalhes': []
-        }
-    
-    
-    def validar_planilha(self, df_importar):
-        """
-        Valida se a planilha tem as colunas PLACA e DATA
-        """
-        # Remove colunas "Unnamed" (colunas extras do Excel)
-        colunas_unnamed = [col for col in df_importar.columns if str(col).startswith('Unnamed')]
-        if colunas_unnamed:
-            df_importar = df_importar.drop(columns=colunas_unnamed)
-        
-        colunas_necessarias = ['PLACA', 'DATA']
-        colunas_faltando = []
-        
-        for col in colunas_necessarias:
-            if col not in df_importar.columns:
-                colunas_faltando.append(col)
-        
-        if colunas_faltando:
-            return False, f"❌ Colunas obrigatórias não encontradas: {', '.join(colunas_faltando)}\n\nA planilha deve ter as colunas PLACA e DATA."
-        
-        return True, "Planilha válida"
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie.dt.strftime('%d/%m/%Y').fillna('')
     
+    texto = _texto(serie)
     
-    def normalizar_colunas(self, df_importar):
-        """
-        Garante que todas as colunas obrigatórias existem
-        """
-        # Remove colunas Unnamed
-        colunas_unnamed = [col for col in df_importar.columns if str(col).startswith('Unnamed')]
-        if colunas_unnamed:
-            df_importar = df_importar.drop(columns=colunas_unnamed)
-        
-        # Adiciona colunas faltantes com valores vazios
-        for col in self.db.colunas_obrigatorias:
-            if col not in df_importar.columns:
-                df_importar[col] = ''
-        
-        # Reordena colunas para corresponder ao sistema
-        df_importar = df_importar[self.db.colunas_obrigatorias]
-        
-        return df_importar
+    # Coluna mista (datas + textos): converte só as células de data
+    e_data = serie.map(lambda valor: isinstance(valor, (datetime, date)))
+    if e_data.any():
+        texto[e_data] = pd.to_datetime(serie[e_data]).dt.strftime('%d/%m/%Y')
     
+    # Só os textos fora do padrão passam pela conversão célula a célula
+    fora_padrao = (texto != '') & ~texto.str.fullmatch(r'\d{2}/\d{2}/\d{4}')
+    if fora_padrao.any():
+        texto[fora_padrao] = texto[fora_padrao].map(normalizar_data)
     
-    def limpar_dados(self, df_importar):
-        """
-        Limpa dados e REMOVE linhas sem PLACA ou DATA
-        REGRA SIMPLES: Sem PLACA ou DATA = NÃO IMPORTA
-        """
-        # Remove linhas completamente vazias
-        df_importar = df_importar.dropna(how='all')
-        
-        # Preenche valores nulos com string vazia
-        df_importar = df_importar.fillna('')
-        
-        # **FILTRO PRINCIPAL: Remove registros SEM PLACA ou SEM DATA**
-        total_antes = len(df_importar)
+    return texto
+
+
+def normalizar_planilha(df_excel, obrigatorias=('placa', 'data', 'data_entrada')):
+    """
+    Normaliza a planilha inteira de uma vez (operações vetorizadas)
+    
+    Retorna (registros, incompletos):
+    - registros: linhas com todos os campos obrigatórios, já com nomes de colunas do SQLite
+    - incompletos: linhas com algum obrigatório vazio (linhas totalmente vazias são descartadas)
+    """
+    import pandas as pd
+    
+    df = df_excel.copy()
+    df.columns = df.columns.astype(str).str.strip()
+    
+    # Colunas ausentes na planilha ficam vazias
+    for col in MAPA_COLUNAS_SQL.values():
+        if col not in df.columns:
+            df[col] = None
+    
+    registros = pd.DataFrame({
+        'linha': df.index + 2,
+        'data': _datas_texto(df['DATA']),
+        'placa': _texto(df['PLACA']).str.upper(),
+        'km': pd.to_numeric(df['KM'], errors='coerce').fillna(0).astype('int64'),
+        'veiculo': _texto(df['VEÍCULO']),
+        'destino_programado': _texto(df['DESTINO PROGRAMADO']),
+        'servico_executar': _texto(df['SERVIÇO A EXECUTAR']),
+        'status': _texto(df['STATUS']).str.upper(),
+        'data_entrada': _datas_texto(df['DATA ENTRADA']),
+        'data_saida': _datas_texto(df['DATA SAÍDA']),
+        'total_dias_manutencao': pd.to_numeric(
+            df['TOTAL DE DIAS EM MANUTENÇÃO'], errors='coerce'
+        ).fillna(0).astype('int64'),
+        'nr_of': _texto(df['NR° OF']),
+        'obs': _texto(df['OBS'])
+    })
+    
+    preenchidos = registros[list(obrigatorias)] != ''
+    completos = preenchidos.all(axis=1)
+    vazios = ~preenchidos.any(axis=1)
+    
+    return registros[completos], registros[~completos & ~vazios]
+
+
+class LeitorPlanilha:
+    """
+    Lê a planilha em blocos sem carregar o arquivo inteiro na memória
+    
+    Usa o modo somente-leitura do openpyxl (.xlsx); cada bloco é um DataFrame
+    com os nomes de colunas da planilha (cabeçalho na linha 2, formato ALS).
+    Arquivos .xls (sem suporte a streaming) são lidos inteiros e divididos em blocos.
+    """
+    
+    def __init__(self, arquivo, tamanho_bloco=TAMANHO_BLOCO, linha_cabecalho=2):
+        self.arquivo = arquivo
+        self.tamanho_bloco = tamanho_bloco
+        self.linha_cabecalho = linha_cabecalho
         
-        # Remove se PLACA estiver vazia
-        df_importar = df_importar[df_importar['PLACA'].astype(str).str.strip() != '']
+        self.workbook = None
+        self.df_completo = None
         
-        # Remove se DATA estiver vazia
-        df_importar = df_importar[df_importar['DATA'].astype(str).str.strip() != '']
+        if arquivo.lower().endswith('.xls'):
+            import pandas as pd
+            self.df_completo = pd.read_excel(arquivo, header=linha_cabecalho - 1)
+            self.total_linhas = len(self.df_completo)
+        else:
+            from openpyxl import load_workbook
+            self.workbook = load_workbook(arquivo, read_only=True, data_only=True)
+            self.planilha = self.workbook.worksheets[0]
+            # Estimativa (dimensão gravada no arquivo) - só para a barra de progresso
+            self.total_linhas = max(0, (self.planilha.max_row or 0) - linha_cabecalho)
+    
+    
+    def __iter__(self):
+        if self.df_completo is not None:
+            for inicio in range(0, len(self.df_completo), self.tamanho_bloco):
+                yield self.df_completo.iloc[inicio:inicio + self.tamanho_bloco]
+            return
         
-        total_depois = len(df_importar)
-        linhas_removidas = total_antes - total_depois
+        linhas = self.planilha.iter_rows(min_row=self.linha_cabecalho, values_only=True)
         
-        if linhas_removidas > 0:
-            self.relatorio_importacao['linhas_ignoradas'] = linhas_removidas
-            self.relatorio_importacao['detalhes'].append(
-                f"🗑️ {linhas_removidas} linhas ignoradas (sem PLACA ou DATA)"
-            )
+        cabecalho = next(linhas, None)
+        if cabecalho is None:
+            return
         
-        self.relatorio_importacao['linhas_validas'] = total_depois
+        colunas = [
+            str(nome).strip() if nome is not None else f"Unnamed: {i}"
+            for i, nome in enumerate(cabecalho)
+        ]
         
-        # Limpa espaços em branco excessivos
-        for col in df_importar.columns:
-            if df_importar[col].dtype == 'object':  # Apenas colunas de texto
-                df_importar[col] = df_importar[col].astype(str).str.strip()
+        # Índice = posição da linha de dados (mesma numeração do pd.read_excel)
+        posicao = 0
+        bloco = []
+        for linha in linhas:
+            bloco.append(linha)
+            if len(bloco) >= self.tamanho_bloco:
+                yield self._montar_bloco(bloco, colunas, posicao)
+                posicao += len(bloco)
+                bloco = []
         
-        # Converte PLACA para maiúsculas
-        df_importar['PLACA'] = df_importar['PLACA'].str.upper()
+        if bloco:
+            yield self._montar_bloco(bloco, colunas, posicao)
+    
+    
+    def _montar_bloco(self, linhas, colunas, posicao):
+        """DataFrame do bloco (linhas mais curtas que o cabeçalho são completadas)"""
+        import pandas as pd
         
-        return df_importar
+        largura = len(colunas)
+        linhas = [tuple(linha[:largura]) + (None,) * (largura - len(linha)) for linha in linhas]
+        return pd.DataFrame.from_records(
+            linhas,
+            columns=colunas,
+            index=pd.RangeIndex(posicao, posicao + len(linhas))
+        )
+    
+    
+    def fechar(self):
+        """Libera o arquivo"""
+        if self.workbook is not None:
+            self.workbook.close()
+            self.workbook = None
+
+
+def _criar_tabela_lote(cursor):
+    """Tabela temporária onde cada bloco é carregado antes de ir para manutencoes"""
+    cursor.execute(f"""
+        CREATE TEMP TABLE IF NOT EXISTS importacao_lote (
+            linha INTEGER,
+            {', '.join(MAPA_COLUNAS_SQL)}
+        )
+    """)
+
+
+def _gravar_bloco(cursor, registros, modo, agora):
+    """
+    Carrega um bloco na tabela temporária (um executemany) e resolve o modo com SQL em conjunto
+    Retorna contagens do bloco (não faz commit)
+    """
+    lista_colunas = ', '.join(MAPA_COLUNAS_SQL)
+    
+    cursor.execute("DELETE FROM temp.importacao_lote")
+    cursor.executemany(
+        f"INSERT INTO temp.importacao_lote ({', '.join(COLUNAS_LOTE)}) "
+        f"VALUES ({', '.join('?' * len(COLUNAS_LOTE))})",
+        registros[COLUNAS_LOTE].itertuples(index=False, name=None)
+    )
+    
+    atualizados = 0
+    if modo == 'atualizar':
+        cursor.execute("""
+            UPDATE manutencoes SET
+                km = lote.km,
+                veiculo = lote.veiculo,
+                destino_programado = lote.destino_programado,
+                servico_executar = lote.servico_executar,
+                status = lote.status,
+                data_saida = lote.data_saida,
+                total_dias_manutencao = lote.total_dias_manutencao,
+                nr_of = lote.nr_of,
+                obs = lote.obs
+            FROM temp.importacao_lote AS lote
+            WHERE manutencoes.placa = lote.placa
+              AND manutencoes.data = lote.data
+              AND manutencoes.data_entrada = lote.data_entrada
+        """)
+        atualizados = cursor.rowcount
+    
+    # Novos registros (PLACA + DATA já existentes são ignorados)
+    cursor.execute(f"""
+        INSERT OR IGNORE INTO manutencoes ({lista_colunas})
+        SELECT {lista_colunas} FROM temp.importacao_lote
+        ORDER BY linha
+    """)
+    novos = cursor.rowcount
+    
+    # Auto-cadastra veículos
+    cursor.execute("""
+        INSERT OR IGNORE INTO veiculos (placa, tipo_veiculo, descricao, data_cadastro)
+        SELECT placa, MIN(veiculo), 'Importado do Excel', ?
+        FROM temp.importacao_lote
+        GROUP BY placa
+    """, (agora,))
+    veiculos_novos = cursor.rowcount
+    
+    # Auto-cadastra destinos
+    cursor.execute("""
+        INSERT OR IGNORE INTO destinos (nome_destino, data_cadastro)
+        SELECT DISTINCT destino_programado, ?
+        FROM temp.importacao_lote
+        WHERE destino_programado != ''
+    """, (agora,))
+    destinos_novos = cursor.rowcount
+    
+    return {
+        'novos': novos,
+        'atualizados': atualizados,
+        'ignorados': len(registros) - novos - atualizados,
+        'veiculos_novos': veiculos_novos,
+        'destinos_novos': destinos_novos
+    }
+
+
+def gravar_blocos(conn, blocos, modo, tarefa=None, total=None, commit_por_bloco=False):
+    """
+    Grava blocos de registros normalizados (iterável de (registros, linhas_lidas))
+    
+    - 'novo': INSERT OR IGNORE ... SELECT (duplicados são ignorados)
+    - 'atualizar': UPDATE ... FROM (mesma PLACA + DATA + DATA ENTRADA) e depois insere os novos
+    - 'substituir': apaga manutenções e notas e insere tudo (sempre em uma única transação)
+    
+    commit_por_bloco=True grava cada bloco assim que processado (memória constante e
+    primeiros registros já salvos); cancelar/erro desfaz apenas o bloco em andamento.
+    Sem ele, tudo fica em uma transação e cancelar/erro desfaz tudo.
+    
+    Com uma TarefaSegundoPlano, reporta linhas lidas e atende o cancelamento
+    (inclusive no meio de um comando SQL longo) - cancelado = rollback +
+    TarefaCancelada(contagens já gravadas)
+    
+    Retorna (True, contagens) ou (False, mensagem de erro)
+    """
+    agora = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    contagens = {'novos': 0, 'atualizados': 0, 'ignorados': 0, 'veiculos_novos': 0, 'destinos_novos': 0}
+    confirmados = dict(contagens)  # Contagens já gravadas (commit_por_bloco)
+    
+    # Substituir nunca pode ficar pela metade
+    if modo == 'substituir':
+        commit_por_bloco = False
     
+    cursor = conn.cursor()
     
-    def identificar_duplicatas(self, df_importar):
-        """
-        Identifica registros que já existem no sistema
-        Critério: mesma PLACA + mesma DATA
-        """
-        if self.db.df.empty:
-            return df_importar, pd.DataFrame()
+    # Interrompe o comando em andamento se o cancelamento for pedido
+    if tarefa:
+        conn.set_progress_handler(lambda: 1 if tarefa.cancelado else 0, 10000)
+    
+    try:
+        _criar_tabela_lote(cursor)
         
-        # Cria chave única: PLACA + DATA
-        df_importar['_chave'] = df_importar['PLACA'].astype(str) + '_' + df_importar['DATA'].astype(str)
-        self.db.df['_chave'] = self.db.df['PLACA'].astype(str) + '_' + self.db.df['DATA'].astype(str)
+        if modo == 'substituir':
+            cursor.execute("DELETE FROM manutencoes")
+            cursor.execute("DELETE FROM notas")
         
-        # Separa novos de duplicados
-        chaves_existentes = self.db.df['_chave'].values
-        mascara_novos = ~df_importar['_chave'].isin(chaves_existentes)
+        for registros, linhas_lidas in blocos:
+            if tarefa:
+                tarefa.verificar_cancelamento()
+            
+            if not registros.empty:
+                for chave, valor in _gravar_bloco(cursor, registros, modo, agora).items():
+                    contagens[chave] += valor
+            
+            if commit_por_bloco:
+                conn.commit()
+                confirmados = dict(contagens)
+            
+            if tarefa:
+                tarefa.progresso(
+                    linhas_lidas,
+                    max(total or 0, linhas_lidas) or None,
+                    f"{linhas_lidas} linhas processadas - {contagens['novos']} novos registros"
+                )
         
-        df_novos = df_importar[mascara_novos].copy()
-        df_duplicados = df_importar[~mascara_novos].copy()
+        # Último ponto em que o cancelamento ainda desfaz a transação
+        if tarefa:
+            tarefa.verificar_cancelamento()
         
-        # Remove coluna auxiliar
-        df_novos = df_novos.drop(columns=['_chave'])
-        df_duplicados = df_duplicados.drop(columns=['_chave'])
-        self.db.df = self.db.df.drop(columns=['_chave'])
+        conn.commit()
+        return True, contagens
         
-        return df_novos, df_duplicados
-    
-    
-    def auto_cadastrar_veiculos(self, df_importar):
-        """
-        Auto-cadastra veículos que ainda não existem no sistema
-        DESCRIÇÃO É OPCIONAL: usa campo VEÍCULO da planilha se disponível
-        """
-        if not self.gerenciador_veiculos:
-            return 0
+    except Exception as e:
+        conn.rollback()
         
-        try:
-            # Obtém placas únicas da importação
-            placas_importar = df_importar['PLACA'].unique()
-            
-            # Obtém placas já cadastradas
-            veiculos_existentes = self.gerenciador_veiculos.df
-            if not veiculos_existentes.empty:
-                placas_cadastradas = veiculos_existentes['PLACA'].str.upper().values
-            else:
-                placas_cadastradas = []
-            
-            veiculos_novos = 0
-            
-            # Para cada placa na importação
-            for placa in placas_importar:
-                placa = placa.upper().strip()
-                
-                # Se placa ainda não existe, cadastra
-                if placa not in placas_cadastradas:
-                    # Pega descrição do primeiro registro desta placa
-                    registro = df_importar[df_importar['PLACA'] == placa].iloc[0]
-                    veiculo_desc = str(registro.get('VEÍCULO', '')).strip()
-                    
-                    # DESCRIÇÃO OPCIONAL: pode ser vazia
-                    if not veiculo_desc or veiculo_desc == 'nan':
-                        veiculo_desc = ''
-                    
-                    # Tenta deduzir tipo
-                    tipo = "INDEFINIDO"
-                    if veiculo_desc:
-                        veiculo_desc_upper = veiculo_desc.upper()
-                        if "CAVALO" in veiculo_desc_upper:
-                            tipo = "CAVALO"
-                        elif "CARRETA" in veiculo_desc_upper:
-                            if "1" in veiculo_desc_upper:
-                                tipo = "CARRETA 1"
-                            elif "2" in veiculo_desc_upper:
-                                tipo = "CARRETA 2"
-                            else:
-                                tipo = "CARRETA"
-                        elif "BUG" in veiculo_desc_upper:
-                            if "1" in veiculo_desc_upper:
-                                tipo = "BUG 1"
-                            elif "2" in veiculo_desc_upper:
-                                tipo = "BUG 2"
-                            else:
-                                tipo = "BUG"
-                        elif "LS" in veiculo_desc_upper:
-                            tipo = "LS"
-                    
-                    # Cadastra veículo (DESCRIÇÃO OPCIONAL)
-                    sucesso, msg = self.gerenciador_veiculos.adicionar_veiculo(
-                        tipo=tipo,
-                        placa=placa,
-                        descricao=veiculo_desc if veiculo_desc else '',  # Vazio se não tiver
-                        km_inicial=0
-                    )
-                    
-                    if sucesso:
-                        veiculos_novos += 1
-                        placas_cadastradas = list(placas_cadastradas) + [placa]
-            
-            # Salva cadastro atualizado
-            if veiculos_novos > 0:
-                self.gerenciador_veiculos.df.to_excel(
-                    self.gerenciador_veiculos.arquivo, 
-                    index=False
-                )
-            
-            return veiculos_novos
-            
-        except Exception as e:
-            print(f"❌ Erro ao auto-cadastrar veículos: {e}")
-            return 0
-    
-    
-    def auto_cadastrar_destinos(self, df_importar):
-        """
-        Auto-cadastra destinos que ainda não existem no sistema
-        """
-        if not self.gerenciador_destinos:
-            return 0
+        if tarefa and tarefa.cancelado:
+            raise TarefaCancelada(confirmados)
         
+        print(f"❌ Erro ao importar lote: {e}")
+        mensagem = f"❌ Erro na importação: {str(e)}\n\n"
+        if confirmados['novos'] or confirmados['atualizados']:
+            mensagem += (
+                f"⚠️ Blocos anteriores ao erro foram mantidos "
+                f"({confirmados['novos']} novos, {confirmados['atualizados']} atualizados)."
+            )
+        else:
+            mensagem += "⚠️ Nenhuma alteração foi feita no banco de dados."
+        return False, mensagem
+    
+    finally:
+        if tarefa:
+            conn.set_progress_handler(None, 0)
         try:
-            # Obtém destinos únicos da importação
-            destinos_importar = df_importar['DESTINO PROGRAMADO'].unique()
-            destinos_importar = [d for d in destinos_importar if d and str(d).strip() and str(d).strip().upper() != 'NAN']
-            
-            # Obtém destinos já cadastrados
-            destinos_existentes = self.gerenciador_destinos.df
-            if not destinos_existentes.empty:
-                destinos_cadastrados = destinos_existentes['NOME_DESTINO'].str.upper().values
-            else:
-                destinos_cadastrados = []
-            
-            destinos_novos = 0
-            
-            # Para cada destino na importação
-            for destino in destinos_importar:
-                destino = str(destino).strip().upper()
-                
-                # Se destino ainda não existe, cadastra
-                if destino not in destinos_cadastrados:
-                    sucesso, msg = self.gerenciador_destinos.adicionar_destino(destino)
-                    
-                    if sucesso:
-                        destinos_novos += 1
-                        destinos_cadastrados = list(destinos_cadastrados) + [destino]
-            
-            return destinos_novos
-            
-        except Exception as e:
-            print(f"❌ Erro ao auto-cadastrar destinos: {e}")
-            return 0
+            cursor.execute("DROP TABLE IF EXISTS temp.importacao_lote")
+        except Exception:
+            pass
+
+
+def importar_arquivo(tarefa, db_path, arquivo, modo, backup_path=None):
+    """
+    Importação completa para rodar em TarefaSegundoPlano
+    
+    A planilha é lida em blocos (LeitorPlanilha), normalizada e validada bloco a bloco
+    e cada bloco é gravado logo em seguida - memória constante em planilhas grandes.
+    Usa conexão SQLite própria (conexões não podem ser compartilhadas entre threads);
+    ao terminar, a interface deve chamar conexao.notificar() para atualizar os caches.
+    Retorna dict com as contagens de gravar_blocos + total de linhas e incompletos
+    """
+    # Copia arquivo temporariamente se estiver no OneDrive
+    if 'onedrive' in arquivo.lower():
+        tarefa.progresso(0, None, "Copiando arquivo do OneDrive...")
+        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(arquivo)[1]) as tmp:
+            arquivo_temp = tmp.name
+        shutil.copy2(arquivo, arquivo_temp)
+        arquivo = arquivo_temp
     
+    conn = abrir_conexao(db_path)
     
-    def importar_planilha(self, caminho_arquivo, modo='adicionar'):
-        """
-        Importa dados de uma planilha Excel
+    # Backup do banco antes de gravar (API de backup do SQLite, verificado com quick_check)
+    if backup_path:
+        tarefa.progresso(0, None, "Criando backup do banco...")
         
-        REGRA: Só importa registros com PLACA e DATA preenchidos
+        def progresso_backup(status, restantes, total):
+            tarefa.progresso(total - restantes, total, "Criando backup do banco...")
         
-        Modos:
-        - 'adicionar': Adiciona registros novos, ignora duplicatas
-        - 'sobrescrever': Substitui todos os dados (CUIDADO!)
-        - 'mesclar': Atualiza duplicatas e adiciona novos
-        """
-        try:
-            # PASSO 1: Ler arquivo
-            self.relatorio_importacao['detalhes'].append("📂 Lendo arquivo...")
-            
-            if not os.path.exists(caminho_arquivo):
-                return False, "❌ Arquivo não encontrado!"
-            
-            # Lê planilha pulando primeira linha (formato ALS)
-            df_importar = pd.read_excel(caminho_arquivo, sheet_name=0, header=1)
-            
-            # Limpa nomes das colunas (remove espaços extras)
-            df_importar.columns = df_importar.columns.str.strip()
-            
-            self.relatorio_importacao['total_linhas'] = len(df_importar)
-            self.relatorio_importacao['detalhes'].append(f"✅ {len(df_importar)} linhas encontradas")
-            
-            
-            # PASSO 2: Validar estrutura (verifica se tem PLACA e DATA)
-            self.relatorio_importacao['detalhes'].append("🔍 Validando estrutura...")
-            valido, mensagem = self.validar_planilha(df_importar)
-            
-            if not valido:
-                return False, mensagem
-            
-            self.relatorio_importacao['detalhes'].append("✅ Colunas PLACA e DATA encontradas")
-            
-            
-            # PASSO 3: Normalizar colunas
-            self.relatorio_importacao['detalhes'].append("🔧 Normalizando colunas...")
-            df_importar = self.normalizar_colunas(df_importar)
-            
-            
-            # PASSO 4: Limpar dados (REMOVE LINHAS SEM PLACA OU DATA)
-            self.relatorio_importacao['detalhes'].append("🧹 Limpando dados...")
-            df_importar = self.limpar_dados(df_importar)
-            
-            if df_importar.empty:
-                return False, "❌ Nenhum registro válido encontrado!\n\nTodos os registros estão sem PLACA ou DATA preenchidos."
-            
-            self.relatorio_importacao['detalhes'].append(f"✅ {len(df_importar)} registros válidos (com PLACA e DATA)")
-            
-            
-            # PASSO 4.5: AUTO-CADASTRAR VEÍCULOS NOVOS (se gerenciador disponível)
-            if self.gerenciador_veiculos:
-                self.relatorio_importacao['detalhes'].append("🚗 Verificando veículos...")
-                veiculos_novos = self.auto_cadastrar_veiculos(df_importar)
-                if veiculos_novos > 0:
-                    self.relatorio_importacao['veiculos_cadastrados'] = veiculos_novos
-                    self.relatorio_importacao['detalhes'].append(
-                        f"✅ {veiculos_novos} veículos novos cadastrados automaticamente"
-                    )
-            
-            # PASSO 4.6: AUTO-CADASTRAR DESTINOS NOVOS (se gerenciador disponível)
-            if self.gerenciador_destinos:
-                self.relatorio_importacao['detalhes'].append("🎯 Verificando destinos...")
-                destinos_novos = self.auto_cadastrar_destinos(df_importar)
-                if destinos_novos > 0:
-                    self.relatorio_importacao['destinos_cadastrados'] = destinos_novos
-                    self.relatorio_importacao['detalhes'].append(
-                        f"✅ {destinos_novos} destinos novos cadastrados automaticamente"
-                    )
-            
-            
-            # PASSO 5: Processar conforme modo escolhido
-            if modo == 'sobrescrever':
-                # Faz backup antes de sobrescrever
-                self.db.salvar_dados()  # Salva backup
-                self.db.df = df_importar
-                self.relatorio_importacao['importados'] = len(df_importar)
-                self.relatorio_importacao['detalhes'].append("⚠️ DADOS ANTERIORES SUBSTITUÍDOS")
-                
-            elif modo == 'adicionar':
-                # Identifica duplicatas
-                self.relatorio_importacao['detalhes'].append("🔎 Identificando duplicatas...")
-                df_novos, df_duplicados = self.identificar_duplicatas(df_importar)
-                
-                self.relatorio_importacao['duplicados'] = len(df_duplicados)
-                self.relatorio_importacao['importados'] = len(df_novos)
-                
-                if len(df_duplicados) > 0:
-                    self.relatorio_importacao['detalhes'].append(
-                        f"⚠️ {len(df_duplicados)} registros duplicados (ignorados)"
-                    )
-                
-                # Adiciona apenas registros novos
-                if not df_novos.empty:
-                    self.db.df = pd.concat([self.db.df, df_novos], ignore_index=True)
-                    self.relatorio_importacao['detalhes'].append(
-                        f"✅ {len(df_novos)} novos registros importados"
-                    )
-                else:
-                    self.relatorio_importacao['detalhes'].append("ℹ️ Nenhum registro novo encontrado")
-            
-            elif modo == 'mesclar':
-                # Identifica duplicatas
-                df_novos, df_duplicados = self.identificar_duplicatas(df_importar)
-                
-                # Atualiza duplicatas
-                if not df_duplicados.empty:
-                    for _, row_import in df_duplicados.iterrows():
-                        placa = row_import['PLACA']
-                        data = row_import['DATA']
-                        
-                        # Encontra registro correspondente
-                        mascara = (self.db.df['PLACA'] == placa) & (self.db.df['DATA'] == data)
-                        
-                        # Atualiza apenas campos não vazios
-                        for col in self.db.colunas_obrigatorias:
-                            if row_import[col] and str(row_import[col]).strip():
-                                self.db.df.loc[mascara, col] = row_import[col]
-                    
-                    self.relatorio_importacao['detalhes'].append(
-                        f"🔄 {len(df_duplicados)} registros atualizados"
-                    )
-                
-                # Adiciona novos
-                if not df_novos.empty:
-                    self.db.df = pd.concat([self.db.df, df_novos], ignore_index=True)
-                    self.relatorio_importacao['importados'] = len(df_novos)
-                    self.relatorio_importacao['detalhes'].append(
-                        f"✅ {len(df_novos)} novos registros adicionados"
-                    )
-            
-            
-            # PASSO 6: Salvar alterações
-            self.relatorio_importacao['detalhes'].append("💾 Salvando dados...")
-            sucesso = self.db.salvar_dados()
-            
-            if not sucesso:
-                return False, "❌ Erro ao salvar dados importados"
+        gerenciador = GerenciadorBackup(db_path, os.path.dirname(backup_path) or 'backup')
+        sucesso, resultado = gerenciador.backup_agora(backup_path, progresso=progresso_backup)
+        if not sucesso:
+            conn.close()
+            raise RuntimeError(f"Importação cancelada - {resultado}")
+    
+    tarefa.progresso(0, None, "Abrindo arquivo Excel...")
+    try:
+        leitor = LeitorPlanilha(arquivo)
+    except Exception:
+        conn.close()
+        raise
+    estatisticas = {'total_linhas': 0, 'incompletos': 0}
+    
+    def blocos_normalizados():
+        for bloco in leitor:
+            registros, incompletos = normalizar_planilha(bloco)
             
-            self.relatorio_importacao['detalhes'].append("✅ Dados salvos com sucesso!")
+            for _, registro in incompletos.iterrows():
+                print(f"⚠️ Linha {registro['linha']}: Dados incompletos - Placa: '{registro['placa']}', Data: '{registro['data']}', Data Entrada: '{registro['data_entrada']}'")
             
-            # Gera mensagem de sucesso
-            mensagem = self.gerar_relatorio_texto()
-            return True, mensagem
+            # Dentro do bloco, a última ocorrência de PLACA + DATA prevalece
+            if modo == 'atualizar':
+                registros = registros.drop_duplicates(subset=['placa', 'data'], keep='last')
             
-        except Exception as e:
-            self.relatorio_importacao['erros'] += 1
-            self.relatorio_importacao['detalhes'].append(f"❌ Erro: {str(e)}")
-            return False, f"❌ Erro na importação: {str(e)}"
-    
-    
-    def gerar_relatorio_texto(self):
-        """
-        Gera texto formatado do relatório de importação
-        """
-        linhas = [
-            "=" * 50,
-            "📊 RELATÓRIO DE IMPORTAÇÃO",
-            "=" * 50,
-            "",
-            f"📝 Total de linhas na planilha: {self.relatorio_importacao['total_linhas']}",
-            f"✅ Linhas válidas (com PLACA + DATA): {self.relatorio_importacao['linhas_validas']}",
-            f"🗑️ Linhas ignoradas (sem PLACA ou DATA): {self.relatorio_importacao['linhas_ignoradas']}",
-            f"🚗 Veículos cadastrados automaticamente: {self.relatorio_importacao['veiculos_cadastrados']}",
-            f"🎯 Destinos cadastrados automaticamente: {self.relatorio_importacao['destinos_cadastrados']}",
-            f"➕ Registros importados: {self.relatorio_importacao['importados']}",
-            f"⚠️ Duplicatas ignoradas: {self.relatorio_importacao['duplicados']}",
-            f"❌ Erros: {self.relatorio_importacao['erros']}",
-            "",
-            "📋 DETALHES:",
-            ""
-        ]
-        
-        for detalhe in self.relatorio_importacao['detalhes']:
-            linhas.append(f"  {detalhe}")
-        
-        linhas.extend([
-            "",
-            "=" * 50,
-            "✨ Importação concluída!",
-            "=" * 50
-        ])
-        
-        return "\n".join(linhas)
-    
-    
-    def resetar_relatorio(self):
-        """
-        Reseta estatísticas do relatório
-        """
-        self.relatorio_importacao = {
-            'total_linhas': 0,
-            'linhas_validas': 0,
-            'linhas_ignoradas': 0,
-            'importados': 0,
-            'duplicados': 0,
-            'veiculos_cadastrados': 0,
-            'destinos_cadastrados': 0,
-            'erros': 0,
-            'detalhes': []
-        }
+            estatisticas['total_linhas'] += len(bloco)
+            estatisticas['incompletos'] += len(incompletos)
+            yield registros, estatisticas['total_linhas']
+    
+    try:
+        sucesso, resultado = gravar_blocos(
+            conn, blocos_normalizados(), modo,
+            tarefa=tarefa, total=leitor.total_linhas, commit_por_bloco=True
+        )
+    finally:
+        conn.close()
+        leitor.fechar()
+    
+    if not sucesso:
+        raise RuntimeError(resultado)
+    
+    resultado.update(estatisticas)
+    return resultado
@@ -0,0 +1,77 @@
+"""
+Índice em memória para o autocomplete (busca por trecho com ranking)
+"""
+import unicodedata
+
+
+# Tamanho máximo dos trechos indexados (termos maiores usam os trigramas)
+TAMANHO_GRAMA = 3
+
+
+def normalizar(texto):
+    """Maiúsculas sem acento (busca por 'caminhao' acha 'CAMINHÃO')"""
+    decomposto = unicodedata.normalize('NFKD', str(texto).upper())
+    return ''.join(c for c in decomposto if not unicodedata.combining(c))
+
+
+class IndiceBusca:
+    """
+    Índice de trechos (1 a 3 caracteres) e prefixos de palavras sobre uma lista de textos
+    
+    Montado uma vez; cada busca intersecta os conjuntos dos trigramas do termo
+    e confirma o trecho só nos candidatos (não percorre a lista inteira).
+    Ranking: placa começa com o termo > alguma palavra começa com o termo > contém
+    """
+    
+    def __init__(self, textos):
+        self.textos = list(textos)
+        self.normalizados = [normalizar(texto) for texto in self.textos]
+        self.gramas = {}  # trecho -> {posições}
+        self.prefixos = {}  # prefixo de palavra -> {posições}
+        
+        for posicao, texto in enumerate(self.normalizados):
+            for tamanho in range(1, TAMANHO_GRAMA + 1):
+                for inicio in range(len(texto) - tamanho + 1):
+                    self.gramas.setdefault(texto[inicio:inicio + tamanho], set()).add(posicao)
+            
+            for palavra in texto.split():
+                for fim in range(1, len(palavra) + 1):
+                    self.prefixos.setdefault(palavra[:fim], set()).add(posicao)
+    
+    
+    def __len__(self):
+        return len(self.textos)
+    
+    
+    def buscar(self, termo, limite=None):
+        """
+        Textos que contêm o termo, mais relevantes primeiro (empate: ordem original)
+        Termo vazio retorna a lista na ordem original
+        """
+        termo = normalizar(termo).strip()
+        if not termo:
+            return self.textos[:limite] if limite else list(self.textos)
+        
+        # Candidatos: interseção dos trechos do termo (menor conjunto primeiro)
+        tamanho = min(TAMANHO_GRAMA, len(termo))
+        trechos = {termo[inicio:inicio + tamanho] for inicio in range(len(termo) - tamanho + 1)}
+        conjuntos = sorted((self.gramas.get(trecho, set()) for trecho in trechos), key=len)
+        candidatos = set(conjuntos[0]).intersection(*conjuntos[1:])
+        
+        # Trigramas em comum não garantem o trecho inteiro: confirma
+        if len(termo) > TAMANHO_GRAMA:
+            candidatos = {posicao for posicao in candidatos if termo in self.normalizados[posicao]}
+        
+        inicio_palavra = self.prefixos.get(termo, set())
+        
+        def relevancia(posicao):
+            if self.normalizados[posicao].startswith(termo):
+                return (0, posicao)
+            if posicao in inicio_palavra:
+                return (1, posicao)
+            return (2, posicao)
+        
+        ordenados = sorted(candidatos, key=relevancia)
+        if limite:
+            ordenados = ordenados[:limite]
+        return [self.textos[posicao] for posicao in ordenados]
@@ -0,0 +1,148 @@
+"""
+Painel de indicadores da frota (lê as tabelas de resumo do SQLite)
+"""
+import time
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+
+class JanelaDashboard(tk.Toplevel):
+    """
+    Janela com os indicadores de manutenção
+    
+    Os números vêm das tabelas resumos / resumo_placas, mantidas por triggers
+    a cada escrita - abrir o painel não percorre o histórico de manutenções
+    """
+    
+    # aba -> (chave em obter_indicadores, [(coluna, largura)])
+    ABAS = [
+        ("🚛 Por Tipo", 'por_tipo',
+         [('TIPO', 200), ('REGISTROS', 100), ('DIAS PARADO', 110), ('ABERTOS', 90), ('MÉDIA (DIAS)', 110)]),
+        ("📍 Por Destino", 'por_destino',
+         [('DESTINO', 250), ('REGISTROS', 100), ('DIAS PARADO', 110), ('ABERTOS', 90), ('MÉDIA (DIAS)', 110)]),
+        ("📅 Por Mês", 'por_mes',
+         [('MÊS', 120), ('REGISTROS', 100), ('DIAS PARADO', 110), ('ABERTOS', 90), ('MÉDIA (DIAS)', 110)]),
+        ("🔁 Intervalo entre Visitas", 'intervalo_visitas',
+         [('PLACA', 100), ('VISITAS', 80), ('PRIMEIRA ENTRADA', 130), ('ÚLTIMA ENTRADA', 130), ('INTERVALO MÉDIO (DIAS)', 170)]),
+        ("⏳ Abertos há Mais Tempo", 'abertos',
+         [('PLACA', 100), ('VEÍCULO', 150), ('DESTINO', 200), ('DATA ENTRADA', 110), ('DIAS', 80)]),
+    ]
+    
+    def __init__(self, parent, db, limite=20):
+        super().__init__(parent)
+        
+        self.db = db
+        self.limite = limite
+        self.tabelas = {}
+        
+        # Configura janela
+        self.title("Indicadores da Frota")
+        self.geometry("900x550")
+        self.resizable(True, True)
+        self.transient(parent)
+        
+        self.criar_interface()
+        self.atualizar()
+    
+    
+    def criar_interface(self):
+        """
+        Cria interface da janela
+        """
+        frame_topo = ttk.Frame(self, padding="10")
+        frame_topo.pack(fill=tk.X)
+        
+        ttk.Label(
+            frame_topo,
+            text="📈 Indicadores da Frota",
+            font=('Arial', 14, 'bold')
+        ).pack(side=tk.LEFT, padx=10)
+        
+        ttk.Button(
+            frame_topo,
+            text="🛠️ Recalcular Resumos",
+            command=self.recalcular
+        ).pack(side=tk.RIGHT, padx=5)
+        
+        ttk.Button(
+            frame_topo,
+            text="🔄 Atualizar",
+            command=self.atualizar
+        ).pack(side=tk.RIGHT, padx=5)
+        
+        # Resumo geral (mesmos números da tela principal)
+        self.label_resumo = ttk.Label(self, text="", font=('Arial', 10), padding=(20, 0))
+        self.label_resumo.pack(fill=tk.X)
+        
+        # Barra de status antes do notebook (pack reserva o espaço na ordem)
+        self.label_status = ttk.Label(self, text="", relief=tk.SUNKEN, anchor=tk.W)
+        self.label_status.pack(fill=tk.X, side=tk.BOTTOM)
+        
+        notebook = ttk.Notebook(self)
+        notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        for titulo, chave, colunas in self.ABAS:
+            frame = ttk.Frame(notebook)
+            notebook.add(frame, text=titulo)
+            
+            scroll_y = ttk.Scrollbar(frame, orient=tk.VERTICAL)
+            tree = ttk.Treeview(
+                frame,
+                columns=[nome for nome, _ in colunas],
+                show='headings',
+                yscrollcommand=scroll_y.set
+            )
+            scroll_y.config(command=tree.yview)
+            
+            for nome, largura in colunas:
+                tree.heading(nome, text=nome)
+                tree.column(nome, width=largura, anchor=tk.W if largura >= 150 else tk.CENTER)
+            
+            scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+            tree.pack(fill=tk.BOTH, expand=True)
+            self.tabelas[chave] = tree
+    
+    
+    def atualizar(self):
+        """Recarrega os indicadores das tabelas de resumo"""
+        inicio = time.perf_counter()
+        
+        try:
+            stats = self.db.obter_estatisticas()
+            indicadores = self.db.estatisticas.obter_indicadores(self.limite)
+        except Exception as e:
+            messagebox.showerror("Erro", f"Não foi possível carregar os indicadores:\n{e}", parent=self)
+            return
+        
+        self.label_resumo.config(
+            text=f"📊 Total: {stats['total_registros']}   |   "
+                 f"🔧 Em Serviço: {stats['em_servico']}   |   "
+                 f"✅ Finalizados: {stats['finalizados']}   |   "
+                 f"⏱️ Tempo Médio: {stats['tempo_medio']:.1f} dias   |   "
+                 f"🚗 Placas: {stats['placas_unicas']}"
+        )
+        
+        for chave, tree in self.tabelas.items():
+            tree.delete(*tree.get_children())
+            for linha in indicadores.get(chave, []):
+                tree.insert('', tk.END, values=['' if valor is None else valor for valor in linha])
+        
+        decorrido = (time.perf_counter() - inicio) * 1000
+        self.label_status.config(text=f"Indicadores carregados em {decorrido:.0f} ms")
+    
+    
+    def recalcular(self):
+        """Refaz as tabelas de resumo do zero e recarrega"""
+        if not messagebox.askyesno(
+            "Recalcular Resumos",
+            "Os resumos são mantidos automaticamente.\n\n"
+            "Recalcular do zero só é necessário se o banco foi alterado por fora do sistema.\n"
+            "Deseja continuar?",
+            parent=self
+        ):
+            return
+        
+        if self.db.reconstruir_resumos():
+            self.atualizar()
+        else:
+            messagebox.showerror("Erro", "Não foi possível recalcular os resumos", parent=self)
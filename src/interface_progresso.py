@@ -0,0 +1,113 @@
+"""
+Janela de progresso para tarefas em segundo plano
+"""
+import tkinter as tk
+from tkinter import ttk
+
+
+class JanelaProgresso(tk.Toplevel):
+    """
+    Acompanha uma TarefaSegundoPlano sem travar a interface
+    
+    A fila da tarefa é lida a cada `intervalo` ms via after(); ao terminar
+    a janela fecha e chama ao_concluir(resultado), ao_cancelar(parcial) ou ao_falhar(erro)
+    modal=False deixa o usuário continuar usando o sistema enquanto a tarefa roda
+    """
+    
+    def __init__(self, parent, tarefa, titulo="Processando...", mensagem="Aguarde...",
+                 ao_concluir=None, ao_cancelar=None, ao_falhar=None, intervalo=100,
+                 modal=True, mensagem_cancelando="Cancelando... desfazendo alterações pendentes"):
+        super().__init__(parent)
+        
+        self.tarefa = tarefa
+        self.ao_concluir = ao_concluir
+        self.ao_cancelar = ao_cancelar
+        self.ao_falhar = ao_falhar
+        self.intervalo = intervalo
+        self.mensagem_cancelando = mensagem_cancelando
+        
+        # Configura janela
+        self.title(titulo)
+        self.geometry("420x190")
+        self.resizable(False, False)
+        self.transient(parent)
+        if modal:
+            self.grab_set()
+        
+        # Centraliza
+        self.update_idletasks()
+        x = (self.winfo_screenwidth() // 2) - 210
+        y = (self.winfo_screenheight() // 2) - 95
+        self.geometry(f"420x190+{x}+{y}")
+        
+        ttk.Label(
+            self,
+            text=f"⏳ {titulo}",
+            font=('Arial', 12, 'bold')
+        ).pack(pady=(15, 10))
+        
+        self.label_status = ttk.Label(self, text=mensagem, font=('Arial', 10))
+        self.label_status.pack(pady=5)
+        
+        # Começa indeterminada (total desconhecido)
+        self.barra = ttk.Progressbar(self, mode='indeterminate', length=360)
+        self.barra.pack(pady=5)
+        self.barra.start(15)
+        
+        self.botao_cancelar = ttk.Button(self, text="❌ Cancelar", command=self.cancelar, width=15)
+        self.botao_cancelar.pack(pady=10)
+        
+        # Fechar a janela equivale a cancelar
+        self.protocol("WM_DELETE_WINDOW", self.cancelar)
+        
+        self.after(self.intervalo, self.verificar_fila)
+    
+    
+    def verificar_fila(self):
+        """Lê as mensagens da tarefa e atualiza a janela"""
+        for tipo, dados in self.tarefa.mensagens():
+            if tipo == 'progresso':
+                self.atualizar_progresso(*dados)
+            else:
+                self.finalizar(tipo, dados)
+                return
+        
+        self.after(self.intervalo, self.verificar_fila)
+    
+    
+    def atualizar_progresso(self, feitos, total=None, mensagem=None):
+        """Atualiza barra e texto"""
+        if total:
+            if str(self.barra['mode']) != 'determinate':
+                self.barra.stop()
+                self.barra.config(mode='determinate')
+            self.barra.config(maximum=total, value=feitos)
+        
+        if mensagem:
+            self.label_status.config(text=mensagem)
+        elif total:
+            self.label_status.config(text=f"{feitos} de {total} registros")
+    
+    
+    def cancelar(self):
+        """Pede cancelamento; a janela fecha quando a tarefa confirmar"""
+        if self.tarefa.cancelado:
+            return
+        
+        self.tarefa.cancelar()
+        self.botao_cancelar.config(state=tk.DISABLED)
+        self.label_status.config(text=self.mensagem_cancelando)
+    
+    
+    def finalizar(self, tipo, dados):
+        """Fecha a janela e chama o callback correspondente"""
+        self.barra.stop()
+        self.grab_release()
+        self.destroy()
+        
+        if tipo == 'concluido' and self.ao_concluir:
+            self.ao_concluir(dados)
+        elif tipo == 'cancelado' and self.ao_cancelar:
+            self.ao_cancelar(dados)
+        elif tipo == 'erro' and self.ao_falhar:
+            self.ao_falhar(dados)
@@ -15,6 +15,11 @@ class JanelaCadastroVeiculos(tk.Toplevel):
         
         self.gerenciador = gerenciador_veiculos
         
+        # Linhas já criadas na Treeview: placa (iid) -> (valores, tag)
+        self._exibidas = {}
+        self._linhas = {}
+        self._df_linhas = None  # DataFrame de onde _linhas foi montado
+        
         # Configura janela
         self.title("Cadastro de Veículos")
         self.geometry("1000x600")
@@ -123,6 +128,10 @@ class JanelaCadastroVeiculos(tk.Toplevel):
         
         self.tree.bind('<Double-1>', lambda e: self.editar_veiculo())
         
+        # Cores por status
+        self.tree.tag_configure('ativo', background='#d1e7dd')
+        self.tree.tag_configure('inativo', background='#f8d7da')
+        
         scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
         scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
         self.tree.pack(fill=tk.BOTH, expand=True)
@@ -139,40 +148,71 @@ class JanelaCadastroVeiculos(tk.Toplevel):
         ).pack()
     
     
+    def _linhas_veiculos(self):
+        """
+        placa -> (valores, tag) de todos os veículos do cadastro
+        Refeito só quando o gerenciador recarrega o DataFrame (mudança em veiculos)
+        """
+        df = self.gerenciador.df
+        
+        if df is not self._df_linhas:
+            self._linhas = {
+                placa: ((tipo, placa, descricao, km, data, 'ATIVO' if ativo else 'INATIVO'),
+                        'ativo' if ativo else 'inativo')
+                for tipo, placa, descricao, km, data, ativo in zip(
+                    df['TIPO_VEICULO'], df['PLACA'], df['DESCRICAO'],
+                    df['ULTIMA_KM'], df['DATA_CADASTRO'], df['ATIVO']
+                )
+            }
+            self._df_linhas = df
+        
+        return self._linhas
+    
+    
+    def _sincronizar(self, placas):
+        """
+        Mostra na Treeview só as placas informadas, nessa ordem
+        Itens existentes são reaproveitados (desanexados / reanexados);
+        só veículos novos são inseridos e só linhas alteradas são reescritas
+        """
+        linhas = self._linhas_veiculos()
+        
+        # Veículos que saíram do cadastro
+        removidos = [placa for placa in self._exibidas if placa not in linhas]
+        if removidos:
+            self.tree.delete(*removidos)
+            for placa in removidos:
+                del self._exibidas[placa]
+        
+        for placa in placas:
+            linha = linhas[placa]
+            atual = self._exibidas.get(placa)
+            if atual is None:
+                self.tree.insert('', tk.END, iid=placa, values=linha[0], tags=(linha[1],))
+            elif atual != linha:
+                self.tree.item(placa, values=linha[0], tags=(linha[1],))
+            self._exibidas[placa] = linha
+        
+        # Uma única chamada reordena e desanexa o que não está no filtro
+        if list(self.tree.get_children()) != list(placas):
+            visiveis = set(placas)
+            ocultas = [item for item in self.tree.selection() if item not in visiveis]
+            if ocultas:
+                self.tree.selection_remove(*ocultas)
+            self.tree.set_children('', *placas)
+    
+    
     def atualizar_tabela(self):
         """
         Atualiza dados na tabela
         """
-        # Limpa tabela
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Popula tabela
         df = self.gerenciador.df
+        self._sincronizar(df['PLACA'].tolist())
         
         if df.empty:
             self.label_stats.config(text="📊 Nenhum veículo cadastrado ainda")
             return
         
-        for idx, row in df.iterrows():
-            valores = [
-                row.get('TIPO_VEICULO', ''),
-                row.get('PLACA', ''),
-                row.get('DESCRICAO', ''),
-                row.get('ULTIMA_KM', '0'),
-                row.get('DATA_CADASTRO', ''),
-                'ATIVO' if row.get('ATIVO', False) else 'INATIVO'
-            ]
-            
-            # Define cor baseada no status
-            tag = 'ativo' if row.get('ATIVO', False) else 'inativo'
-            
-            self.tree.insert('', tk.END, values=valores, tags=(idx, tag))
-        
-        # Configura cores
-        self.tree.tag_configure('ativo', background='#d1e7dd')
-        self.tree.tag_configure('inativo', background='#f8d7da')
-        
         # Atualiza estatísticas
         self.atualizar_estatisticas()
     
@@ -209,11 +249,13 @@ class JanelaCadastroVeiculos(tk.Toplevel):
             messagebox.showwarning("Aviso", "Selecione um veículo para editar")
             return
         
-        item = self.tree.item(selecao[0])
-        indice = item['tags'][0] if item['tags'] else None
+        # iid da linha é a placa; o gerenciador trabalha com a posição no DataFrame
+        df = self.gerenciador.df
+        posicoes = (df['PLACA'] == selecao[0]).to_numpy().nonzero()[0]
         
-        if indice is not None:
-            veiculo = self.gerenciador.df.iloc[indice].to_dict()
+        if len(posicoes):
+            indice = int(posicoes[0])
+            veiculo = df.iloc[indice].to_dict()
             FormularioVeiculo(
                 self,
                 self.gerenciador,
@@ -239,10 +281,6 @@ class JanelaCadastroVeiculos(tk.Toplevel):
         """
         termo = self.entrada_pesquisa.get().upper().strip()
         
-        # Limpa tabela
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
         # Se não há termo, mostra todos
         df = self.gerenciador.df
         if not termo:
@@ -251,29 +289,17 @@ class JanelaCadastroVeiculos(tk.Toplevel):
         
         # Filtra por placa, tipo ou descrição
         df_filtrado = df[
-            df['PLACA'].str.upper().str.contains(termo, na=False) |
-            df['TIPO_VEICULO'].str.upper().str.contains(termo, na=False) |
-            df['DESCRICAO'].str.upper().str.contains(termo, na=False)
+            df['PLACA'].str.upper().str.contains(termo, na=False, regex=False) |
+            df['TIPO_VEICULO'].str.upper().str.contains(termo, na=False, regex=False) |
+            df['DESCRICAO'].str.upper().str.contains(termo, na=False, regex=False)
         ]
         
+        self._sincronizar(df_filtrado['PLACA'].tolist())
+        
         if df_filtrado.empty:
             self.label_stats.config(text="❌ Nenhum veículo encontrado")
             return
         
-        # Popula tabela filtrada
-        for idx, row in df_filtrado.iterrows():
-            valores = [
-                row.get('TIPO_VEICULO', ''),
-                row.get('PLACA', ''),
-                row.get('DESCRICAO', ''),
-                row.get('ULTIMA_KM', '0'),
-                row.get('DATA_CADASTRO', ''),
-                'ATIVO' if row.get('ATIVO', False) else 'INATIVO'
-            ]
-            
-            tag = 'ativo' if row.get('ATIVO', False) else 'inativo'
-            self.tree.insert('', tk.END, values=valores, tags=(idx, tag))
-        
         # Atualiza estatísticas
         self.label_stats.config(
             text=f"🔍 {len(df_filtrado)} veículo(s) encontrado(s) de {len(df)} total"
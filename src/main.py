@@ -5,11 +5,8 @@ Interface Gráfica Principal
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
 from datetime import datetime
-import pandas as pd
 import os
 import sys
-import sqlite3
-from PIL import Image, ImageTk
 
 # Adiciona o diretório pai ao path (necessário para importações)
 if getattr(sys, 'frozen', False):
@@ -25,11 +22,40 @@ sys.path.insert(0, application_path)
 # Define caminho absoluto para o banco de dados
 DB_PATH = os.path.join(base_path, 'data', 'sistema_als.db')
 
-from src.database import DatabaseManager
-from src.utils import formatar_data_br, validar_data, validar_numero, limpar_texto, gerar_relatorio_pdf, gerar_relatorio_word
-from src.veiculos import GerenciadorVeiculos
-from src.interface_veiculos import JanelaCadastroVeiculos
-from src.destinos import GerenciadorDestinos
+# Só módulos leves aqui: pandas, PIL, banco e exportadores são importados
+# quando usados, depois que a janela principal já apareceu
+from src.grade_virtual import GradeVirtual
+from src.tarefas import TarefaSegundoPlano
+from src.interface_progresso import JanelaProgresso
+
+# Importados uma vez em SistemaManutencao.inicializar_dados (carga adiada)
+pd = None
+formatar_data_br = None
+
+
+# Autocomplete de veículos: espera entre teclas antes de filtrar e máximo de sugestões
+ATRASO_FILTRO_MS = 120
+MAX_SUGESTOES = 50
+
+# Intervalo entre verificações da carga inicial em segundo plano
+INTERVALO_CARREGAMENTO_MS = 50
+
+
+def importar_modulos_dados(tarefa):
+    """
+    Importa pandas, PIL e os módulos do banco numa thread (a janela continua respondendo)
+    Só preenche o cache de importação: banco e cadastros são abertos na thread da interface
+    """
+    import pandas
+    import src.utils
+    import src.database
+    import src.veiculos
+    import src.destinos
+    
+    try:
+        from PIL import Image, ImageTk
+    except ImportError:
+        pass  # carregar_logo avisa
 
 
 class FormularioRegistro(tk.Toplevel):
@@ -117,12 +143,12 @@ class FormularioRegistro(tk.Toplevel):
         
         # Variável para controlar seleção
         self.veiculo_selecionado = None
-        self.lista_veiculos_completa = []
+        self._filtro_agendado = None
         
         # Binds para autocomplete
         self.entry_busca_veiculo.bind('<KeyRelease>', self.filtrar_veiculos)
         self.entry_busca_veiculo.bind('<FocusIn>', lambda e: self.mostrar_resultados())
-        self.entry_busca_veiculo.bind('<FocusOut>', lambda e: self.root.after(200, self.esconder_resultados))
+        self.entry_busca_veiculo.bind('<FocusOut>', lambda e: self.after(200, self.esconder_resultados))
         self.entry_busca_veiculo.bind('<Down>', lambda e: self.listbox_veiculos.focus_set())
         self.listbox_veiculos.bind('<Return>', lambda e: self.selecionar_veiculo_lista())
         self.listbox_veiculos.bind('<Double-Button-1>', lambda e: self.selecionar_veiculo_lista())
@@ -318,30 +344,35 @@ class FormularioRegistro(tk.Toplevel):
     
     
     def atualizar_lista_veiculos(self):
-        """Atualiza lista completa de veículos no formato PLACA - TIPO"""
-        veiculos = self.gerenciador_veiculos.obter_veiculos_ativos()
-        self.lista_veiculos_completa = veiculos
+        """Mostra os veículos ativos (PLACA - TIPO - DESCRIÇÃO)"""
+        indice = self.gerenciador_veiculos.obter_indice_busca()
+        self._preencher_listbox(indice.buscar('', MAX_SUGESTOES))
+    
+    
+    def _preencher_listbox(self, veiculos):
+        """Substitui o conteúdo da listbox de sugestões"""
         self.listbox_veiculos.delete(0, tk.END)
-        for veiculo in veiculos:
-            self.listbox_veiculos.insert(tk.END, veiculo)
+        if veiculos:
+            self.listbox_veiculos.insert(tk.END, *veiculos)
     
     
     def filtrar_veiculos(self, event=None):
-        """Filtra veículos conforme digitação"""
-        termo_busca = self.entry_busca_veiculo.get().upper()
-        
-        # Limpa listbox
-        self.listbox_veiculos.delete(0, tk.END)
+        """Agenda o filtro (digitação rápida gera uma única busca)"""
+        if self._filtro_agendado is not None:
+            self.after_cancel(self._filtro_agendado)
+        self._filtro_agendado = self.after(ATRASO_FILTRO_MS, self._aplicar_filtro_veiculos)
+    
+    
+    def _aplicar_filtro_veiculos(self):
+        """Filtra veículos pelo índice (placa, tipo ou descrição; melhores primeiro)"""
+        self._filtro_agendado = None
+        if not self.winfo_exists():
+            return
         
-        if not termo_busca:
-            # Mostra todos
-            for veiculo in self.lista_veiculos_completa:
-                self.listbox_veiculos.insert(tk.END, veiculo)
-        else:
-            # Filtra por placa ou tipo
-            for veiculo in self.lista_veiculos_completa:
-                if termo_busca in veiculo.upper():
-                    self.listbox_veiculos.insert(tk.END, veiculo)
+        termo_busca = self.entry_busca_veiculo.get()
+        # Índice compartilhado: refeito pelo gerenciador só quando o cadastro muda
+        indice = self.gerenciador_veiculos.obter_indice_busca()
+        self._preencher_listbox(indice.buscar(termo_busca, MAX_SUGESTOES))
         
         # Mostra resultados
         if self.listbox_veiculos.size() > 0:
@@ -571,6 +602,8 @@ class FormularioRegistro(tk.Toplevel):
         """
         Abre janela de cadastro de veículos
         """
+        from src.interface_veiculos import JanelaCadastroVeiculos
+        
         JanelaCadastroVeiculos(self, self.gerenciador_veiculos)
         
         # Atualiza lista após fechar cadastro
@@ -587,8 +620,8 @@ class FormularioRegistro(tk.Toplevel):
         """
         for campo_nome, widget in self.campos.items():
             valor = registro.get(campo_nome, '')
-            # Corrige valores NaN do pandas
-            if valor is None or (isinstance(valor, float) and pd.isna(valor)):
+            # Corrige valores vazios do pandas (NaN, NaT nas datas, <NA> na KM)
+            if valor is None or pd.isna(valor):
                 valor = ''
             if isinstance(widget, tk.Text):
                 widget.delete('1.0', tk.END)
@@ -642,6 +675,7 @@ class FormularioRegistro(tk.Toplevel):
             pass  # Mantém opcional para todos
         
         # Valida formato de datas
+        from src.utils import validar_data
         for campo in ['DATA', 'DATA ENTRADA', 'DATA SAÍDA']:
             if dados.get(campo):
                 if not validar_data(dados[campo]):
@@ -812,7 +846,10 @@ class FormularioNota(tk.Toplevel):
     
     def salvar(self):
         """Salva nota no banco"""
-        data_prog = self.campos['data_programada'].get().strip()
+        import sqlite3
+        from src.utils import normalizar_data
+        
+        data_prog = normalizar_data(self.campos['data_programada'].get())
         placa_full = self.campos['placa'].get().strip()
         status = self.campos['status'].get().strip()
         obs = self.campos['observacao'].get('1.0', tk.END).strip()
@@ -870,6 +907,77 @@ class SistemaManutencao:
         self.root.title("Sistema de Gestão de Manutenção - ALS")
         self.root.geometry("1400x800")
         
+        # Banco e cadastros: abertos em inicializar_dados, depois que a janela aparece
+        self.db = None
+        
+        # Id (manutencoes.id) do registro selecionado
+        self.id_selecionado = None
+        
+        # Controle de ordenação das colunas
+        self.ordem_colunas = {}  # Armazena estado de ordenação de cada coluna
+        self.ordenacao = None  # (coluna do DataFrame, crescente) ou None = ordem do banco
+        self.ordem_visivel = None  # Posições da visão na ordem exibida
+        
+        # Controle de reordenação de colunas (drag-and-drop)
+        self.coluna_arrastada = None
+        self.posicao_original_x = None
+        self.ordem_colunas_preferida = self.carregar_ordem_colunas()
+        
+        # Configura estilo
+        self.configurar_estilo()
+        
+        # Cria interface
+        self.criar_interface()
+        
+        # Configura fechamento
+        self.root.protocol("WM_DELETE_WINDOW", self.fechar_aplicacao)
+        
+        # Desenha a janela e importa pandas/banco em segundo plano
+        self.label_status.config(text="⏳  Carregando dados...")
+        self.root.update()
+        try:
+            self.label_status.grab_set()  # ignora cliques nos botões até o banco abrir
+        except tk.TclError:
+            pass
+        
+        self.carregamento = TarefaSegundoPlano(importar_modulos_dados).iniciar()
+        self.root.after(INTERVALO_CARREGAMENTO_MS, self.aguardar_carregamento)
+    
+    
+    def aguardar_carregamento(self):
+        """
+        Espera as importações em segundo plano e então carrega os dados na janela
+        """
+        if self.carregamento.thread.is_alive():
+            self.root.after(INTERVALO_CARREGAMENTO_MS, self.aguardar_carregamento)
+            return
+        
+        self.carregar_logo()
+        self.inicializar_dados()
+        
+        # Carrega dados iniciais
+        self.atualizar_tabela()
+        
+        # Atualiza estatísticas
+        self.atualizar_estatisticas()
+        
+        # Carrega notas
+        self.atualizar_notas()
+        
+        self.label_status.grab_release()
+    
+    
+    def inicializar_dados(self):
+        """
+        Abre banco de dados e cadastros (pandas já importado por importar_modulos_dados)
+        """
+        global pd, formatar_data_br
+        import pandas as pd
+        from src.utils import formatar_data_br
+        from src.database import DatabaseManager
+        from src.veiculos import GerenciadorVeiculos
+        from src.destinos import GerenciadorDestinos
+        
         # Inicializa banco de dados
         try:
             self.db = DatabaseManager(DB_PATH)
@@ -892,43 +1000,13 @@ class SistemaManutencao:
         
         # Inicializa gerenciador de destinos
         try:
-            self.gerenciador_destinos = GerenciadorDestinos()
+            self.gerenciador_destinos = GerenciadorDestinos(DB_PATH)
         except Exception as e:
             messagebox.showerror(
                 "Erro ao Inicializar",
                 f"Não foi possível carregar o cadastro de destinos:\n{e}"
             )
-            self.gerenciador_destinos = GerenciadorDestinos()  # Cria novo vazio
-        
-        # Variável para índice selecionado
-        self.indice_selecionado = None
-        
-        # Controle de ordenação das colunas
-        self.ordem_colunas = {}  # Armazena estado de ordenação de cada coluna
-        self.df_original = None  # Guarda ordem original dos dados
-        
-        # Controle de reordenação de colunas (drag-and-drop)
-        self.coluna_arrastada = None
-        self.posicao_original_x = None
-        self.ordem_colunas_preferida = self.carregar_ordem_colunas()
-        
-        # Configura estilo
-        self.configurar_estilo()
-        
-        # Cria interface
-        self.criar_interface()
-        
-        # Carrega dados iniciais
-        self.atualizar_tabela()
-        
-        # Atualiza estatísticas
-        self.atualizar_estatisticas()
-        
-        # Carrega notas
-        self.atualizar_notas()
-        
-        # Configura fechamento
-        self.root.protocol("WM_DELETE_WINDOW", self.fechar_aplicacao)
+            self.gerenciador_destinos = GerenciadorDestinos(DB_PATH)  # Cria novo vazio
     
     
     def configurar_estilo(self):
@@ -946,20 +1024,13 @@ class SistemaManutencao:
         style.configure('Treeview.Heading', font=('Arial', 10, 'bold'))
     
     
-    def criar_interface(self):
+    def carregar_logo(self):
         """
-        Cria interface completa
+        Carrega a logo ALS no cabeçalho (PIL importado só aqui)
         """
-        # ==== FRAME TOPO ====
-        frame_topo = ttk.Frame(self.root, padding="3")
-        frame_topo.pack(fill=tk.X)
-        
-        # Frame para logo e título
-        frame_header = ttk.Frame(frame_topo)
-        frame_header.pack(fill=tk.X, pady=(0, 3))
-        
-        # Logo ALS à esquerda
         try:
+            from PIL import Image, ImageTk
+            
             # Determina caminho da logo
             if getattr(sys, 'frozen', False):
                 logo_path = os.path.join(sys._MEIPASS, 'img', 'logo ALS.png')
@@ -975,11 +1046,26 @@ class SistemaManutencao:
             logo_redimensionada = logo_original.resize((largura_nova, altura_nova), Image.Resampling.LANCZOS)
             
             self.logo_photo = ImageTk.PhotoImage(logo_redimensionada)
-            
-            logo_label = ttk.Label(frame_header, image=self.logo_photo)
-            logo_label.pack(side=tk.LEFT, padx=(0, 10))
+            self.logo_label.config(image=self.logo_photo)
         except Exception as e:
             print(f"Aviso: Não foi possível carregar logo: {e}")
+    
+    
+    def criar_interface(self):
+        """
+        Cria interface completa
+        """
+        # ==== FRAME TOPO ====
+        frame_topo = ttk.Frame(self.root, padding="3")
+        frame_topo.pack(fill=tk.X)
+        
+        # Frame para logo e título
+        frame_header = ttk.Frame(frame_topo)
+        frame_header.pack(fill=tk.X, pady=(0, 3))
+        
+        # Logo ALS à esquerda (imagem carregada depois que a janela aparece)
+        self.logo_label = ttk.Label(frame_header)
+        self.logo_label.pack(side=tk.LEFT, padx=(0, 10))
         
         # Título à direita da logo
         titulo_frame = ttk.Frame(frame_header)
@@ -1029,6 +1115,12 @@ class SistemaManutencao:
         self.filtro_data_saida = ttk.Entry(filtro_linha, width=12)
         self.filtro_data_saida.pack(side=tk.LEFT, padx=5)
         
+        # Texto livre: serviço, obs, veículo e destino (resultados por relevância)
+        ttk.Label(filtro_linha, text="Texto:").pack(side=tk.LEFT, padx=5)
+        self.filtro_texto = ttk.Entry(filtro_linha, width=20)
+        self.filtro_texto.pack(side=tk.LEFT, padx=5)
+        self.filtro_texto.bind('<Return>', lambda e: self.aplicar_filtros())
+        
         ttk.Button(filtro_linha, text="🔍  Buscar", command=self.aplicar_filtros).pack(side=tk.LEFT, padx=5)
         ttk.Button(filtro_linha, text="🧹  Limpar", command=self.limpar_filtros).pack(side=tk.LEFT, padx=5)
         
@@ -1044,6 +1136,7 @@ class SistemaManutencao:
         ttk.Button(frame_acoes, text="🔄  Atualizar", command=self.atualizar_tabela).pack(side=tk.LEFT, padx=5)
         ttk.Button(frame_acoes, text="🚛  Veículos", command=self.gerenciar_veiculos).pack(side=tk.LEFT, padx=5)
         ttk.Button(frame_acoes, text="📊  Relatório", command=self.gerar_relatorio).pack(side=tk.LEFT, padx=5)
+        ttk.Button(frame_acoes, text="📈  Indicadores", command=self.abrir_indicadores).pack(side=tk.LEFT, padx=5)
         ttk.Button(frame_acoes, text="📤  Exportar", command=self.exportar_dados).pack(side=tk.LEFT, padx=5)
         ttk.Button(frame_acoes, text="📥  Importar", command=self.importar_dados).pack(side=tk.LEFT, padx=5)
         
@@ -1059,15 +1152,13 @@ class SistemaManutencao:
         scroll_y = ttk.Scrollbar(frame_tabela, orient=tk.VERTICAL)
         scroll_x = ttk.Scrollbar(frame_tabela, orient=tk.HORIZONTAL)
         
-        # Treeview
+        # Treeview (rolagem vertical controlada pela grade virtual)
         self.tree = ttk.Treeview(
             frame_tabela,
-            yscrollcommand=scroll_y.set,
             xscrollcommand=scroll_x.set,
             selectmode='extended'  # Permite seleção múltipla com Ctrl e Shift
         )
         
-        scroll_y.config(command=self.tree.yview)
         scroll_x.config(command=self.tree.xview)
         
         # Colunas
@@ -1103,6 +1194,15 @@ class SistemaManutencao:
         self.tree.bind('<Double-1>', lambda e: self.editar_registro())
         self.tree.bind('<<TreeviewSelect>>', self.on_selecionar)
         
+        # Cores por status
+        self.tree.tag_configure('em_transito', background='#f0f0f0')  # Cinza mais claro
+        self.tree.tag_configure('em_servico', background='#fff3cd')   # Amarelo claro
+        self.tree.tag_configure('finalizado', background='#d1e7dd')   # Verde claro
+        
+        # Grade virtual: só as linhas visíveis viram itens do Treeview
+        self.grade = GradeVirtual(self.tree, scroll_y)
+        self.df_visivel = None
+        
         scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
         scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
         self.tree.pack(fill=tk.BOTH, expand=True)
@@ -1172,7 +1272,7 @@ class SistemaManutencao:
         selecao = self.tree.selection()
         if selecao:
             item = self.tree.item(selecao[0])
-            self.indice_selecionado = item['tags'][0] if item['tags'] else None
+            self.id_selecionado = item['tags'][0] if item['tags'] else None
     
     
     def carregar_ordem_colunas(self):
@@ -1282,16 +1382,6 @@ class SistemaManutencao:
         """
         Aplica nova ordem de colunas à TreeView
         """
-        # Guarda dados atuais
-        dados_atuais = []
-        for item in self.tree.get_children():
-            valores = self.tree.item(item)['values']
-            tags = self.tree.item(item)['tags']
-            dados_atuais.append((valores, tags))
-        
-        # Mapa de colunas antigas para novas
-        colunas_antigas = list(self.tree['columns'])
-        
         # Larguras das colunas
         larguras = {'DATA': 90, 'PLACA': 80, 'KM': 70, 'VEÍCULO': 100,
                     'DESTINO PROGRAMADO': 130, 'SERVIÇO A EXECUTAR': 200,
@@ -1310,34 +1400,18 @@ class SistemaManutencao:
                 command=lambda c=col: self.ordenar_por_coluna(c)
             )
         
-        # Reinsere dados com nova ordem de colunas
-        self.tree.delete(*self.tree.get_children())
-        
-        # Mapa de índices: coluna_antiga -> posição
-        mapa_indices = {col: idx for idx, col in enumerate(colunas_antigas)}
-        
-        for valores_antigos, tags in dados_atuais:
-            # Reordena valores conforme nova ordem de colunas
-            valores_novos = []
-            for nova_col in novas_colunas:
-                idx_antigo = mapa_indices.get(nova_col, 0)
-                if idx_antigo < len(valores_antigos):
-                    valores_novos.append(valores_antigos[idx_antigo])
-                else:
-                    valores_novos.append('')
-            
-            self.tree.insert('', tk.END, values=valores_novos, tags=tags)
+        # Reformata só as linhas visíveis na nova ordem de colunas
+        self.grade.atualizar()
     
     
     def ordenar_por_coluna(self, coluna):
         """
         Ordena tabela clicando no cabeçalho da coluna
         Estados: None (original) -> 'asc' (crescente) -> 'desc' (decrescente) -> None (volta ao original)
-        """
-        # Guarda DataFrame original na primeira ordenação
-        if self.df_original is None:
-            self.df_original = self.db.df.copy()
         
+        Só reordena a visualização: a permutação vem de db.ordem_por_coluna (cacheada)
+        e o DataFrame não é copiado nem substituído
+        """
         # Verifica estado atual da coluna
         estado_atual = self.ordem_colunas.get(coluna, None)
         
@@ -1363,58 +1437,19 @@ class SistemaManutencao:
         if estado_atual is None:
             # Primeira vez: ordena crescente
             novo_estado = 'asc'
-            df_ordenado = self.db.df.copy()
-            
-            # Tratamento especial para datas
-            if coluna in ['DATA', 'DATA ENTRADA', 'DATA SAÍDA']:
-                df_ordenado[coluna_df] = pd.to_datetime(df_ordenado[coluna_df], format='%d/%m/%Y', errors='coerce')
-                df_ordenado = df_ordenado.sort_values(by=coluna_df, ascending=True, na_position='last')
-            # Tratamento especial para números
-            elif coluna in ['KM', 'DIAS']:
-                df_ordenado[coluna_df] = pd.to_numeric(df_ordenado[coluna_df], errors='coerce')
-                df_ordenado = df_ordenado.sort_values(by=coluna_df, ascending=True, na_position='last')
-            # Tratamento especial para STATUS (preenche vazios)
-            elif coluna == 'STATUS':
-                df_ordenado[coluna_df] = df_ordenado[coluna_df].fillna('').astype(str)
-                df_ordenado = df_ordenado.sort_values(by=coluna_df, ascending=True, na_position='last')
-            # Ordenação alfabética para texto
-            else:
-                df_ordenado = df_ordenado.sort_values(by=coluna_df, ascending=True, na_position='last')
-            
-            # Atualiza indicador visual no cabeçalho
+            self.ordenacao = (coluna_df, True)
             self.tree.heading(coluna, text=f"{coluna} ▲")
             
         elif estado_atual == 'asc':
             # Segunda vez: ordena decrescente
             novo_estado = 'desc'
-            df_ordenado = self.db.df.copy()
-            
-            # Tratamento especial para datas
-            if coluna in ['DATA', 'DATA ENTRADA', 'DATA SAÍDA']:
-                df_ordenado[coluna_df] = pd.to_datetime(df_ordenado[coluna_df], format='%d/%m/%Y', errors='coerce')
-                df_ordenado = df_ordenado.sort_values(by=coluna_df, ascending=False, na_position='last')
-            # Tratamento especial para números
-            elif coluna in ['KM', 'DIAS']:
-                df_ordenado[coluna_df] = pd.to_numeric(df_ordenado[coluna_df], errors='coerce')
-                df_ordenado = df_ordenado.sort_values(by=coluna_df, ascending=False, na_position='last')
-            # Tratamento especial para STATUS (preenche vazios)
-            elif coluna == 'STATUS':
-                df_ordenado[coluna_df] = df_ordenado[coluna_df].fillna('').astype(str)
-                df_ordenado = df_ordenado.sort_values(by=coluna_df, ascending=False, na_position='last')
-            # Ordenação alfabética para texto
-            else:
-                df_ordenado = df_ordenado.sort_values(by=coluna_df, ascending=False, na_position='last')
-            
-            # Atualiza indicador visual no cabeçalho
+            self.ordenacao = (coluna_df, False)
             self.tree.heading(coluna, text=f"{coluna} ▼")
             
         else:  # estado_atual == 'desc'
-            # Terceira vez: volta à ordem original (recarrega do banco)
+            # Terceira vez: volta à ordem original (do banco)
             novo_estado = None
-            self.db.carregar_dados()  # Recarrega do SQLite
-            df_ordenado = self.db.df.copy()
-            
-            # Remove indicador visual do cabeçalho
+            self.ordenacao = None
             self.tree.heading(coluna, text=coluna)
         
         # Atualiza estado da coluna
@@ -1429,32 +1464,44 @@ class SistemaManutencao:
                 self.ordem_colunas[outra_col] = None
                 self.tree.heading(outra_col, text=outra_col)
         
-        # Atualiza a exibição com DataFrame ordenado
-        # NOTA: Apenas reordena visualização, não altera dados no SQLite
-        if novo_estado is None:
-            # Se voltou ao normal, mantém o DataFrame recarregado
-            self.atualizar_tabela()
-        else:
-            # Se ordenou, usa o DataFrame ordenado
-            self.db.df = df_ordenado.reset_index(drop=True)
-            self.atualizar_tabela()
+        # Reaplica sobre a visão atual (mantém filtros)
+        self.atualizar_tabela(self.df_visivel)
     
     
     def atualizar_tabela(self, df=None):
         """
         Atualiza dados na tabela
+        Só as linhas visíveis são formatadas (ver GradeVirtual)
         """
-        # Limpa tabela
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
         # Usa DataFrame fornecido ou completo
         if df is None:
-            df = self.db.obter_dataframe_exibicao()
-            # Salva ordem original na primeira vez
-            if self.df_original is None:
-                self.df_original = self.db.df.copy()
+            df = self.db.df
+        
+        self.df_visivel = df
+        
+        # Ordenação ativa = permutação de posições sobre a visão (sem copiar o DataFrame)
+        if self.ordenacao is None:
+            self.ordem_visivel = None
+            chaves = df.index.tolist()
+        else:
+            coluna_df, crescente = self.ordenacao
+            if df is self.db.df:
+                rotulos = self.db.ordem_por_coluna(coluna_df, crescente)
+            else:
+                rotulos = self.db.ordem_por_coluna(coluna_df, crescente, indices=df.index)
+            self.ordem_visivel = df.index.get_indexer(rotulos)
+            chaves = df.index[self.ordem_visivel].tolist()
+        
+        self.grade.definir_dados(chaves, self._formatar_linhas)
         
+        self.label_status.config(text=f"📋  {len(df)} registros carregados")
+    
+    
+    def _formatar_linhas(self, inicio, fim):
+        """
+        Formata as linhas inicio..fim-1 da visão atual para o grid
+        Retorna lista de (valores, tag) na ordem das colunas atuais
+        """
         # Mapa de colunas visuais para dados
         mapa_dados = {
             'DATA': 'DATA',
@@ -1474,8 +1521,13 @@ class SistemaManutencao:
         # Obtém ordem atual das colunas
         colunas_atuais = list(self.tree['columns'])
         
-        # Popula tabela respeitando ordem das colunas
-        for idx, row in df.iterrows():
+        linhas = []
+        if self.ordem_visivel is None:
+            bloco = self.df_visivel.iloc[inicio:fim]
+        else:
+            bloco = self.df_visivel.iloc[self.ordem_visivel[inicio:fim]]
+        
+        for row in bloco.to_dict('records'):
             # Constrói valores na ordem das colunas atuais
             valores = []
             for col in colunas_atuais:
@@ -1486,12 +1538,17 @@ class SistemaManutencao:
                     valores.append(formatar_data_br(row.get(col_dado, '')))
                 # Tratamento especial para DIAS
                 elif col == 'DIAS':
-                    valores.append(row.get('DIAS', row.get('TOTAL DE DIAS EM MANUTENÇÃO', '0')))
+                    dias = row.get('TOTAL DE DIAS EM MANUTENÇÃO', '')
+                    try:
+                        valores.append(str(int(dias)) if pd.notna(dias) and dias != '' else '0')
+                    except (ValueError, TypeError):
+                        valores.append(str(dias))
                 else:
-                    valores.append(row.get(col_dado, ''))
+                    valor = row.get(col_dado, '')
+                    valores.append('' if pd.isna(valor) else valor)  # KM vazio = <NA>
             
             # Define cor baseada no status
-            status_upper = row.get('STATUS', '').upper()
+            status_upper = str(row.get('STATUS', '')).upper()
             if status_upper == 'EM TRÂNSITO':
                 tag = 'em_transito'
             elif status_upper == 'EM SERVIÇO':
@@ -1499,14 +1556,9 @@ class SistemaManutencao:
             else:
                 tag = 'finalizado'
             
-            self.tree.insert('', tk.END, values=valores, tags=(idx, tag))
+            linhas.append((valores, tag))
         
-        # Configura cores
-        self.tree.tag_configure('em_transito', background='#f0f0f0')  # Cinza mais claro
-        self.tree.tag_configure('em_servico', background='#fff3cd')   # Amarelo claro
-        self.tree.tag_configure('finalizado', background='#d1e7dd')   # Verde claro
-        
-        self.label_status.config(text=f"📋  {len(df)} registros carregados")
+        return linhas
     
     
     def atualizar_estatisticas(self):
@@ -1539,6 +1591,8 @@ class SistemaManutencao:
             filtros['DATA ENTRADA'] = self.filtro_data_entrada.get()
         if self.filtro_data_saida.get():
             filtros['DATA SAÍDA'] = self.filtro_data_saida.get()
+        if self.filtro_texto.get():
+            filtros['TEXTO'] = self.filtro_texto.get()
         df_filtrado = self.db.buscar_registros(filtros)
         self.atualizar_tabela(df_filtrado)
         self.label_status.config(text=f"🔍  {len(df_filtrado)} registros encontrados")
@@ -1553,6 +1607,7 @@ class SistemaManutencao:
         self.filtro_status.set('')
         self.filtro_data_entrada.delete(0, tk.END)
         self.filtro_data_saida.delete(0, tk.END)
+        self.filtro_texto.delete(0, tk.END)
         self.atualizar_tabela()
     
     
@@ -1578,14 +1633,19 @@ class SistemaManutencao:
         """
         Edita registro selecionado
         """
-        if self.indice_selecionado is None:
+        if self.id_selecionado is None:
             messagebox.showwarning("Aviso", "Selecione um registro para editar")
             return
         
-        registro = self.db.df.iloc[self.indice_selecionado].to_dict()
+        id_registro = self.id_selecionado
+        if id_registro not in self.db.df.index:
+            messagebox.showwarning("Aviso", "O registro selecionado não existe mais")
+            return
+        
+        registro = self.db.df.loc[id_registro].to_dict()
         
         def callback(dados):
-            if self.db.atualizar_registro(self.indice_selecionado, dados):
+            if self.db.atualizar_registro(id_registro, dados):
                 if self.db.salvar_dados():
                     self.atualizar_tabela()
                     self.atualizar_estatisticas()
@@ -1600,7 +1660,8 @@ class SistemaManutencao:
         """
         Exclui registro selecionado
         """
-        selecao = self.tree.selection()
+        # Seleção por chave (inclui linhas fora da tela)
+        selecao = self.grade.chaves_selecionadas()
         if not selecao:
             messagebox.showwarning("Aviso", "Selecione um registro para excluir")
             return
@@ -1609,11 +1670,10 @@ class SistemaManutencao:
             messagebox.showinfo("Dica", "Você selecionou múltiplos registros.\n\nUse o botão '🗑️❌ Excluir Múltiplos' para excluir vários de uma vez.")
             return
         
-        # Pega o primeiro item selecionado
-        item = self.tree.item(selecao[0])
-        indice = item['tags'][0] if item['tags'] else None
+        # Pega o primeiro item selecionado (id do registro)
+        id_registro = selecao[0]
         
-        if indice is None:
+        if id_registro is None:
             messagebox.showwarning("Aviso", "Não foi possível identificar o registro")
             return
         
@@ -1623,11 +1683,11 @@ class SistemaManutencao:
         )
         
         if resposta:
-            if self.db.excluir_registro(indice):
+            if self.db.excluir_registro(id_registro):
                 if self.db.salvar_dados():
                     self.atualizar_tabela()
                     self.atualizar_estatisticas()
-                    self.indice_selecionado = None
+                    self.id_selecionado = None
                     messagebox.showinfo("Sucesso", "Registro excluído com sucesso!")
                 else:
                     messagebox.showerror("Erro", "Registro excluído mas não foi possível salvar no banco de dados")
@@ -1637,7 +1697,8 @@ class SistemaManutencao:
         """
         Exclui múltiplos registros selecionados
         """
-        selecao = self.tree.selection()
+        # Seleção por chave (inclui linhas fora da tela)
+        selecao = self.grade.chaves_selecionadas()
         if not selecao:
             messagebox.showwarning("Aviso", "Selecione um ou mais registros para excluir\n\n💡 Dica: Use Ctrl+Clique ou Shift+Clique para selecionar múltiplos")
             return
@@ -1650,31 +1711,38 @@ class SistemaManutencao:
         )
         
         if resposta:
-            # Coleta todos os índices dos registros selecionados
-            indices_para_excluir = []
-            for item_id in selecao:
-                item = self.tree.item(item_id)
-                indice = item['tags'][0] if item['tags'] else None
-                if indice is not None:
-                    indices_para_excluir.append(indice)
+            # Visão completa ou filtrada? (a completa é substituída pelo drop no cache)
+            visao_completa = self.df_visivel is None or self.df_visivel is self.db.df
             
-            # Ordena em ordem decrescente para não afetar os índices durante exclusão
-            indices_para_excluir.sort(reverse=True)
-            
-            # Exclui cada registro
-            excluidos = 0
-            for indice in indices_para_excluir:
-                if self.db.excluir_registro(indice):
-                    excluidos += 1
+            # Um DELETE em lote + um commit (ids não mudam durante a exclusão)
+            sucesso, resultado = self.db.excluir_registros(selecao)
+            if not sucesso:
+                messagebox.showerror("Erro", resultado)
+                return
             
-            # Salva alterações
-            if self.db.salvar_dados():
-                self.atualizar_tabela()
-                self.atualizar_estatisticas()
-                self.indice_selecionado = None
-                messagebox.showinfo("Sucesso", f"{excluidos} registro(s) excluído(s) com sucesso!")
-            else:
-                messagebox.showerror("Erro", f"{excluidos} registro(s) excluído(s) mas não foi possível salvar no banco de dados")
+            self._remover_da_visao(selecao, visao_completa)
+            self.atualizar_estatisticas()
+            self.id_selecionado = None
+            messagebox.showinfo("Sucesso", f"{resultado} registro(s) excluído(s) com sucesso!")
+    
+    
+    def _remover_da_visao(self, ids, visao_completa):
+        """
+        Tira da visão atual só as linhas excluídas (mantém filtro, ordenação e rolagem)
+        sem reconstruir a tabela
+        """
+        if visao_completa:
+            self.df_visivel = self.db.df
+        else:
+            self.df_visivel = self.df_visivel.drop(ids, errors='ignore')
+        
+        removidos = set(ids)
+        chaves = [chave for chave in self.grade.chaves if chave not in removidos]
+        if self.ordem_visivel is not None:
+            self.ordem_visivel = self.df_visivel.index.get_indexer(chaves)
+        
+        self.grade.remover(removidos)
+        self.label_status.config(text=f"📋  {len(self.df_visivel)} registros carregados")
     
     
     def salvar_dados(self):
@@ -1683,7 +1751,7 @@ class SistemaManutencao:
         """
         if self.db.salvar_dados():
             self.atualizar_estatisticas()
-            messagebox.showinfo("Sucesso", "Dados salvos com sucesso!\n\nBackup criado na pasta 'backup'")
+            messagebox.showinfo("Sucesso", "Dados salvos com sucesso!\n\nBackup automático na pasta 'backup' (no máximo 1 por hora)")
         else:
             messagebox.showerror("Erro", "Não foi possível salvar os dados")
     
@@ -1692,15 +1760,24 @@ class SistemaManutencao:
         """
         Abre janela de gerenciamento de veículos
         """
+        from src.interface_veiculos import JanelaCadastroVeiculos
+        
         JanelaCadastroVeiculos(self.root, self.gerenciador_veiculos)
     
     
+    def abrir_indicadores(self):
+        """
+        Abre o painel de indicadores da frota
+        """
+        from src.interface_dashboard import JanelaDashboard
+        
+        JanelaDashboard(self.root, self.db)
+    
+    
     def gerar_relatorio(self):
         """
         Gera relatório estatístico com opções de formato
         """
-        from src.utils import gerar_relatorio_pdf, gerar_relatorio_word
-        
         # Janela de opções
         dialog = tk.Toplevel(self.root)
         dialog.title("Gerar Relatório")
@@ -1747,7 +1824,7 @@ Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
         
         def gerar_pdf_relatorio():
             stats = self.db.obter_estatisticas()
-            dados = self.db.df.copy()
+            dados = self.db.obter_dataframe_exibicao()
             arquivo = f"output/Relatorio_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
             
             estatisticas = {
@@ -1758,17 +1835,12 @@ Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
                 'placas_unicas': stats['placas_unicas']
             }
             
-            sucesso, resultado = gerar_relatorio_pdf(dados, estatisticas, arquivo)
             dialog.destroy()
-            
-            if sucesso:
-                messagebox.showinfo("Relatório PDF", f"Relatório PDF salvo em:\n{resultado}")
-            else:
-                messagebox.showerror("Erro", resultado)
+            self._relatorio_em_segundo_plano('pdf', dados, estatisticas, arquivo)
         
         def gerar_word_relatorio():
             stats = self.db.obter_estatisticas()
-            dados = self.db.df.copy()
+            dados = self.db.obter_dataframe_exibicao()
             arquivo = f"output/Relatorio_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
             
             estatisticas = {
@@ -1779,13 +1851,8 @@ Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
                 'placas_unicas': stats['placas_unicas']
             }
             
-            sucesso, resultado = gerar_relatorio_word(dados, estatisticas, arquivo)
             dialog.destroy()
-            
-            if sucesso:
-                messagebox.showinfo("Relatório Word", f"Relatório Word salvo em:\n{resultado}")
-            else:
-                messagebox.showerror("Erro", resultado)
+            self._relatorio_em_segundo_plano('word', dados, estatisticas, arquivo)
         
         # Botões
         btn_frame = tk.Frame(dialog)
@@ -1801,6 +1868,46 @@ Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
                  width=20, height=2, bg='#3498db', fg='white', font=('Arial', 10, 'bold')).pack(pady=5)
     
     
+    def _relatorio_em_segundo_plano(self, formato, dados, estatisticas, arquivo):
+        """
+        Gera o relatório PDF/Word em uma thread (mesmo esquema de _exportar_em_segundo_plano)
+        """
+        nome = "PDF" if formato == 'pdf' else "Word"
+        
+        def concluido(resultado):
+            sucesso, mensagem = resultado
+            if not sucesso:
+                self.label_status.config(text=f"❌  Falha ao gerar relatório {nome}")
+                messagebox.showerror("Erro", mensagem)
+                return
+            
+            self.label_status.config(text=f"✅  Relatório {nome} gerado")
+            messagebox.showinfo(f"Relatório {nome}", f"Relatório {nome} salvo em:\n{mensagem}")
+        
+        def cancelado(_):
+            self.label_status.config(text=f"⚠️  Relatório {nome} cancelado")
+        
+        def falhou(erro):
+            self.label_status.config(text=f"❌  Falha ao gerar relatório {nome}")
+            messagebox.showerror("Erro", f"Erro ao gerar relatório: {erro}")
+        
+        from src.exportadores import gerar_relatorio
+        
+        tarefa = TarefaSegundoPlano(gerar_relatorio, formato, dados, estatisticas, arquivo).iniciar()
+        
+        JanelaProgresso(
+            self.root,
+            tarefa,
+            titulo="Gerando relatório...",
+            mensagem=f"{nome} - {len(dados)} registros",
+            ao_concluir=concluido,
+            ao_cancelar=cancelado,
+            ao_falhar=falhou,
+            modal=False,
+            mensagem_cancelando="Cancelando relatório..."
+        )
+    
+    
     # ==== MÉTODOS PARA NOTAS === =
     
     def nova_nota(self):
@@ -1869,7 +1976,11 @@ Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
         try:
             # Carrega notas do banco
             cursor = self.db.conn.cursor()
-            cursor.execute("SELECT id, data_programada, placa, status, observacao FROM notas ORDER BY data_programada DESC")
+            cursor.execute("""
+                SELECT id, data_programada, placa, status, observacao
+                FROM notas
+                ORDER BY data_programada_iso DESC, id DESC
+            """)
             notas = cursor.fetchall()
             
             for nota in notas:
@@ -1952,7 +2063,7 @@ Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
         
         # Info sobre quantidade
         qtd_total = len(self.db.df)
-        qtd_visivel = len(self.tree.get_children())
+        qtd_visivel = self.grade.total
         
         self.label_info_export = ttk.Label(
             frame,
@@ -1994,7 +2105,7 @@ Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
                 # Pega os dados visíveis no grid
                 df_exportar = self._obter_dados_grid()
             else:
-                df_exportar = self.db.df.copy()
+                df_exportar = self.db.obter_dataframe_exibicao()[self.db.colunas_obrigatorias]
             
             if df_exportar.empty:
                 messagebox.showwarning("Aviso", "Não há dados para exportar!")
@@ -2021,215 +2132,65 @@ Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
             if not arquivo:
                 return
             
-            # Executa exportação baseada no formato
-            if formato == "excel":
-                self._exportar_excel(df_exportar, arquivo)
-            elif formato == "pdf":
-                self._exportar_pdf(df_exportar, arquivo)
-            else:  # word
-                self._exportar_word(df_exportar, arquivo)
+            self._exportar_em_segundo_plano(formato, df_exportar, arquivo)
                 
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao exportar: {e}")
     
     
+    def _exportar_em_segundo_plano(self, formato, df, arquivo):
+        """
+        Gera o arquivo em uma thread (a interface continua livre)
+        df já é uma cópia formatada - edições feitas durante a exportação não entram
+        """
+        nome = os.path.basename(arquivo)
+        
+        def concluido(resultado):
+            sucesso, mensagem = resultado
+            if not sucesso:
+                self.label_status.config(text=f"❌  Falha ao exportar {nome}")
+                messagebox.showerror("Erro", mensagem)
+                return
+            
+            self.label_status.config(text=f"✅  {len(df)} registros exportados para {nome}")
+            messagebox.showinfo("Sucesso", f"✅ Dados exportados para {formato.upper()}:\n{arquivo}")
+            os.startfile(arquivo)
+        
+        def cancelado(_):
+            self.label_status.config(text=f"⚠️  Exportação de {nome} cancelada")
+        
+        def falhou(erro):
+            self.label_status.config(text=f"❌  Falha ao exportar {nome}")
+            messagebox.showerror("Erro", f"Erro ao exportar: {erro}")
+        
+        from src.exportadores import exportar_arquivo
+        
+        tarefa = TarefaSegundoPlano(exportar_arquivo, formato, df, arquivo).iniciar()
+        
+        JanelaProgresso(
+            self.root,
+            tarefa,
+            titulo="Exportando dados...",
+            mensagem=f"{formato.upper()} - {len(df)} registros",
+            ao_concluir=concluido,
+            ao_cancelar=cancelado,
+            ao_falhar=falhou,
+            modal=False,
+            mensagem_cancelando="Cancelando exportação..."
+        )
+    
+    
     def _obter_dados_grid(self):
         """Obtém os dados atualmente visíveis no grid na ordem das colunas"""
         # Colunas do grid
         colunas_grid = list(self.tree['columns'])
         
-        # Lista para armazenar dados
-        dados = []
-        
-        # Percorre itens do grid
-        for item in self.tree.get_children():
-            valores = self.tree.item(item)['values']
-            linha = {}
-            for i, col in enumerate(colunas_grid):
-                if i < len(valores):
-                    linha[col] = valores[i]
-                else:
-                    linha[col] = ''
-            dados.append(linha)
+        if self.df_visivel is None:
+            return pd.DataFrame(columns=colunas_grid)
         
-        return pd.DataFrame(dados)
-    
-    
-    def _exportar_excel(self, df, arquivo):
-        """Exporta para Excel"""
-        try:
-            # Cria writer do Excel com formatação
-            with pd.ExcelWriter(arquivo, engine='openpyxl') as writer:
-                df.to_excel(writer, index=False, sheet_name='Manutenção')
-                
-                # Ajusta largura das colunas
-                worksheet = writer.sheets['Manutenção']
-                for i, col in enumerate(df.columns):
-                    max_len = max(
-                        df[col].astype(str).apply(len).max(),
-                        len(str(col))
-                    ) + 2
-                    worksheet.column_dimensions[chr(65 + i)].width = min(max_len, 50)
-            
-            messagebox.showinfo("Sucesso", f"✅ Dados exportados para Excel:\n{arquivo}")
-            os.startfile(arquivo)
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao exportar Excel: {e}")
-    
-    
-    def _exportar_pdf(self, df, arquivo):
-        """Exporta para PDF"""
-        try:
-            from reportlab.lib import colors
-            from reportlab.lib.pagesizes import A4, landscape
-            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-            from reportlab.lib.units import mm
-            from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-            from reportlab.pdfbase import pdfmetrics
-            from reportlab.pdfbase.ttfonts import TTFont
-            
-            # Cria documento PDF em paisagem
-            doc = SimpleDocTemplate(
-                arquivo,
-                pagesize=landscape(A4),
-                rightMargin=10*mm,
-                leftMargin=10*mm,
-                topMargin=15*mm,
-                bottomMargin=15*mm
-            )
-            
-            elements = []
-            styles = getSampleStyleSheet()
-            
-            # Título
-            titulo_style = ParagraphStyle(
-                'Titulo',
-                parent=styles['Heading1'],
-                fontSize=16,
-                alignment=1,  # Centralizado
-                spaceAfter=20
-            )
-            elements.append(Paragraph("Relatório de Manutenção - ALS", titulo_style))
-            elements.append(Paragraph(f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M')}", styles['Normal']))
-            elements.append(Spacer(1, 10*mm))
-            
-            # Prepara dados da tabela
-            colunas = list(df.columns)
-            dados_tabela = [colunas]  # Cabeçalho
-            
-            for _, row in df.iterrows():
-                linha = [str(row.get(col, ''))[:30] for col in colunas]  # Limita texto
-                dados_tabela.append(linha)
-            
-            # Calcula largura das colunas
-            largura_pagina = landscape(A4)[0] - 20*mm
-            num_colunas = len(colunas)
-            largura_coluna = largura_pagina / num_colunas
-            
-            # Cria tabela
-            tabela = Table(dados_tabela, repeatRows=1)
-            
-            # Estilo da tabela
-            estilo = TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 8),
-                ('FONTSIZE', (0, 1), (-1, -1), 7),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                ('TOPPADDING', (0, 0), (-1, 0), 8),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')]),
-            ])
-            tabela.setStyle(estilo)
-            
-            elements.append(tabela)
-            
-            # Rodapé com total
-            elements.append(Spacer(1, 10*mm))
-            elements.append(Paragraph(f"Total de registros: {len(df)}", styles['Normal']))
-            
-            # Gera PDF
-            doc.build(elements)
-            
-            messagebox.showinfo("Sucesso", f"✅ Dados exportados para PDF:\n{arquivo}")
-            os.startfile(arquivo)
-        except ImportError:
-            messagebox.showerror("Erro", "Biblioteca reportlab não instalada.\nExecute: pip install reportlab")
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao exportar PDF: {e}")
-    
-    
-    def _exportar_word(self, df, arquivo):
-        """Exporta para Word"""
-        try:
-            from docx import Document
-            from docx.shared import Inches, Pt, Cm
-            from docx.enum.table import WD_TABLE_ALIGNMENT
-            from docx.enum.text import WD_ALIGN_PARAGRAPH
-            from docx.oxml.ns import nsdecls
-            from docx.oxml import parse_xml
-            
-            # Cria documento
-            doc = Document()
-            
-            # Configura página paisagem
-            section = doc.sections[0]
-            section.page_width, section.page_height = section.page_height, section.page_width
-            section.left_margin = Cm(1)
-            section.right_margin = Cm(1)
-            
-            # Título
-            titulo = doc.add_heading('Relatório de Manutenção - ALS', 0)
-            titulo.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            
-            # Data
-            data_para = doc.add_paragraph(f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
-            data_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            
-            doc.add_paragraph()  # Espaço
-            
-            # Cria tabela
-            colunas = list(df.columns)
-            tabela = doc.add_table(rows=1, cols=len(colunas))
-            tabela.style = 'Table Grid'
-            tabela.alignment = WD_TABLE_ALIGNMENT.CENTER
-            
-            # Cabeçalho
-            cabecalho = tabela.rows[0].cells
-            for i, col in enumerate(colunas):
-                cabecalho[i].text = col
-                # Cor de fundo azul escuro
-                shading = parse_xml(f'<w:shd {nsdecls("w")} w:fill="2c3e50"/>')
-                cabecalho[i]._tc.get_or_add_tcPr().append(shading)
-                # Texto branco e negrito
-                run = cabecalho[i].paragraphs[0].runs[0]
-                run.bold = True
-                run.font.size = Pt(9)
-            
-            # Dados
-            for _, row in df.iterrows():
-                linha_tabela = tabela.add_row().cells
-                for i, col in enumerate(colunas):
-                    valor = str(row.get(col, ''))[:50]  # Limita texto
-                    linha_tabela[i].text = valor
-                    linha_tabela[i].paragraphs[0].runs[0].font.size = Pt(8)
-            
-            # Total
-            doc.add_paragraph()
-            doc.add_paragraph(f"Total de registros: {len(df)}")
-            
-            # Salva documento
-            doc.save(arquivo)
-            
-            messagebox.showinfo("Sucesso", f"✅ Dados exportados para Word:\n{arquivo}")
-            os.startfile(arquivo)
-        except ImportError:
-            messagebox.showerror("Erro", "Biblioteca python-docx não instalada.\nExecute: pip install python-docx")
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao exportar Word: {e}")
+        # Formata a visão inteira (o Treeview só tem as linhas da tela)
+        linhas = self._formatar_linhas(0, len(self.df_visivel))
+        return pd.DataFrame([valores for valores, _ in linhas], columns=colunas_grid)
     
     
     def exportar_excel(self):
@@ -2333,247 +2294,13 @@ Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
             # Pega o modo selecionado
             modo = modo_var.get()
             
-            try:
-                dialog.destroy()
-                
-                # Mostra progresso
-                progress_win = tk.Toplevel(self.root)
-                progress_win.title("Importando...")
-                progress_win.geometry("400x150")
-                progress_win.transient(self.root)
-                progress_win.grab_set()
-                
-                # Centraliza
-                progress_win.update_idletasks()
-                px = (progress_win.winfo_screenwidth() // 2) - 200
-                py = (progress_win.winfo_screenheight() // 2) - 75
-                progress_win.geometry(f"400x150+{px}+{py}")
-                
-                ttk.Label(
-                    progress_win,
-                    text="📥 Importando dados...",
-                    font=('Arial', 12, 'bold')
-                ).pack(pady=20)
-                
-                label_status = ttk.Label(progress_win, text="Lendo arquivo Excel...", font=('Arial', 10))
-                label_status.pack(pady=10)
-                
-                progress_win.update()
-                
-                # Tenta ler Excel (header=1 pula linha de título)
-                try:
-                    # Copia arquivo temporariamente se estiver no OneDrive
-                    import tempfile
-                    if 'OneDrive' in arquivo or 'onedrive' in arquivo.lower():
-                        label_status.config(text="Copiando arquivo do OneDrive...")
-                        progress_win.update()
-                        
-                        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp:
-                            arquivo_temp = tmp.name
-                            import shutil
-                            shutil.copy2(arquivo, arquivo_temp)
-                            arquivo = arquivo_temp
-                    
-                    df_excel = pd.read_excel(arquivo, header=1)
-                except PermissionError as e:
-                    progress_win.destroy()
-                    messagebox.showerror(
-                        "Erro de Permissão",
-                        f"Não foi possível acessar o arquivo:\n\n{os.path.basename(arquivo)}\n\n"
-                        "💡 Dicas:\n"
-                        "• Feche o arquivo no Excel se estiver aberto\n"
-                        "• Se o arquivo estiver no OneDrive, copie para a pasta 'data' do sistema\n"
-                        "• Verifique se você tem permissão de leitura no arquivo"
-                    )
-                    return
-                except Exception as e:
-                    progress_win.destroy()
-                    messagebox.showerror(
-                        "Erro ao Ler Arquivo",
-                        f"Erro ao ler o arquivo Excel:\n\n{str(e)}\n\n"
-                        "Verifique se o arquivo está no formato correto."
-                    )
-                    return
-                
-                # Limpa nomes de colunas (remove espaços extras)
-                df_excel.columns = df_excel.columns.str.strip()
-                
-                label_status.config(text=f"Encontrados {len(df_excel)} registros")
-                progress_win.update()
-                
-                # Faz backup do banco atual
-                import shutil
-                backup_path = f"backup/database_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
-                os.makedirs('backup', exist_ok=True)
-                shutil.copy2('data/sistema_als.db', backup_path)
-                
-                label_status.config(text=f"Modo: {modo.upper()} - Processando...")
-                progress_win.update()
-                
-                # Importa dados
-                cursor = self.db.conn.cursor()
-                contador = 0
-                atualizados = 0
-                erros = 0
-                
-                # Se modo for "substituir", limpa a tabela
-                if modo == "substituir":
-                    label_status.config(text="Limpando dados antigos...")
-                    progress_win.update()
-                    cursor.execute("DELETE FROM manutencoes")
-                    cursor.execute("DELETE FROM notas")
-                    self.db.conn.commit()
-                
-                for idx, row in df_excel.iterrows():
-                    try:
-                        # Converte datas do pandas Timestamp para string formatada
-                        data_val = row.get('DATA')
-                        if pd.notna(data_val):
-                            if isinstance(data_val, pd.Timestamp):
-                                data_str = data_val.strftime('%d/%m/%Y')
-                            else:
-                                data_str = str(data_val).strip()
-                        else:
-                            data_str = ''
-                        
-                        placa = str(row.get('PLACA', '')).strip()
-                        
-                        data_entrada_val = row.get('DATA ENTRADA')
-                        if pd.notna(data_entrada_val):
-                            if isinstance(data_entrada_val, pd.Timestamp):
-                                data_entrada = data_entrada_val.strftime('%d/%m/%Y')
-                            else:
-                                data_entrada = str(data_entrada_val).strip()
-                        else:
-                            data_entrada = ''
-                        
-                        data_saida_val = row.get('DATA SAÍDA')
-                        if pd.notna(data_saida_val):
-                            if isinstance(data_saida_val, pd.Timestamp):
-                                data_saida = data_saida_val.strftime('%d/%m/%Y')
-                            else:
-                                data_saida = str(data_saida_val).strip()
-                        else:
-                            data_saida = ''
-                        
-                        # Converte KM para inteiro (remove decimais)
-                        km_val = row.get('KM')
-                        if pd.notna(km_val) and km_val != 'xxx':
-                            try:
-                                km = int(float(km_val))
-                            except:
-                                km = 0
-                        else:
-                            km = 0
-                        
-                        # Pula linhas completamente vazias (não conta como erro)
-                        if not placa and not data_str and not data_entrada:
-                            continue
-                        
-                        # Valida campos obrigatórios
-                        if not placa or not data_str or not data_entrada:
-                            erros += 1
-                            print(f"⚠️ Linha {idx+2}: Dados incompletos - Placa: '{placa}', Data: '{data_str}', Data Entrada: '{data_entrada}'")
-                            continue
-                        
-                        # Verifica se registro já existe (por PLACA + DATA + DATA_ENTRADA)
-                        cursor.execute("""
-                            SELECT id FROM manutencoes 
-                            WHERE placa = ? AND data = ? AND data_entrada = ?
-                        """, (placa, data_str, data_entrada))
-                        
-                        existe = cursor.fetchone()
-                        
-                        if modo == "novo" and existe:
-                            # Modo "novo" - ignora se já existe
-                            erros += 1
-                            continue
-                        elif modo == "atualizar" and existe:
-                            # Atualiza registro existente
-                            cursor.execute("""
-                                UPDATE manutencoes SET
-                                    km = ?,
-                                    veiculo = ?,
-                                    destino_programado = ?,
-                                    servico_executar = ?,
-                                    status = ?,
-                                    data_saida = ?,
-                                    total_dias_manutencao = ?,
-                                    nr_of = ?,
-                                    obs = ?
-                                WHERE id = ?
-                            """, (
-                                km,
-                                str(row.get('VEÍCULO', '')),
-                                str(row.get('DESTINO PROGRAMADO', '')),
-                                str(row.get('SERVIÇO A EXECUTAR', '')),
-                                str(row.get('STATUS', '')),
-                                data_saida,
-                                int(row.get('TOTAL DE DIAS EM MANUTENÇÃO', 0)) if pd.notna(row.get('TOTAL DE DIAS EM MANUTENÇÃO')) else 0,
-                                str(row.get('NR° OF', '')),
-                                str(row.get('OBS', '')),
-                                existe[0]
-                            ))
-                            atualizados += 1
-                        else:
-                            # Insere novo registro (quando não existe)
-                            cursor.execute("""
-                                INSERT INTO manutencoes (
-                                    data, placa, km, veiculo, destino_programado,
-                                    servico_executar, status, data_entrada, data_saida,
-                                    total_dias_manutencao, nr_of, obs
-                                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            """, (
-                                data_str,
-                                placa,
-                                km,
-                                str(row.get('VEÍCULO', '')),
-                                str(row.get('DESTINO PROGRAMADO', '')),
-                                str(row.get('SERVIÇO A EXECUTAR', '')),
-                                str(row.get('STATUS', '')),
-                                data_entrada,
-                                data_saida,
-                                int(row.get('TOTAL DE DIAS EM MANUTENÇÃO', 0)) if pd.notna(row.get('TOTAL DE DIAS EM MANUTENÇÃO')) else 0,
-                                str(row.get('NR° OF', '')),
-                                str(row.get('OBS', ''))
-                            ))
-                            contador += 1
-                    except Exception as e:
-                        erros += 1
-                        print(f"Erro no registro {idx}: {e}")
-                
-                # Auto-cadastra veículos
-                cursor.execute("""
-                    INSERT OR IGNORE INTO veiculos (placa, tipo_veiculo, descricao, data_cadastro)
-                    SELECT DISTINCT 
-                        placa,
-                        veiculo,
-                        'Importado do Excel',
-                        ?
-                    FROM manutencoes
-                    WHERE placa IS NOT NULL AND placa != ''
-                """, (datetime.now().strftime('%Y-%m-%d %H:%M:%S'),))
-                
-                veiculos_novos = cursor.rowcount
-                
-                # Auto-cadastra destinos
-                cursor.execute("""
-                    INSERT OR IGNORE INTO destinos (nome_destino, data_cadastro)
-                    SELECT DISTINCT 
-                        destino_programado,
-                        ?
-                    FROM manutencoes
-                    WHERE destino_programado IS NOT NULL AND destino_programado != ''
-                """, (datetime.now().strftime('%Y-%m-%d %H:%M:%S'),))
-                
-                destinos_novos = cursor.rowcount
-                
-                self.db.conn.commit()
-                
-                progress_win.destroy()
-                
-                # Atualiza interface
-                self.db.carregar_dados()
+            dialog.destroy()
+            
+            backup_path = self.db.backup.novo_caminho()
+            
+            def concluido(resultado):
+                # Importação usou conexão própria: avisa os caches e atualiza interface
+                self.db.conexao.notificar('manutencoes', 'veiculos', 'destinos')
                 self.atualizar_tabela()
                 self.atualizar_estatisticas()
                 
@@ -2584,49 +2311,75 @@ Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
                     "atualizar": "Registros foram atualizados/adicionados"
                 }
                 
-                resultado = f"✅ Importação concluída com sucesso!\n\n"
-                resultado += f"🔄 Modo: {msg_modo[modo]}\n\n"
-                resultado += f"📊 Registros novos: {contador}\n"
+                texto = f"✅ Importação concluída com sucesso!\n\n"
+                texto += f"🔄 Modo: {msg_modo[modo]}\n\n"
+                texto += f"📊 Registros novos: {resultado['novos']}\n"
                 
                 if modo == "atualizar":
-                    resultado += f"🔄 Registros atualizados: {atualizados}\n"
-                
-                resultado += f"⚠️ Erros/duplicados: {erros}\n"
-                resultado += f"🚛 Veículos cadastrados: {veiculos_novos}\n"
-                resultado += f"📍 Destinos cadastrados: {destinos_novos}\n\n"
-                resultado += f"💾 Backup salvo em:\n{backup_path}"
+                    texto += f"🔄 Registros atualizados: {resultado['atualizados']}\n"
                 
-                messagebox.showinfo(
-                    "Importação Concluída",
-                    resultado
-                )
+                texto += f"⚠️ Erros/duplicados: {resultado['incompletos'] + resultado['ignorados']}\n"
+                texto += f"🚛 Veículos cadastrados: {resultado['veiculos_novos']}\n"
+                texto += f"📍 Destinos cadastrados: {resultado['destinos_novos']}\n\n"
+                texto += f"💾 Backup salvo em:\n{backup_path}"
                 
-            except PermissionError as e:
-                if 'progress_win' in locals() and progress_win.winfo_exists():
-                    progress_win.destroy()
-                messagebox.showerror(
-                    "Erro de Permissão",
-                    f"Acesso negado ao arquivo:\n\n{str(e)}\n\n"
-                    "💡 Feche o arquivo no Excel e tente novamente.",
-                    parent=dialog if 'dialog' in locals() and dialog.winfo_exists() else self.root
-                )
-            except Exception as e:
-                # Faz rollback se houver erro
-                if 'cursor' in locals():
-                    try:
-                        self.db.conn.rollback()
-                    except:
-                        pass
-                
-                if 'progress_win' in locals() and progress_win.winfo_exists():
-                    progress_win.destroy()
+                messagebox.showinfo("Importação Concluída", texto)
+            
+            def cancelado(parcial):
+                # Blocos gravados antes do cancelamento permanecem no banco
+                if parcial and (parcial['novos'] or parcial['atualizados']):
+                    self.db.conexao.notificar('manutencoes', 'veiculos', 'destinos')
+                    self.atualizar_tabela()
+                    self.atualizar_estatisticas()
+                    detalhe = (
+                        f"✅ Já gravados antes do cancelamento: {parcial['novos']} novos, "
+                        f"{parcial['atualizados']} atualizados.\n"
+                        "⚠️ O bloco em andamento foi desfeito."
+                    )
+                else:
+                    detalhe = "⚠️ Nenhuma alteração foi feita no banco de dados."
                 
-                messagebox.showerror(
-                    "Erro na Importação",
-                    f"Erro ao importar dados:\n\n{str(e)}\n\n"
-                    "⚠️ Nenhuma alteração foi feita no banco de dados.",
-                    parent=dialog if 'dialog' in locals() and dialog.winfo_exists() else self.root
+                messagebox.showinfo(
+                    "Importação Cancelada",
+                    f"A importação foi cancelada.\n\n{detalhe}\n\n"
+                    f"💾 Backup salvo em:\n{backup_path}"
                 )
+            
+            def falhou(erro):
+                if isinstance(erro, PermissionError):
+                    messagebox.showerror(
+                        "Erro de Permissão",
+                        f"Não foi possível acessar o arquivo:\n\n{os.path.basename(arquivo)}\n\n"
+                        "💡 Dicas:\n"
+                        "• Feche o arquivo no Excel se estiver aberto\n"
+                        "• Se o arquivo estiver no OneDrive, copie para a pasta 'data' do sistema\n"
+                        "• Verifique se você tem permissão de leitura no arquivo"
+                    )
+                else:
+                    # Blocos gravados antes do erro podem ter sido mantidos
+                    self.db.conexao.notificar('manutencoes', 'veiculos', 'destinos')
+                    self.atualizar_tabela()
+                    self.atualizar_estatisticas()
+                    messagebox.showerror(
+                        "Erro na Importação",
+                        f"Erro ao importar dados:\n\n{str(erro)}"
+                    )
+            
+            # Importa em segundo plano (conexão SQLite própria na thread)
+            from src.importador import importar_arquivo
+            tarefa = TarefaSegundoPlano(
+                importar_arquivo, self.db.db_path, arquivo, modo, backup_path
+            ).iniciar()
+            
+            JanelaProgresso(
+                self.root,
+                tarefa,
+                titulo="Importando dados...",
+                mensagem=f"Modo: {modo.upper()} - Lendo arquivo Excel...",
+                ao_concluir=concluido,
+                ao_cancelar=cancelado,
+                ao_falhar=falhou
+            )
         
         # Botões
         btn_frame = ttk.Frame(frame)
@@ -2651,6 +2404,10 @@ Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
         """
         Fecha aplicação com confirmação
         """
+        if self.db is None:  # ainda carregando: nada para salvar
+            self.root.destroy()
+            return
+        
         resposta = messagebox.askyesnocancel(
             "Fechar Sistema",
             "Deseja salvar os dados antes de sair?"
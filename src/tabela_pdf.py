@@ -0,0 +1,93 @@
+"""
+Tabela de DataFrame para PDF montada página a página (reportlab)
+Importado só ao gerar PDF - o reportlab é dependência opcional
+"""
+from reportlab.lib import colors
+from reportlab.platypus import Flowable, FrameBreak, Table, TableStyle
+
+from .exportadores import _texto_celula
+
+
+# Altura fixa das linhas (pt): quantas linhas cabem sai direto do espaço livre
+ALTURA_CABECALHO = 18
+ALTURA_LINHA = 12
+
+
+def estilo_tabela():
+    """Estilo das tabelas de dados (cabeçalho escuro, linhas alternadas)"""
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 8),
+        ('FONTSIZE', (0, 1), (-1, -1), 7),
+        ('TOPPADDING', (0, 0), (-1, -1), 1),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')]),
+    ])
+
+
+class TabelaEmBlocos(Flowable):
+    """
+    Tabela de df que se divide sob demanda (API de Flowable: wrap/split)
+    
+    Enquanto houver linhas, wrap() pede mais altura que a disponível; o reportlab
+    então chama split(), que monta uma Table só com as linhas que cabem no espaço
+    livre do quadro e devolve [tabela, self]. Só uma Table existe por vez.
+    """
+    
+    def __init__(self, df, larguras, tarefa=None):
+        super().__init__()
+        self.df = df
+        self.larguras = larguras
+        self.tarefa = tarefa
+        self.inicio = 0
+        self.estilo = estilo_tabela()
+        self.cabecalho = [str(coluna) for coluna in df.columns]
+    
+    
+    def wrap(self, largura, altura):
+        if self.inicio >= len(self.df):
+            return 0, 0
+        return largura, altura + ALTURA_LINHA  # não cabe: força split()
+    
+    
+    def split(self, largura, altura):
+        total = len(self.df)
+        if self.inicio >= total:
+            return []
+        
+        linhas = int((altura - ALTURA_CABECALHO) // ALTURA_LINHA)
+        if linhas < 1:
+            # Sem espaço nem para uma linha: continua no próximo quadro (página)
+            return [FrameBreak(), self]
+        
+        if self.tarefa:
+            self.tarefa.verificar_cancelamento()
+        
+        bloco = self.df.iloc[self.inicio:self.inicio + linhas]
+        dados = [self.cabecalho] + [
+            [_texto_celula(valor) for valor in linha]
+            for linha in bloco.itertuples(index=False, name=None)
+        ]
+        
+        tabela = Table(
+            dados,
+            colWidths=self.larguras,
+            rowHeights=[ALTURA_CABECALHO] + [ALTURA_LINHA] * len(bloco)
+        )
+        tabela.setStyle(self.estilo)
+        
+        self.inicio += len(bloco)
+        if self.tarefa:
+            self.tarefa.progresso(self.inicio, total, "Gerando PDF...")
+        
+        return [tabela, self]
+    
+    
+    def draw(self):
+        pass  # terminada: ocupa 0 pt e não desenha nada
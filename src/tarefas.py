@@ -0,0 +1,84 @@
+"""
+Execução de tarefas demoradas em segundo plano
+A interface (Tk) nunca é tocada pela thread: tudo passa por uma fila
+"""
+import queue
+import threading
+
+
+class TarefaCancelada(Exception):
+    """
+    Lançada dentro da tarefa quando o usuário pede cancelamento
+    Pode levar o resultado parcial (ex: o que já foi gravado)
+    """
+
+
+class TarefaSegundoPlano:
+    """
+    Executa uma função em uma thread separada
+    
+    A função recebe a própria tarefa como primeiro argumento para:
+    - reportar progresso: tarefa.progresso(feitos, total, mensagem)
+    - checar cancelamento: tarefa.verificar_cancelamento() (lança TarefaCancelada)
+    
+    Mensagens para a interface ficam na fila e são lidas com tarefa.mensagens()
+    (ex: por um root.after periódico - ver JanelaProgresso)
+    """
+    
+    def __init__(self, funcao, *args, **kwargs):
+        self.funcao = funcao
+        self.args = args
+        self.kwargs = kwargs
+        
+        self.fila = queue.Queue()
+        self.evento_cancelar = threading.Event()
+        self.thread = threading.Thread(target=self._executar, daemon=True)
+    
+    
+    def iniciar(self):
+        """Inicia a thread"""
+        self.thread.start()
+        return self
+    
+    
+    def _executar(self):
+        """Corpo da thread: resultado, cancelamento ou erro vão para a fila"""
+        try:
+            resultado = self.funcao(self, *self.args, **self.kwargs)
+            self.fila.put(('concluido', resultado))
+        except TarefaCancelada as e:
+            self.fila.put(('cancelado', e.args[0] if e.args else None))
+        except Exception as e:
+            print(f"❌ Erro na tarefa em segundo plano: {e}")
+            self.fila.put(('erro', e))
+    
+    
+    def progresso(self, feitos, total=None, mensagem=None):
+        """Reporta progresso (chamado pela thread)"""
+        self.fila.put(('progresso', (feitos, total, mensagem)))
+    
+    
+    def cancelar(self):
+        """Pede cancelamento (chamado pela interface)"""
+        self.evento_cancelar.set()
+    
+    
+    @property
+    def cancelado(self):
+        """Indica se o cancelamento foi pedido"""
+        return self.evento_cancelar.is_set()
+    
+    
+    def verificar_cancelamento(self):
+        """Lança TarefaCancelada se o usuário pediu para cancelar"""
+        if self.evento_cancelar.is_set():
+            raise TarefaCancelada()
+    
+    
+    def mensagens(self):
+        """Retira da fila todas as mensagens pendentes (sem bloquear)"""
+        while True:
+            try:
+                yield self.fila.get_nowait()
+            except queue.Empty:
+                return
@@ -1,19 +1,35 @@
 """
 Funções auxiliares para cálculos e processamento
+O pandas é importado só dentro das funções que o usam (importar este módulo é leve)
 """
-import pandas as pd
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 import os
 
+from .tarefas import TarefaCancelada
+
+
+# Formatos de data aceitos na digitação e na importação (gravados sempre como DD/MM/AAAA)
+FORMATOS_DATA = ['%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y']
+
+
+def valor_vazio(valor):
+    """True para None, NaN, NaT e pd.NA (sem importar o pandas)"""
+    try:
+        return valor is None or bool(valor != valor)
+    except TypeError:  # pd.NA não pode ser convertido para bool
+        return True
+
 
 def calcular_dias_manutencao(data_entrada, data_saida):
     """
     Calcula dias em manutenção (CORRETO: conta o dia de entrada e saída)
     Se data_saida vazia, usa hoje
     """
-    if pd.isna(data_entrada) or data_entrada == '' or data_entrada is None:
+    if valor_vazio(data_entrada) or data_entrada == '':
         return 0
     
+    import pandas as pd
+    
     try:
         # Converte data de entrada para datetime
         if isinstance(data_entrada, str):
@@ -24,7 +40,7 @@ def calcular_dias_manutencao(data_entrada, data_saida):
         return 0
     
     # Define data de saída
-    if pd.isna(data_saida) or data_saida == '' or data_saida is None:
+    if valor_vazio(data_saida) or data_saida == '':
         data_saida_dt = pd.Timestamp(datetime.now().date())
     else:
         try:
@@ -44,14 +60,113 @@ def calcular_status(data_entrada, data_saida, status_atual=''):
     """
     Calcula status dinâmico baseado nas datas
     """
-    if pd.notna(data_entrada) and data_entrada != '' and (pd.isna(data_saida) or data_saida == ''):
+    tem_entrada = not valor_vazio(data_entrada) and data_entrada != ''
+    tem_saida = not valor_vazio(data_saida) and data_saida != ''
+    
+    if tem_entrada and not tem_saida:
         return 'EM SERVIÇO'
-    elif pd.notna(data_entrada) and data_entrada != '' and pd.notna(data_saida) and data_saida != '':
+    elif tem_entrada and tem_saida:
         return 'FINALIZADO'
     else:
         return status_atual if status_atual else ''
 
 
+def converter_datas_vetorizado(serie):
+    """
+    Converte uma coluna inteira de datas de uma só vez
+    Texto em DD/MM/AAAA é lido com formato fixo; datas do Excel (Timestamp) são aceitas
+    Valores vazios ou inválidos viram NaT
+    """
+    import pandas as pd
+    
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    
+    texto = serie.where(serie.notna(), '').astype(str)
+    datas = pd.to_datetime(texto, format='%d/%m/%Y', errors='coerce')
+    
+    # Mesma regra do cálculo linha a linha: texto fora do padrão é inválido,
+    # só valores que não são texto (ex: Timestamp) usam conversão livre
+    nao_texto = serie.notna() & ~serie.map(lambda valor: isinstance(valor, str))
+    if nao_texto.any():
+        datas[nao_texto] = pd.to_datetime(serie[nao_texto], errors='coerce')
+    
+    return datas
+
+
+def calcular_dias_vetorizado(datas_entrada, datas_saida, hoje=None):
+    """
+    Versão vetorizada de calcular_dias_manutencao para colunas inteiras
+    Conta o dia de entrada e saída; sem saída usa hoje; sem entrada = 0
+    """
+    import pandas as pd
+    
+    hoje = pd.Timestamp(hoje if hoje is not None else datetime.now().date())
+    
+    entrada = converter_datas_vetorizado(datas_entrada)
+    saida = converter_datas_vetorizado(datas_saida).fillna(hoje)
+    
+    dias = ((saida - entrada).dt.days + 1).clip(lower=1)
+    return dias.fillna(0).astype(int)
+
+
+def calcular_status_vetorizado(datas_entrada, datas_saida):
+    """
+    Versão vetorizada de calcular_status (sem status atual)
+    Entrada sem saída = EM SERVIÇO | Entrada e saída = FINALIZADO | Demais = ''
+    """
+    import pandas as pd
+    
+    tem_entrada = datas_entrada.notna() & (datas_entrada.astype(str) != '')
+    tem_saida = datas_saida.notna() & (datas_saida.astype(str) != '')
+    
+    status = pd.Series('', index=datas_entrada.index, dtype=object)
+    status[tem_entrada & ~tem_saida] = 'EM SERVIÇO'
+    status[tem_entrada & tem_saida] = 'FINALIZADO'
+    return status
+
+
+def interpretar_periodo(texto):
+    """
+    Interpreta o texto de um filtro de data como intervalo ISO [inicio, fim)
+    Aceita: DD/MM/AAAA | MM/AAAA | AAAA | "DD/MM/AAAA a DD/MM/AAAA"
+    Retorna (inicio, fim) em AAAA-MM-DD ou None se não for possível interpretar
+    """
+    texto = str(texto).strip()
+    if not texto:
+        return None
+    
+    # Intervalo explícito: "01/01/2024 a 31/03/2024" ou "01/01/2024 - 31/03/2024"
+    for separador in (' a ', ' A ', ' - '):
+        if separador in texto:
+            partes = texto.split(separador)
+            if len(partes) != 2:
+                return None
+            inicio = interpretar_periodo(partes[0])
+            fim = interpretar_periodo(partes[1])
+            if inicio is None or fim is None:
+                return None
+            return inicio[0], fim[1]
+    
+    partes = texto.split('/')
+    try:
+        if len(partes) == 3 and len(partes[2]) == 4:
+            dia = datetime.strptime(texto, '%d/%m/%Y').date()
+            return dia.isoformat(), (dia + timedelta(days=1)).isoformat()
+        
+        if len(partes) == 2 and len(partes[1]) == 4:
+            mes = datetime.strptime(texto, '%m/%Y').date()
+            proximo = date(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
+            return mes.isoformat(), proximo.isoformat()
+        
+        if len(partes) == 1 and len(texto) == 4 and texto.isdigit():
+            return f"{texto}-01-01", f"{int(texto) + 1:04d}-01-01"
+    except ValueError:
+        return None
+    
+    return None
+
+
 def validar_data(data_str):
     """
     Valida e converte string para data
@@ -59,10 +174,12 @@ def validar_data(data_str):
     if not data_str or data_str == '':
         return None
     
+    import pandas as pd
+    
     try:
         if isinstance(data_str, str):
             # Tenta vários formatos
-            for fmt in ['%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y']:
+            for fmt in FORMATOS_DATA:
                 try:
                     return pd.to_datetime(data_str, format=fmt)
                 except:
@@ -76,7 +193,7 @@ def formatar_data_br(data):
     """
     Formata data para padrão brasileiro
     """
-    if pd.isna(data) or data is None or data == '':
+    if valor_vazio(data) or data == '':
         return ''
     
     if isinstance(data, str):
@@ -88,6 +205,33 @@ def formatar_data_br(data):
         return str(data)
 
 
+def normalizar_data(valor):
+    """
+    Converte uma data para o texto DD/MM/AAAA gravado no banco
+    Aceita datas do Excel/pandas e os textos de validar_data (1/4/2024, 01-04-2024, 2024-04-01)
+    Vazio = ''; texto que não é data é mantido como está
+    """
+    if valor_vazio(valor):
+        return ''
+    
+    if isinstance(valor, (datetime, date)):
+        return valor.strftime('%d/%m/%Y')
+    
+    texto = str(valor).strip()
+    if not texto:
+        return ''
+    
+    # Ignora hora ("2024-04-01 00:00:00", "2024-04-01T08:30")
+    parte_data = texto.split()[0].split('T')[0]
+    for fmt in FORMATOS_DATA:
+        try:
+            return datetime.strptime(parte_data, fmt).strftime('%d/%m/%Y')
+        except ValueError:
+            continue
+    
+    return texto
+
+
 def validar_numero(valor, padrao=0):
     """
     Valida e converte para número
@@ -107,14 +251,15 @@ def limpar_texto(texto):
     """
     Remove espaços extras e normaliza texto
     """
-    if pd.isna(texto) or texto is None:
+    if valor_vazio(texto):
         return ''
     return str(texto).strip()
 
 
-def gerar_relatorio_pdf(dados, estatisticas, arquivo_saida):
+def gerar_relatorio_pdf(dados, estatisticas, arquivo_saida, tarefa=None):
     """
     Gera relatório em PDF
+    tarefa (opcional) recebe o progresso e pode cancelar (ver exportadores.gerar_relatorio)
     """
     try:
         # Criar pasta output se não existir
@@ -126,6 +271,8 @@ def gerar_relatorio_pdf(dados, estatisticas, arquivo_saida):
         from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
         from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
         from reportlab.lib.enums import TA_CENTER, TA_LEFT
+        import pandas as pd
+        from .exportadores import historia_com_tabela
         
         # Criar documento
         doc = SimpleDocTemplate(arquivo_saida, pagesize=landscape(A4))
@@ -173,50 +320,40 @@ def gerar_relatorio_pdf(dados, estatisticas, arquivo_saida):
         elements.append(stats_table)
         elements.append(Spacer(1, 1*cm))
         
-        # Tabela de dados
+        # Tabela de dados (todos os registros, uma tabela por página)
         if not dados.empty:
             elements.append(Paragraph('REGISTROS DE MANUTENÇÃO', titulo_style))
             elements.append(Spacer(1, 0.5*cm))
             
-            # Preparar dados da tabela
-            colunas = ['PLACA', 'VEÍCULO', 'DATA ENTRADA', 'DATA SAÍDA', 'DIAS', 'STATUS']
-            table_data = [colunas]
-            
-            for _, row in dados.head(50).iterrows():  # Limite 50 registros por página
-                table_data.append([
-                    str(row.get('PLACA', '')),
-                    str(row.get('VEÍCULO', ''))[:15],
-                    formatar_data_br(row.get('DATA ENTRADA', '')),
-                    formatar_data_br(row.get('DATA SAÍDA', '')),
-                    str(row.get('TOTAL DE DIAS EM MANUTENÇÃO', 0)),
-                    str(row.get('STATUS', ''))
-                ])
+            tabela = pd.DataFrame({
+                'PLACA': dados['PLACA'].astype(str),
+                'VEÍCULO': dados['VEÍCULO'].astype(str).str[:15],
+                'DATA ENTRADA': dados['DATA ENTRADA'].map(formatar_data_br),
+                'DATA SAÍDA': dados['DATA SAÍDA'].map(formatar_data_br),
+                'DIAS': dados['TOTAL DE DIAS EM MANUTENÇÃO'],
+                'STATUS': dados['STATUS'].astype(str)
+            })
             
-            data_table = Table(table_data, colWidths=[3*cm, 4*cm, 3*cm, 3*cm, 2*cm, 3*cm])
-            data_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ]))
-            elements.append(data_table)
+            elements = historia_com_tabela(
+                doc, elements, tabela,
+                larguras=[3*cm, 4*cm, 3*cm, 3*cm, 2*cm, 3*cm],
+                tarefa=tarefa
+            )
         
         # Gerar PDF
         doc.build(elements)
         return True, arquivo_saida
         
+    except TarefaCancelada:
+        raise
     except Exception as e:
         return False, f"Erro ao gerar PDF: {str(e)}"
 
 
-def gerar_relatorio_word(dados, estatisticas, arquivo_saida):
+def gerar_relatorio_word(dados, estatisticas, arquivo_saida, tarefa=None):
     """
     Gera relatório em Word (.docx)
+    tarefa (opcional) recebe o progresso e pode cancelar (ver exportadores.gerar_relatorio)
     """
     try:
         # Criar pasta output se não existir
@@ -225,6 +362,7 @@ def gerar_relatorio_word(dados, estatisticas, arquivo_saida):
         from docx import Document
         from docx.shared import Inches, Pt, RGBColor
         from docx.enum.text import WD_ALIGN_PARAGRAPH
+        from .exportadores import adicionar_linhas_word
         
         # Criar documento
         doc = Document()
@@ -274,19 +412,22 @@ def gerar_relatorio_word(dados, estatisticas, arquivo_saida):
                 hdr_cells[i].text = header
                 hdr_cells[i].paragraphs[0].runs[0].font.bold = True
             
-            # Dados (limite de 100 registros)
-            for _, row in dados.head(100).iterrows():
-                row_cells = table.add_row().cells
-                row_cells[0].text = str(row.get('PLACA', ''))
-                row_cells[1].text = str(row.get('VEÍCULO', ''))[:20]
-                row_cells[2].text = formatar_data_br(row.get('DATA ENTRADA', ''))
-                row_cells[3].text = formatar_data_br(row.get('DATA SAÍDA', ''))
-                row_cells[4].text = str(row.get('TOTAL DE DIAS EM MANUTENÇÃO', 0))
-                row_cells[5].text = str(row.get('STATUS', ''))
+            # Dados (todos os registros, XML da tabela gerado em blocos)
+            linhas = zip(
+                dados['PLACA'].astype(str),
+                dados['VEÍCULO'].astype(str).str[:20],
+                dados['DATA ENTRADA'].map(formatar_data_br),
+                dados['DATA SAÍDA'].map(formatar_data_br),
+                dados['TOTAL DE DIAS EM MANUTENÇÃO'],
+                dados['STATUS'].astype(str)
+            )
+            adicionar_linhas_word(table, linhas, tamanho_fonte=None, tarefa=tarefa, total=len(dados))
         
         # Salvar
         doc.save(arquivo_saida)
         return True, arquivo_saida
         
+    except TarefaCancelada:
+        raise
     except Exception as e:
         return False, f"Erro ao gerar Word: {str(e)}"
@@ -1,10 +1,11 @@
 """
 Gestão de Cadastro de Veículos - SQLite Integrado
 """
-import sqlite3
 import pandas as pd
 import os
 from datetime import datetime
+from .conexao import obter_conexao
+from .indice_busca import IndiceBusca
 
 
 class GerenciadorVeiculos:
@@ -15,8 +16,11 @@ class GerenciadorVeiculos:
     
     def __init__(self, db_path='data/sistema_als.db'):
         self.db_path = db_path
+        self.conexao = None  # ConexaoCompartilhada (mesma do DatabaseManager)
         self.conn = None
         self.df = None  # Compatibilidade
+        self._exibicao = None  # textos dos veículos ativos (refeito quando veiculos muda)
+        self._indice_busca = None
         
         self.conectar()
         self.criar_tabela()
@@ -24,9 +28,13 @@ class GerenciadorVeiculos:
     
     
     def conectar(self):
-        """Conecta ao banco SQLite"""
+        """Conecta ao banco SQLite (conexão compartilhada)"""
         try:
-            self.conn = sqlite3.connect(self.db_path)
+            self.conexao = obter_conexao(self.db_path)
+            self.conn = self.conexao.conn
+            
+            # Qualquer mudança confirmada em veiculos (inclusive importação) recarrega o cache
+            self.conexao.observar('veiculos', self.carregar_veiculos, dono=self)
             return True
         except Exception as e:
             print(f"❌ Erro ao conectar: {e}")
@@ -56,6 +64,9 @@ class GerenciadorVeiculos:
     
     def carregar_veiculos(self):
         """Carrega veículos do SQLite para DataFrame"""
+        self._exibicao = None
+        self._indice_busca = None
+        
         try:
             query = "SELECT * FROM veiculos ORDER BY placa"
             self.df = pd.read_sql_query(query, self.conn)
@@ -99,18 +110,16 @@ class GerenciadorVeiculos:
             if cursor.fetchone():
                 return False, "Placa já cadastrada!"
             
-            # Insere veículo (descrição OPCIONAL)
-            cursor.execute("""
-                INSERT INTO veiculos (placa, tipo_veiculo, descricao, ultima_km, data_cadastro, ativo)
-                VALUES (?, ?, ?, ?, ?, 1)
-            """, (placa, tipo, descricao if descricao else None, km_inicial, datetime.now().strftime('%d/%m/%Y')))
+            # Insere veículo (descrição OPCIONAL) - DataFrame recarregado pela notificação
+            with self.conexao.transacao('veiculos') as cursor:
+                cursor.execute("""
+                    INSERT INTO veiculos (placa, tipo_veiculo, descricao, ultima_km, data_cadastro, ativo)
+                    VALUES (?, ?, ?, ?, ?, 1)
+                """, (placa, tipo, descricao if descricao else None, km_inicial, datetime.now().strftime('%d/%m/%Y')))
             
-            self.conn.commit()
-            self.carregar_veiculos()  # Atualiza DataFrame
             return True, "Veículo cadastrado com sucesso!"
             
         except Exception as e:
-            self.conn.rollback()
             return False, f"Erro: {e}"
     
     
@@ -119,29 +128,24 @@ class GerenciadorVeiculos:
         try:
             placa_antiga = self.df.iloc[indice]['PLACA']
             
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                UPDATE veiculos 
-                SET tipo_veiculo = ?, placa = ?, descricao = ?, ativo = ?
-                WHERE placa = ?
-            """, (tipo, placa.upper(), descricao if descricao else None, 1 if ativo else 0, placa_antiga))
+            with self.conexao.transacao('veiculos') as cursor:
+                cursor.execute("""
+                    UPDATE veiculos 
+                    SET tipo_veiculo = ?, placa = ?, descricao = ?, ativo = ?
+                    WHERE placa = ?
+                """, (tipo, placa.upper(), descricao if descricao else None, 1 if ativo else 0, placa_antiga))
             
-            self.conn.commit()
-            self.carregar_veiculos()
             return True, "Veículo atualizado com sucesso!"
         except Exception as e:
-            self.conn.rollback()
             return False, f"Erro: {e}"
     
     
     def atualizar_km(self, placa, nova_km):
         """Atualiza a KM de um veículo"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("UPDATE veiculos SET ultima_km = ? WHERE placa = ?", 
-                         (nova_km, placa.upper()))
-            self.conn.commit()
-            self.carregar_veiculos()
+            with self.conexao.transacao('veiculos') as cursor:
+                cursor.execute("UPDATE veiculos SET ultima_km = ? WHERE placa = ?", 
+                             (nova_km, placa.upper()))
             return True
         except Exception as e:
             print(f"❌ Erro: {e}")
@@ -169,40 +173,55 @@ class GerenciadorVeiculos:
             return None
     
     
-    def obter_veiculos_ativos(self):
-        """Retorna lista de veículos ativos formatada: PLACA - TIPO - DESCRIÇÃO"""
+    def _montar_exibicao(self):
+        """
+        Textos de exibição dos veículos ativos, montados com operações vetorizadas
+        Retorna {'ativos': {placa: "PLACA - TIPO - DESCRIÇÃO"},
+                 'por_tipo': {tipo: ["PLACA - DESCRIÇÃO", ...]}}
+        """
+        exibicao = {'ativos': {}, 'por_tipo': {}}
         if self.df.empty:
-            return []
+            return exibicao
         
-        veiculos_ativos = self.df[self.df['ATIVO'] == True].copy()
+        ativos = self.df[self.df['ATIVO'] == True]
+        placa = ativos['PLACA'].astype(str)
+        tipo = ativos['TIPO_VEICULO'].astype(str)
+        descricao = ativos['DESCRICAO'].astype(str)
         
-        lista = []
-        for _, row in veiculos_ativos.iterrows():
-            # Formato: PLACA - TIPO - DESCRIÇÃO
-            texto = f"{row['PLACA']} - {row['TIPO_VEICULO']}"
-            if row['DESCRICAO']:
-                texto += f" - {row['DESCRICAO']}"
-            lista.append(texto)
+        # " - DESCRIÇÃO" só quando houver descrição
+        sufixo = (' - ' + descricao).where(descricao != '', '')
         
-        return lista
+        exibicao['ativos'] = dict(zip(placa, placa + ' - ' + tipo + sufixo))
+        
+        curtos = placa + sufixo
+        for nome_tipo, textos in curtos.groupby(tipo, sort=False):
+            exibicao['por_tipo'][nome_tipo] = textos.tolist()
+        
+        return exibicao
+    
+    
+    def indice_exibicao(self):
+        """Textos dos veículos ativos (em cache até a próxima mudança em veiculos)"""
+        if self._exibicao is None:
+            self._exibicao = self._montar_exibicao()
+        return self._exibicao
+    
+    
+    def obter_indice_busca(self):
+        """IndiceBusca dos veículos ativos, compartilhado pelos formulários"""
+        if self._indice_busca is None:
+            self._indice_busca = IndiceBusca(self.indice_exibicao()['ativos'].values())
+        return self._indice_busca
+    
+    
+    def obter_veiculos_ativos(self):
+        """Retorna lista de veículos ativos formatada: PLACA - TIPO - DESCRIÇÃO"""
+        return list(self.indice_exibicao()['ativos'].values())
     
     
     def obter_veiculos_por_tipo(self, tipo):
         """Retorna veículos de um tipo específico"""
-        if self.df.empty:
-            return []
-        
-        mascara = (self.df['TIPO_VEICULO'] == tipo) & (self.df['ATIVO'] == True)
-        veiculos = self.df[mascara].copy()
-        
-        lista = []
-        for _, row in veiculos.iterrows():
-            texto = f"{row['PLACA']}"
-            if row['DESCRICAO']:
-                texto += f" - {row['DESCRICAO']}"
-            lista.append(texto)
-        
-        return lista
+        return list(self.indice_exibicao()['por_tipo'].get(tipo, []))
     
     
     def extrair_placa_da_selecao(self, texto_selecao):
@@ -218,13 +237,10 @@ class GerenciadorVeiculos:
         """Desativa um veículo (não exclui, apenas marca como inativo)"""
         try:
             placa = self.df.iloc[indice]['PLACA']
-            cursor = self.conn.cursor()
-            cursor.execute("UPDATE veiculos SET ativo = 0 WHERE placa = ?", (placa,))
-            self.conn.commit()
-            self.carregar_veiculos()
+            with self.conexao.transacao('veiculos') as cursor:
+                cursor.execute("UPDATE veiculos SET ativo = 0 WHERE placa = ?", (placa,))
             return True, "Veículo desativado com sucesso!"
         except Exception as e:
-            self.conn.rollback()
             return False, f"Erro: {e}"
     
     
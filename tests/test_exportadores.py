@@ -0,0 +1,106 @@
+"""
+PDF paginado sob demanda (TabelaEmBlocos): todas as linhas, páginas cheias
+
+Uso: python -m pytest tests
+"""
+import math
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.units import mm
+from reportlab.platypus import SimpleDocTemplate, Spacer, Table
+
+from src.exportadores import historia_com_tabela
+from src.tabela_pdf import ALTURA_CABECALHO, ALTURA_LINHA
+from src.tarefas import TarefaCancelada
+
+
+# Espaço interno do Frame padrão do reportlab (6pt em cima e embaixo)
+PADDING_FRAME = 12
+
+
+class DocumentoContado(SimpleDocTemplate):
+    """Conta as linhas de dados desenhadas em cada página"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.linhas_por_pagina = {}
+    
+    def afterFlowable(self, flowable):
+        if isinstance(flowable, Table):
+            linhas = len(flowable._cellvalues) - 1  # sem o cabeçalho
+            self.linhas_por_pagina[self.page] = self.linhas_por_pagina.get(self.page, 0) + linhas
+
+
+class TarefaFalsa:
+    """Cancela depois de `blocos` avisos de progresso"""
+    
+    def __init__(self, blocos):
+        self.blocos = blocos
+        self.avisos = 0
+    
+    def progresso(self, feitos, total=None, mensagem=None):
+        self.avisos += 1
+    
+    def verificar_cancelamento(self):
+        if self.avisos >= self.blocos:
+            raise TarefaCancelada()
+
+
+def dados(linhas):
+    return pd.DataFrame({
+        'PLACA': [f"ABC{i:04d}" for i in range(linhas)],
+        'STATUS': 'FINALIZADO',
+        'OBS': 'Sem observações'
+    })
+
+
+def documento(arquivo):
+    return DocumentoContado(str(arquivo), pagesize=landscape(A4), topMargin=15*mm, bottomMargin=15*mm)
+
+
+def montar(arquivo, df, iniciais=(), tarefa=None):
+    doc = documento(arquivo)
+    doc.build(historia_com_tabela(doc, list(iniciais), df, tarefa=tarefa))
+    return doc
+
+
+def linhas_cheias(doc):
+    return int((doc.height - PADDING_FRAME - ALTURA_CABECALHO) // ALTURA_LINHA)
+
+
+def test_todas_as_linhas_em_paginas_cheias(tmp_path):
+    total = 2000
+    doc = montar(tmp_path / 'tabela.pdf', dados(total), iniciais=[Spacer(1, 100)])
+    
+    por_pagina = doc.linhas_por_pagina
+    cheia = linhas_cheias(doc)
+    primeira = por_pagina[1]
+    
+    assert sum(por_pagina.values()) == total
+    assert 0 < primeira < cheia
+    assert len(por_pagina) == 1 + math.ceil((total - primeira) / cheia)
+    assert doc.page == len(por_pagina)
+    
+    # Da segunda à penúltima página, todas cheias
+    assert all(por_pagina[pagina] == cheia for pagina in range(2, len(por_pagina)))
+
+
+def test_sem_espaco_para_uma_linha_continua_na_proxima_pagina(tmp_path):
+    doc = documento(tmp_path / 'x.pdf')
+    quase_cheia = doc.height - PADDING_FRAME - ALTURA_CABECALHO - ALTURA_LINHA / 2
+    
+    doc = montar(tmp_path / 'tabela.pdf', dados(10), iniciais=[Spacer(1, quase_cheia)])
+    
+    assert doc.linhas_por_pagina == {2: 10}
+
+
+def test_cancelamento_interrompe_a_montagem(tmp_path):
+    with pytest.raises(TarefaCancelada):
+        montar(tmp_path / 'tabela.pdf', dados(5000), tarefa=TarefaFalsa(blocos=3))
@@ -0,0 +1,72 @@
+"""
+Filtros da tela principal: PLACA / STATUS gravados com maiúsculas e minúsculas misturadas
+
+Uso: python -m pytest tests
+"""
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database import DatabaseManager
+from src.importador import normalizar_planilha
+
+
+def inserir_direto(db, placa, data, status):
+    """Grava sem passar pelo DatabaseManager (como um banco de versão antiga)"""
+    db.conn.execute(
+        "INSERT INTO manutencoes (data, placa, status, data_entrada) VALUES (?, ?, ?, ?)",
+        (data, placa, status, data)
+    )
+    db.conn.commit()
+
+
+def test_banco_antigo_com_status_misto_e_migrado(tmp_path):
+    db_path = str(tmp_path / 'teste.db')
+    db = DatabaseManager(db_path)
+    
+    inserir_direto(db, 'abc1234', '01/02/2024', 'Finalizado')
+    inserir_direto(db, 'ABC1234', '02/02/2024', 'Em serviço')
+    inserir_direto(db, 'XYZ9876', '03/02/2024', 'FINALIZADO')
+    
+    # Reabre como banco anterior à migração 5
+    db.conn.execute("PRAGMA user_version = 4")
+    db.conn.commit()
+    db = DatabaseManager(db_path)
+    
+    finalizados = db.buscar_registros({'STATUS': 'FINALIZADO'})
+    em_servico = db.buscar_registros({'STATUS': 'EM SERVIÇO'})
+    placa = db.buscar_registros({'PLACA': 'abc'})
+    
+    assert sorted(finalizados['PLACA'].astype(str)) == ['ABC1234', 'XYZ9876']
+    assert list(em_servico['STATUS'].astype(str)) == ['EM SERVIÇO']
+    assert len(placa) == 2
+
+
+def test_formulario_grava_status_em_maiusculas(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'teste.db'))
+    
+    db.adicionar_registro({
+        'DATA': '01/02/2024', 'PLACA': 'abc1234', 'STATUS': 'Em serviço', 'DATA ENTRADA': '01/02/2024'
+    })
+    id_registro = int(db.df['id'].iloc[0])
+    assert len(db.buscar_registros({'STATUS': 'EM SERVIÇO'})) == 1
+    
+    db.atualizar_registro(id_registro, {'PLACA': 'xyz9876', 'STATUS': 'finalizado'})
+    assert list(db.buscar_registros({'STATUS': 'FINALIZADO', 'PLACA': 'XYZ'})['id']) == [id_registro]
+
+
+def test_importacao_grava_status_em_maiusculas():
+    planilha = pd.DataFrame({
+        'DATA': ['01/02/2024', '02/02/2024'],
+        'PLACA': ['abc1234', 'ABC1234'],
+        'DATA ENTRADA': ['01/02/2024', '02/02/2024'],
+        'STATUS': ['Finalizado', 'Em serviço']
+    })
+    
+    registros, _ = normalizar_planilha(planilha)
+    
+    assert list(registros['status']) == ['FINALIZADO', 'EM SERVIÇO']
+    assert list(registros['placa']) == ['ABC1234', 'ABC1234']